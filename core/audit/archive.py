@@ -0,0 +1,179 @@
+# core/audit/archive.py
+
+import gzip
+import hashlib
+import json
+import os
+import re
+from datetime import date
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from core.export import iter_queryset_chunks
+from core.logging.utils import get_logger
+from .models import AuditLog
+from .partitions import drop_month, rows_of_month
+from .payload import decode_detail
+
+logger = get_logger(__name__)
+
+ARCHIVE_FIELDS = [field.attname for field in AuditLog._meta.concrete_fields]
+# audit-YYYY-MM.jsonl.gz, then audit-YYYY-MM.pN.jsonl.gz for rows that
+# reached an archived month later
+ARCHIVE_PATTERN = re.compile(
+    r"^audit-(?P<year>\d{4})-(?P<month>\d{2})(?:\.p(?P<part>\d+))?\.jsonl\.gz$"
+)
+
+
+class ArchiveError(Exception):
+    """An archive does not match the rows it was written from."""
+
+
+def archive_name(month, part=0):
+    suffix = f".p{part}" if part else ""
+    return f"audit-{month:%Y-%m}{suffix}.jsonl.gz"
+
+
+def manifest_path(path):
+    return path[: -len(".jsonl.gz")] + ".manifest.json"
+
+
+def archive_files(archive_dir):
+    """``(month, path)`` of every archive, oldest month first."""
+    if not os.path.isdir(archive_dir):
+        return []
+    files = []
+    for name in os.listdir(archive_dir):
+        match = ARCHIVE_PATTERN.match(name)
+        if match:
+            month = date(int(match["year"]), int(match["month"]), 1)
+            files.append((month, int(match["part"] or 0), name))
+    return [
+        (month, os.path.join(archive_dir, name)) for month, _, name in sorted(files)
+    ]
+
+
+def read_manifest(path):
+    with open(manifest_path(path)) as f:
+        return json.load(f)
+
+
+def archive_row(log):
+    row = {name: getattr(log, name) for name in ARCHIVE_FIELDS}
+    # The archive is compressed as a whole, store details readable
+    row["detail"] = decode_detail(row["detail"])
+    return row
+
+
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def write_archive(path, queryset, chunk_size=5000):
+    """
+    Stream ``queryset`` into a gzipped JSONL file plus a manifest with the
+    row count, id range and SHA-256. The file is written under a temporary
+    name and renamed once synced, so an archive that exists is complete.
+    """
+    tmp_path = f"{path}.tmp"
+    rows = 0
+    first_id = last_id = None
+    with open(tmp_path, "wb") as raw:
+        with gzip.GzipFile(fileobj=raw, mode="wb", mtime=0) as f:
+            for chunk in iter_queryset_chunks(queryset.order_by("id"), chunk_size):
+                f.write(
+                    "".join(
+                        json.dumps(
+                            archive_row(log), cls=DjangoJSONEncoder, ensure_ascii=False
+                        )
+                        + "\n"
+                        for log in chunk
+                    ).encode()
+                )
+                rows += len(chunk)
+                first_id = first_id or chunk[0].id
+                last_id = chunk[-1].id
+        raw.flush()
+        os.fsync(raw.fileno())
+    os.replace(tmp_path, path)
+
+    manifest = {
+        "rows": rows,
+        "first_id": first_id,
+        "last_id": last_id,
+        "sha256": file_digest(path),
+        "created": timezone.now().isoformat(),
+    }
+    with open(manifest_path(path), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def archive_month(month, archive_dir, chunk_size=5000, drop=True):
+    """
+    Archive the rows of ``month`` and, with ``drop``, remove them once the
+    archive is verified against the database.
+
+    Rows already covered by an earlier archive of the month (a run that
+    stopped before dropping) are not written again. Returns the number of
+    rows archived by this call.
+    """
+    os.makedirs(archive_dir, exist_ok=True)
+    parts = [path for m, path in archive_files(archive_dir) if m == month]
+    archived_up_to = max(
+        (read_manifest(path)["last_id"] or 0 for path in parts), default=0
+    )
+    pending = rows_of_month(month).filter(id__gt=archived_up_to)
+
+    rows = 0
+    if pending.exists():
+        path = os.path.join(archive_dir, archive_name(month, len(parts)))
+        manifest = write_archive(path, pending, chunk_size)
+        rows = manifest["rows"]
+        if file_digest(path) != manifest["sha256"]:
+            raise ArchiveError(f"{path} changed while being verified")
+        current = pending.filter(id__lte=manifest["last_id"]).count()
+        if current != rows:
+            raise ArchiveError(
+                f"{month:%Y-%m} has {current} rows, the archive {manifest['rows']}"
+            )
+        # Rows that arrived while archiving are picked up by the next run
+        if drop and pending.filter(id__gt=manifest["last_id"]).exists():
+            raise ArchiveError(f"{month:%Y-%m} received rows while archiving")
+
+    if drop:
+        drop_month(month)
+    logger.info(
+        "Audit month archived",
+        extra={"month": f"{month:%Y-%m}", "rows": rows, "dropped": drop},
+    )
+    return rows
+
+
+def search_archive(archive_dir, start=None, end=None, **filters):
+    """
+    Yield archived audit rows with ``start <= timestamp < end`` whose fields
+    equal ``filters`` (e.g. ``username="alice"``). Only the archives of the
+    months in range are opened and each one is streamed.
+    """
+    for month, path in archive_files(archive_dir):
+        if start and month < date(start.year, start.month, 1):
+            continue
+        if end and month > date(end.year, end.month, 1):
+            continue
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                row = json.loads(line)
+                timestamp = parse_datetime(row["timestamp"])
+                if start and timestamp < start:
+                    continue
+                if end and timestamp >= end:
+                    continue
+                if all(str(row.get(k)) == str(v) for k, v in filters.items()):
+                    yield row
@@ -0,0 +1,271 @@
+# core/audit/capture.py
+
+import itertools
+import threading
+import weakref
+from contextvars import ContextVar
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connections, models, transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+
+from .payload import PayloadPolicy
+from .writer import build_entry, record_audit_entries
+
+# The request being handled, set by ``AuditContextMiddleware``; DRF writes
+# the authenticated user back onto it, so it is read when a change is made
+current_request = ContextVar("audit_current_request", default=None)
+
+# Model -> CaptureSpec of every model whose changes are recorded
+_registry = {}
+
+# This thread's batch of each open transaction or savepoint, by (alias,
+# savepoint id). Only the on_commit callback holds a batch, so it drops out
+# once its transaction commits or rolls back, or its savepoint rolls back.
+_local = threading.local()
+
+
+class CaptureSpec:
+    def __init__(self, model, module, resource_type, resource_id="pk", exclude=()):
+        self.model = model
+        self.module = module
+        self.resource_type = resource_type
+        self.resource_id = resource_id
+        # Timestamps maintained by Django and generated columns only add noise
+        self.fields = [
+            field.attname
+            for field in model._meta.concrete_fields
+            if field.attname not in exclude
+            and not getattr(field, "auto_now", False)
+            and not getattr(field, "auto_now_add", False)
+            and not isinstance(field, models.GeneratedField)
+        ]
+
+    def snapshot(self, obj, fields=None):
+        return {name: getattr(obj, name) for name in fields or self.fields}
+
+    def get_resource_id(self, obj):
+        return str(getattr(obj, self.resource_id))
+
+
+def register(label, module, resource_type, resource_id="pk", exclude=()):
+    """
+    Record creates, updates and deletes of model ``label`` as audit events of
+    ``module``/``resource_type``; ``resource_id`` names the attribute stored
+    as the event's resource id.
+    """
+    model = apps.get_model(label)
+    _registry[model] = CaptureSpec(model, module, resource_type, resource_id, exclude)
+    uid = f"audit_capture_{label}"
+    pre_save.connect(remember_before, sender=model, dispatch_uid=uid)
+    post_save.connect(capture_save, sender=model, dispatch_uid=uid)
+    post_delete.connect(capture_delete, sender=model, dispatch_uid=uid)
+
+
+def connect():
+    register("user.SysUser", "USER", "USER", exclude=("last_login", "update_time"))
+    register("role.SysUserRole", "USER", "USER_ROLE", resource_id="user_id")
+    register("role.SysRole", "ROLE", "ROLE")
+    register("menu.SysRoleMenu", "ROLE", "ROLE_MENU", resource_id="role_id")
+    register("menu.SysMenu", "MENU", "MENU")
+
+
+def is_enabled():
+    return getattr(settings, "AUDIT_CAPTURE_CHANGES", True)
+
+
+class ChangeBatch:
+    """
+    Changes made in one transaction, recorded with a single audit insert
+    when it commits and dropped when it rolls back.
+
+    Each object gets one event: repeated saves merge into one diff, and an
+    object created and deleted in the same transaction leaves no trace.
+    """
+
+    def __init__(self):
+        self.changes = {}
+        # Rows without a primary key (bulk_create on MySQL) are never merged
+        self._unkeyed = itertools.count()
+        self.committed = False
+
+    def add(self, spec, obj, action, before, after):
+        if obj.pk is None:
+            key = (None, next(self._unkeyed))
+        else:
+            key = (spec.model, obj.pk)
+        change = self.changes.get(key)
+        if change is None:
+            self.changes[key] = {
+                "spec": spec,
+                "resource_id": spec.get_resource_id(obj),
+                "action": action,
+                "before": before,
+                "after": after,
+                "actor": request_actor(),
+            }
+            return
+        if action == "DELETE":
+            if change["action"] == "CREATE":
+                del self.changes[key]
+                return
+            change["action"] = "DELETE"
+            change["after"] = {}
+        else:
+            change["after"].update(after)
+        if change["action"] != "CREATE":
+            # Keep the values from before the first change
+            for name, value in before.items():
+                change["before"].setdefault(name, value)
+
+    def entries(self):
+        policy = PayloadPolicy.from_settings()
+        entries = []
+        for change in self.changes.values():
+            diff = policy.diff(change["before"], change["after"])
+            if not diff:
+                continue
+            spec, action = change["spec"], change["action"]
+            user, ip_address = change["actor"]
+            entries.append(
+                build_entry(
+                    user,
+                    username=getattr(user, "username", None) or "system",
+                    action=action,
+                    module=spec.module,
+                    resource_type=spec.resource_type,
+                    resource_id=change["resource_id"],
+                    detail=policy.encode({"changes": diff}),
+                    ip_address=ip_address,
+                    status=True,
+                    message=f"{spec.resource_type} {change['resource_id']} "
+                    f"{action.lower()}d",
+                )
+            )
+        return entries
+
+    def commit(self):
+        self.committed = True
+        record_audit_entries(self.entries())
+
+
+def request_actor():
+    """``(user, ip_address)`` of the request making the change, if any."""
+    request = current_request.get()
+    if request is None:
+        return None, None
+    user = getattr(request, "user", None)
+    if not getattr(user, "is_authenticated", False):
+        user = None
+    return user, request.META.get("REMOTE_ADDR")
+
+
+def current_batch(using):
+    """
+    The batch of the current transaction (savepoint), registered with
+    ``on_commit`` on first use, so a rolled back savepoint discards its own
+    changes only. ``None`` in autocommit mode.
+    """
+    connection = connections[using]
+    if not connection.in_atomic_block:
+        return None
+    # atomic(savepoint=False) blocks, e.g. inside delete(), add a None
+    savepoints = [sid for sid in connection.savepoint_ids if sid is not None]
+    key = (using, savepoints[-1] if savepoints else None)
+    batches = getattr(_local, "batches", None)
+    if batches is None:
+        batches = _local.batches = weakref.WeakValueDictionary()
+    batch = batches.get(key)
+    if batch is None or batch.committed:
+        batch = batches[key] = ChangeBatch()
+        # A failing audit write is logged, it must not fail the committed change
+        transaction.on_commit(batch.commit, using=using, robust=True)
+    return batch
+
+
+def record_changes(changes, using="default"):
+    """Add ``(spec, obj, action, before, after)`` changes to the current batch."""
+    batch = current_batch(using)
+    autocommit = batch is None
+    if autocommit:
+        batch = ChangeBatch()
+    for change in changes:
+        batch.add(*change)
+    if autocommit:
+        # Already committed: runs right away, a failing audit write is logged
+        transaction.on_commit(batch.commit, using=using, robust=True)
+
+
+def remember_before(
+    sender, instance, raw=False, using="default", update_fields=None, **kwargs
+):
+    """Read the stored values of the fields being saved, to diff against."""
+    if raw or instance._state.adding or instance.pk is None or not is_enabled():
+        return
+    fields = set(_registry[sender].fields) - instance.get_deferred_fields()
+    if update_fields is not None:
+        opts = sender._meta
+        fields &= {opts.get_field(name).attname for name in update_fields}
+    if not fields:
+        return
+    instance._audit_before = (
+        sender._base_manager.using(using)
+        .filter(pk=instance.pk)
+        .values(*sorted(fields))
+        .first()
+    )
+
+
+def capture_save(sender, instance, created, raw=False, using="default", **kwargs):
+    if raw or not is_enabled():
+        return
+    spec = _registry[sender]
+    if created:
+        changes = [(spec, instance, "CREATE", {}, spec.snapshot(instance))]
+        record_changes(changes, using)
+        return
+    before = instance.__dict__.pop("_audit_before", None)
+    if before is None:
+        return
+    after = spec.snapshot(instance, list(before))
+    record_changes([(spec, instance, "UPDATE", before, after)], using)
+
+
+def capture_delete(sender, instance, using="default", **kwargs):
+    if not is_enabled():
+        return
+    spec = _registry[sender]
+    fields = [
+        name for name in spec.fields if name not in instance.get_deferred_fields()
+    ]
+    before = spec.snapshot(instance, fields)
+    record_changes([(spec, instance, "DELETE", before, {})], using)
+
+
+def capture_bulk_create(objs, using="default"):
+    """Record objects inserted with ``bulk_create``, which sends no signals."""
+    if not is_enabled():
+        return
+    changes = []
+    for obj in objs:
+        spec = _registry[type(obj)]
+        changes.append((spec, obj, "CREATE", {}, spec.snapshot(obj)))
+    record_changes(changes, using)
+
+
+def capture_update(model, before, changes, using="default"):
+    """
+    Record a ``QuerySet.update(**changes)``, which sends no signals;
+    ``before`` maps each updated primary key to its previous values.
+    """
+    if not is_enabled():
+        return
+    spec = _registry[model]
+    changes = {name: value for name, value in changes.items() if name in spec.fields}
+    recorded = []
+    for pk, values in before.items():
+        obj = model(pk=pk, **values)
+        old = {name: values.get(name) for name in changes}
+        recorded.append((spec, obj, "UPDATE", old, dict(changes)))
+    record_changes(recorded, using)
@@ -0,0 +1,20 @@
+# core/audit/middleware.py
+
+from .capture import current_request
+
+
+class AuditContextMiddleware:
+    """
+    Expose the current request to model change capture, which attributes
+    each change to the request's user and IP address.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = current_request.set(request)
+        try:
+            return self.get_response(request)
+        finally:
+            current_request.reset(token)
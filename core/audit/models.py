@@ -18,8 +18,14 @@ class AuditLog(models.Model):
         ("MENU", "Menu Management"),
     ]
 
+    # No database constraint: MySQL cannot partition tables with foreign
+    # keys (see core.audit.partitions); SET_NULL is applied by the ORM
     user = models.ForeignKey(
-        User, on_delete=models.SET_NULL, null=True, related_name="audit_logs"
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name="audit_logs",
+        db_constraint=False,
     )
     # User info to preserve after user deletion
     username = models.CharField(max_length=150)
@@ -40,6 +46,22 @@ class AuditLog(models.Model):
         indexes = [
             models.Index(fields=["user", "action", "module", "timestamp"]),
             models.Index(fields=["resource_type", "resource_id"]),
+            # Keyset pages of the audit list
+            models.Index(fields=["timestamp", "id"], name="core_auditlog_ts_id_idx"),
+            # Filter combinations of the audit screen, newest first
+            models.Index(
+                fields=["module", "action", "timestamp"],
+                name="core_auditlog_mod_act_ts_idx",
+            ),
+            models.Index(
+                fields=["action", "timestamp"], name="core_auditlog_act_ts_idx"
+            ),
+            # Exact and prefix lookups
+            models.Index(
+                fields=["username", "timestamp"], name="core_auditlog_user_ts_idx"
+            ),
+            models.Index(fields=["user_email"], name="core_auditlog_email_idx"),
+            models.Index(fields=["resource_id"], name="core_auditlog_res_id_idx"),
         ]
 
     def save(self, *args, **kwargs):
@@ -48,3 +70,49 @@ class AuditLog(models.Model):
             self.username = self.user.username
             self.user_email = self.user.email
         super().save(*args, **kwargs)
+
+
+class AuditSpoolOffset(models.Model):
+    """Bytes of a local audit spool segment already loaded into AuditLog."""
+
+    segment = models.CharField(max_length=255, unique=True)
+    offset = models.BigIntegerField(default=0)
+    update_time = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "sys_audit_spool_offset"
+
+
+class AuditRollup(models.Model):
+    """
+    Audit event counts per hour or day bucket (UTC) and dimension, kept up
+    to date by the audit writer and rebuilt by ``rebuild_audit_rollups``.
+    """
+
+    PERIOD_CHOICES = [
+        ("hour", "Hour"),
+        ("day", "Day"),
+    ]
+
+    period = models.CharField(max_length=4, choices=PERIOD_CHOICES)
+    bucket = models.DateTimeField()
+    module = models.CharField(max_length=20)
+    action = models.CharField(max_length=10)
+    status = models.BooleanField()
+    username = models.CharField(max_length=150)
+    count = models.BigIntegerField(default=0)
+
+    class Meta:
+        db_table = "sys_audit_rollup"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["period", "bucket", "module", "action", "status", "username"],
+                name="sys_audit_rollup_key_uniq",
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["period", "module", "bucket"],
+                name="sys_audit_rollup_mod_idx",
+            ),
+        ]
@@ -0,0 +1,163 @@
+# core/audit/partitions.py
+
+import re
+from datetime import date, datetime, timezone as dt_timezone
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import AuditLog
+from .search import audit_search_index
+
+# Monthly partition ``pYYYYMM`` holds the rows of that month; ``pmax``
+# catches anything past the last one
+PARTITION_PATTERN = re.compile(r"^p(?P<year>\d{4})(?P<month>\d{2})$")
+CATCH_ALL_PARTITION = "pmax"
+
+
+def month_start(value):
+    return date(value.year, value.month, 1)
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def month_range(month):
+    """``[start, end)`` of a month as aware UTC datetimes."""
+    start = datetime(month.year, month.month, 1, tzinfo=dt_timezone.utc)
+    end_month = add_months(month, 1)
+    end = datetime(end_month.year, end_month.month, 1, tzinfo=dt_timezone.utc)
+    return start, end
+
+
+def partition_name(month):
+    return f"p{month:%Y%m}"
+
+
+def partition_clause(month):
+    boundary = add_months(month, 1)
+    return (
+        f"PARTITION {partition_name(month)} "
+        f"VALUES LESS THAN (TO_DAYS('{boundary:%Y-%m-%d}'))"
+    )
+
+
+def catch_all_clause():
+    return f"PARTITION {CATCH_ALL_PARTITION} VALUES LESS THAN MAXVALUE"
+
+
+def supports_partitions():
+    return connection.vendor == "mysql"
+
+
+def list_partitions():
+    """Months with their own partition, oldest first; empty if unpartitioned."""
+    if not supports_partitions():
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT PARTITION_NAME FROM information_schema.PARTITIONS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s "
+            "AND PARTITION_NAME IS NOT NULL ORDER BY PARTITION_ORDINAL_POSITION",
+            [AuditLog._meta.db_table],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+    months = []
+    for name in names:
+        match = PARTITION_PATTERN.match(name)
+        if match:
+            months.append(date(int(match["year"]), int(match["month"]), 1))
+    return months
+
+
+def is_partitioned():
+    return bool(list_partitions())
+
+
+def ensure_partitions(months_ahead=3):
+    """
+    Split the catch-all partition so every month up to ``months_ahead``
+    from now has its own. Returns the months added.
+    """
+    existing = list_partitions()
+    if not existing:
+        return []
+    last = add_months(month_start(timezone.now()), months_ahead)
+    months = []
+    month = add_months(existing[-1], 1)
+    while month <= last:
+        months.append(month)
+        month = add_months(month, 1)
+    if months:
+        clauses = [partition_clause(m) for m in months] + [catch_all_clause()]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"ALTER TABLE {connection.ops.quote_name(AuditLog._meta.db_table)} "
+                f"REORGANIZE PARTITION {CATCH_ALL_PARTITION} INTO "
+                f"({', '.join(clauses)})"
+            )
+    return months
+
+
+def months_before(cutoff):
+    """Months that end at or before ``cutoff`` and still hold audit rows."""
+    cutoff_month = month_start(cutoff)
+    partitions = list_partitions()
+    if partitions:
+        return [month for month in partitions if month < cutoff_month]
+    return [
+        month_start(value)
+        for value in AuditLog.objects.filter(
+            timestamp__lt=month_range(cutoff_month)[0]
+        ).datetimes("timestamp", "month", tzinfo=dt_timezone.utc)
+    ]
+
+
+def rows_of_month(month):
+    """Queryset of the rows ``drop_month(month)`` removes."""
+    start, end = month_range(month)
+    rows = AuditLog.objects.filter(timestamp__lt=end)
+    partitions = list_partitions()
+    if partitions and month == partitions[0]:
+        # The oldest partition also holds anything before its month
+        return rows
+    return rows.filter(timestamp__gte=start)
+
+
+def drop_month(month, chunk_size=5000):
+    """
+    Remove every audit row of ``month`` and its search index entries:
+    ``DROP PARTITION`` on a partitioned table, otherwise deletes in primary
+    key chunks that keep locks short.
+    """
+    rows = rows_of_month(month)
+    if month in list_partitions():
+        # Index rows go first, in chunks, while the month's ids can still be
+        # read from its partition
+        last_id = 0
+        while True:
+            ids = list(
+                rows.filter(id__gt=last_id)
+                .order_by("id")
+                .values_list("id", flat=True)[:chunk_size]
+            )
+            if not ids:
+                break
+            audit_search_index.remove(ids)
+            last_id = ids[-1]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"ALTER TABLE {connection.ops.quote_name(AuditLog._meta.db_table)} "
+                f"DROP PARTITION {partition_name(month)}"
+            )
+        return
+
+    while True:
+        ids = list(rows.order_by("id").values_list("id", flat=True)[:chunk_size])
+        if not ids:
+            return
+        with transaction.atomic():
+            AuditLog.objects.filter(id__in=ids).delete()
+            audit_search_index.remove(ids)
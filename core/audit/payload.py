@@ -0,0 +1,172 @@
+# core/audit/payload.py
+
+import base64
+import hashlib
+import json
+import re
+import zlib
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+
+try:
+    import zstandard
+except ImportError:  # Optional, zlib is used instead
+    zstandard = None
+
+REDACTED = "[REDACTED]"
+DEFAULT_REDACT_KEYS = (
+    "password",
+    "passwd",
+    "secret",
+    "token",
+    "authorization",
+    "cookie",
+    "csrf",
+    "api_key",
+    "apikey",
+    "private_key",
+)
+# Marker key of a compressed detail stored in the JSON column
+COMPRESSED_KEY = "_compressed"
+
+
+class PayloadPolicy:
+    """
+    Shrink an audit ``detail`` before it is stored.
+
+    - values under keys containing one of ``redact_keys`` become ``[REDACTED]``
+    - strings longer than ``max_length`` keep a prefix, their length and a
+      SHA-256, so equal values can still be matched
+    - lists keep ``max_items`` items and nesting stops at ``max_depth``
+    - with ``compression`` (``"zlib"`` or ``"zstd"``) a result larger than
+      ``compress_min_bytes`` is stored compressed; ``decode_detail`` reverses it
+    """
+
+    def __init__(
+        self,
+        redact_keys=DEFAULT_REDACT_KEYS,
+        max_length=256,
+        max_items=20,
+        max_depth=4,
+        compression=None,
+        compress_min_bytes=1024,
+    ):
+        self.redact_pattern = re.compile(
+            "|".join(re.escape(key) for key in redact_keys), re.IGNORECASE
+        )
+        self.max_length = max_length
+        self.max_items = max_items
+        self.max_depth = max_depth
+        if compression == "zstd" and zstandard is None:
+            compression = "zlib"
+        self.compression = compression
+        self.compress_min_bytes = compress_min_bytes
+
+    @classmethod
+    def from_settings(cls):
+        return cls(
+            redact_keys=getattr(settings, "AUDIT_REDACT_KEYS", DEFAULT_REDACT_KEYS),
+            max_length=getattr(settings, "AUDIT_MAX_VALUE_LENGTH", 256),
+            max_items=getattr(settings, "AUDIT_MAX_ITEMS", 20),
+            max_depth=getattr(settings, "AUDIT_MAX_DEPTH", 4),
+            compression=getattr(settings, "AUDIT_DETAIL_COMPRESSION", None),
+            compress_min_bytes=getattr(settings, "AUDIT_COMPRESS_MIN_BYTES", 1024),
+        )
+
+    def is_secret(self, key):
+        return bool(self.redact_pattern.search(str(key)))
+
+    def clean(self, value, depth=0):
+        """Redacted and truncated copy of ``value``, made JSON-safe."""
+        if isinstance(value, dict) or hasattr(value, "items"):
+            if depth >= self.max_depth:
+                return {"omitted_keys": len(value)}
+            return {
+                str(key): (
+                    REDACTED if self.is_secret(key) else self.clean(item, depth + 1)
+                )
+                for key, item in value.items()
+            }
+        if isinstance(value, (list, tuple)):
+            if depth >= self.max_depth:
+                return {"omitted_items": len(value)}
+            items = [self.clean(item, depth + 1) for item in value[: self.max_items]]
+            if len(value) > self.max_items:
+                items.append({"omitted_items": len(value) - self.max_items})
+            return items
+        if value is None or isinstance(value, (bool, int, float)):
+            return value
+        if not isinstance(value, str):
+            value = json.loads(json.dumps(value, cls=DjangoJSONEncoder, default=str))
+            if not isinstance(value, str):
+                return value
+        if len(value) > self.max_length:
+            return {
+                "truncated": value[: self.max_length // 4],
+                "length": len(value),
+                "sha256": hashlib.sha256(value.encode()).hexdigest(),
+            }
+        return value
+
+    def diff(self, before, after):
+        """``{field: [old, new]}`` for the keys whose value changed."""
+        changes = {}
+        for key in sorted(set(before) | set(after), key=str):
+            old, new = before.get(key), after.get(key)
+            if old == new:
+                continue
+            if self.is_secret(key):
+                changes[str(key)] = REDACTED
+            else:
+                changes[str(key)] = [self.clean(old, 1), self.clean(new, 1)]
+        return changes
+
+    def encode(self, detail):
+        """Compress ``detail`` if configured and worth it."""
+        if not self.compression:
+            return detail
+        raw = json.dumps(detail, separators=(",", ":"), ensure_ascii=False).encode()
+        if len(raw) < self.compress_min_bytes:
+            return detail
+        if self.compression == "zstd":
+            compressed = zstandard.ZstdCompressor(level=9).compress(raw)
+        else:
+            compressed = zlib.compress(raw, 9)
+        if len(compressed) * 4 // 3 >= len(raw):
+            return detail  # Base64 would eat the gain
+        return {
+            COMPRESSED_KEY: self.compression,
+            "data": base64.b64encode(compressed).decode("ascii"),
+        }
+
+    def build(self, detail):
+        """Compact and, if configured, compress ``detail``."""
+        return self.encode(self.clean(detail))
+
+
+def decode_detail(detail):
+    """Stored ``detail`` back as plain JSON, whether compressed or not."""
+    if not isinstance(detail, dict) or COMPRESSED_KEY not in detail:
+        return detail
+    compressed = base64.b64decode(detail["data"])
+    if detail[COMPRESSED_KEY] == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read this audit detail")
+        raw = zstandard.ZstdDecompressor().decompress(compressed)
+    else:
+        raw = zlib.decompress(compressed)
+    return json.loads(raw)
+
+
+def response_summary(response):
+    """The parts of a response worth auditing: status, code and message."""
+    data = getattr(response, "data", None)
+    summary = {"status_code": response.status_code}
+    if isinstance(data, dict):
+        for key in ("code", "message"):
+            if key in data:
+                summary[key] = data[key]
+        if isinstance(data.get("data"), dict) and "id" in data["data"]:
+            summary["id"] = data["data"]["id"]
+    return summary
@@ -0,0 +1,187 @@
+# core/audit/retention.py
+
+import threading
+import time
+
+from django.db import connection, connections, transaction
+from django.db.models import Max, Min
+
+from core.logging.utils import get_logger
+from .archive import archive_files
+from .models import AuditLog
+from .partitions import add_months, month_range, month_start
+from .search import audit_search_index
+
+logger = get_logger(__name__)
+
+
+def replication_lag(aliases):
+    """
+    Largest lag in seconds of the MySQL replicas behind ``aliases``, ``None``
+    when none of them reports one. A replica whose replication stopped
+    counts as infinitely behind.
+    """
+    lags = []
+    for alias in aliases:
+        replica = connections[alias]
+        if replica.vendor != "mysql":
+            continue
+        with replica.cursor() as cursor:
+            try:
+                cursor.execute("SHOW REPLICA STATUS")
+            except Exception:  # MySQL before 8.0.22
+                cursor.execute("SHOW SLAVE STATUS")
+            columns = [column[0] for column in cursor.description or ()]
+            for row in cursor.fetchall():
+                status = dict(zip(columns, row))
+                lag = status.get(
+                    "Seconds_Behind_Source", status.get("Seconds_Behind_Master")
+                )
+                lags.append(float("inf") if lag is None else lag)
+    return max(lags, default=None)
+
+
+def lock_wait():
+    """Seconds the longest waiting InnoDB transaction has waited for a lock."""
+    if connection.vendor != "mysql":
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT MAX(TIMESTAMPDIFF(SECOND, trx_wait_started, NOW())) "
+            "FROM information_schema.INNODB_TRX WHERE trx_state = 'LOCK WAIT'"
+        )
+        return cursor.fetchone()[0]
+
+
+def archived_cutoff(cutoff, archive_dir):
+    """
+    ``cutoff``, moved back to the start of the oldest month before it that
+    still holds rows but has no archive in ``archive_dir``, so a purge never
+    deletes rows ``archive_audit_logs`` has not written yet.
+    """
+    oldest = AuditLog.objects.filter(timestamp__lt=cutoff).aggregate(
+        oldest=Min("timestamp")
+    )["oldest"]
+    if oldest is None:
+        return cutoff
+    archived = {month for month, _ in archive_files(archive_dir)}
+    month = month_start(oldest)
+    while month <= month_start(cutoff):
+        start, end = month_range(month)
+        if (
+            month not in archived
+            and AuditLog.objects.filter(
+                timestamp__gte=start, timestamp__lt=min(end, cutoff)
+            ).exists()
+        ):
+            return start
+        month = add_months(month, 1)
+    return cutoff
+
+
+class AuditPurger:
+    """
+    Delete audit rows older than ``cutoff`` in primary key order, ``chunk_size``
+    rows per transaction with ``sleep`` seconds between chunks.
+
+    Before each chunk it waits while a replica in ``replicas`` lags more than
+    ``max_lag`` seconds or a transaction has waited more than
+    ``max_lock_wait`` seconds for a lock, so the purge never adds to either.
+    Deleted rows are gone for good, so a stopped purge simply starts again;
+    ``after_id`` skips the ids a previous run already went through.
+    """
+
+    def __init__(
+        self,
+        cutoff,
+        chunk_size=1000,
+        sleep=0.1,
+        replicas=(),
+        max_lag=5,
+        max_lock_wait=2,
+        after_id=0,
+    ):
+        self.cutoff = cutoff
+        self.chunk_size = chunk_size
+        self.sleep = sleep
+        self.replicas = replicas
+        self.max_lag = max_lag
+        self.max_lock_wait = max_lock_wait
+        self.last_id = after_id
+        self.deleted = 0
+        # Highest expired id, looked up once: later rows are never expired
+        self.max_id = None
+
+    def throttle(self, stop):
+        """Wait until replication and lock waits are below their limits."""
+        delay = max(self.sleep, 0.5)
+        while not stop.is_set():
+            lag = replication_lag(self.replicas)
+            waited = lock_wait()
+            if (lag is None or lag <= self.max_lag) and (
+                waited is None or waited <= self.max_lock_wait
+            ):
+                return
+            logger.warning(
+                "Audit purge throttled",
+                extra={"replication_lag": lag, "lock_wait": waited, "delay": delay},
+            )
+            stop.wait(delay)
+            delay = min(delay * 2, 30)
+
+    def expired_ids(self):
+        if self.max_id is None:
+            self.max_id = (
+                AuditLog.objects.filter(timestamp__lt=self.cutoff).aggregate(
+                    max_id=Max("id")
+                )["max_id"]
+                or 0
+            )
+        if self.last_id >= self.max_id:
+            return []
+        # The bound keeps the probe for the last chunk off the live rows
+        return list(
+            AuditLog.objects.filter(
+                id__gt=self.last_id, id__lte=self.max_id, timestamp__lt=self.cutoff
+            )
+            .order_by("id")
+            .values_list("id", flat=True)[: self.chunk_size]
+        )
+
+    def delete_chunk(self):
+        """Delete the next chunk; returns the number of rows deleted."""
+        ids = self.expired_ids()
+        if not ids:
+            return 0
+        with transaction.atomic():
+            AuditLog.objects.filter(id__in=ids).delete()
+            audit_search_index.remove(ids)
+        self.last_id = ids[-1]
+        self.deleted += len(ids)
+        return len(ids)
+
+    def run(self, progress=None, stop=None):
+        """
+        Purge until no expired row is left or ``stop`` is set. ``progress``
+        is called with the purger after every chunk. Returns the rows deleted.
+        """
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            self.throttle(stop)
+            if stop.is_set():
+                break
+            started = time.monotonic()
+            if not self.delete_chunk():
+                break
+            if progress:
+                progress(self)
+            logger.info(
+                "Audit purge chunk deleted",
+                extra={
+                    "last_id": self.last_id,
+                    "deleted": self.deleted,
+                    "seconds": round(time.monotonic() - started, 3),
+                },
+            )
+            stop.wait(self.sleep)
+        return self.deleted
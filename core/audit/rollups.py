@@ -0,0 +1,104 @@
+# core/audit/rollups.py
+
+from collections import Counter
+from datetime import timedelta, timezone as dt_timezone
+
+from django.db import connection, transaction
+from django.db.models import Count
+from django.db.models.functions import TruncHour
+
+from .models import AuditLog, AuditRollup
+
+PERIODS = ("hour", "day")
+DIMENSIONS = ("module", "action", "status", "username")
+KEY_COLUMNS = ("period", "bucket") + DIMENSIONS
+
+
+def bucket_start(timestamp, period):
+    """Start of the UTC hour or day ``timestamp`` falls in."""
+    timestamp = timestamp.astimezone(dt_timezone.utc)
+    if period == "day":
+        return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+    return timestamp.replace(minute=0, second=0, microsecond=0)
+
+
+def count_entries(entries):
+    """``Counter`` of rollup keys for audit entries (dicts of field values)."""
+    counts = Counter()
+    for entry in entries:
+        dimensions = tuple(
+            entry.get(name) if name != "status" else bool(entry.get(name, True))
+            for name in DIMENSIONS
+        )
+        for period in PERIODS:
+            counts[(period, bucket_start(entry["timestamp"], period)) + dimensions] += 1
+    return counts
+
+
+def upsert_sql(table, rows):
+    """Multi-row insert that adds to the count of rows that already exist."""
+    quote = connection.ops.quote_name
+    columns = ", ".join(quote(name) for name in KEY_COLUMNS + ("count",))
+    values = ", ".join(["(" + ", ".join(["%s"] * (len(KEY_COLUMNS) + 1)) + ")"] * rows)
+    count = quote("count")
+    insert = f"INSERT INTO {quote(table)} ({columns}) VALUES {values}"
+    if connection.vendor == "mysql":
+        return f"{insert} ON DUPLICATE KEY UPDATE {count} = {count} + VALUES({count})"
+    conflict = ", ".join(quote(name) for name in KEY_COLUMNS)
+    return (
+        f"{insert} ON CONFLICT ({conflict}) "
+        f"DO UPDATE SET {count} = {quote(table)}.{count} + excluded.{count}"
+    )
+
+
+def add_to_rollups(counts):
+    """
+    Add ``counts`` to the rollup rows with one upsert per batch. Keys are
+    written in sorted order so concurrent writers lock rows in the same
+    order and cannot deadlock each other.
+    """
+    if not counts:
+        return
+    keys = sorted(counts, key=lambda key: tuple(str(part) for part in key))
+    table = AuditRollup._meta.db_table
+    with connection.cursor() as cursor:
+        for start in range(0, len(keys), 500):
+            batch = keys[start : start + 500]
+            params = []
+            for key in batch:
+                period, bucket, *dimensions = key
+                bucket = connection.ops.adapt_datetimefield_value(bucket)
+                params.extend([period, bucket, *dimensions, counts[key]])
+            cursor.execute(upsert_sql(table, len(batch)), params)
+
+
+def rebuild_rollups(start, end):
+    """
+    Recompute the rollups of the UTC days in ``[start, end)`` from the audit
+    table, one day per transaction. Returns the number of days rebuilt.
+
+    Events recorded for a day while it is rebuilt may be counted twice or
+    not at all, so rebuild past days or quiet periods.
+    """
+    day = bucket_start(start, "day")
+    days = 0
+    while day < end:
+        next_day = day + timedelta(days=1)
+        hourly = (
+            AuditLog.objects.filter(timestamp__gte=day, timestamp__lt=next_day)
+            .annotate(hour=TruncHour("timestamp", tzinfo=dt_timezone.utc))
+            .values("hour", *DIMENSIONS)
+            .annotate(total=Count("id"))
+            .order_by()
+        )
+        counts = Counter()
+        for row in hourly:
+            dimensions = tuple(row[name] for name in DIMENSIONS)
+            counts[("hour", row["hour"]) + dimensions] += row["total"]
+            counts[("day", day) + dimensions] += row["total"]
+        with transaction.atomic():
+            AuditRollup.objects.filter(bucket__gte=day, bucket__lt=next_day).delete()
+            add_to_rollups(counts)
+        day = next_day
+        days += 1
+    return days
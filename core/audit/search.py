@@ -0,0 +1,12 @@
+# core/audit/search.py
+
+from core.search import FullTextIndex
+
+# Backs the "search" box of AuditLogViewSet. A table of its own on MySQL:
+# the partitioned audit table cannot hold a FULLTEXT index
+audit_search_index = FullTextIndex(
+    "core.AuditLog",
+    fields=["message", "resource_type", "resource_id"],
+    name="core_auditlog_search",
+    separate_table=True,
+)
@@ -1,11 +1,17 @@
+from datetime import timedelta
+
+from django.utils import timezone
 from rest_framework import serializers
-from .models import AuditLog
+
+from core.serializers import SparseFieldsMixin
+from .models import AuditLog, AuditRollup
+from .payload import decode_detail
 
 
-class AuditLogSerializer(serializers.ModelSerializer):
-    username = serializers.CharField(source="user.username", read_only=True)
+class AuditLogSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     # Convert GenericIPAddressField to CharField to avoid validation issues
     ip_address = serializers.CharField(allow_null=True)
+    detail = serializers.SerializerMethodField()
 
     class Meta:
         model = AuditLog
@@ -25,6 +31,9 @@ class AuditLogSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = fields
 
+    def get_detail(self, obj):
+        return decode_detail(obj.detail)
+
 
 class AuditLogFilterSerializer(serializers.Serializer):
     start_date = serializers.DateTimeField(required=False)
@@ -32,4 +41,61 @@ class AuditLogFilterSerializer(serializers.Serializer):
     user = serializers.CharField(required=False)
     action = serializers.ChoiceField(choices=AuditLog.ACTION_CHOICES, required=False)
     module = serializers.ChoiceField(choices=AuditLog.MODULE_CHOICES, required=False)
+    resource_type = serializers.CharField(required=False)
+    resource_id = serializers.CharField(required=False)
     search = serializers.CharField(required=False)
+
+
+class AuditLogExportFilterSerializer(AuditLogFilterSerializer):
+    """
+    List filters plus the ``(timestamp, id)`` of the last row already
+    received, to resume an interrupted export after it.
+    """
+
+    after_timestamp = serializers.DateTimeField(required=False)
+    after_id = serializers.IntegerField(required=False, min_value=0)
+
+    def validate(self, data):
+        if ("after_timestamp" in data) != ("after_id" in data):
+            raise serializers.ValidationError(
+                "after_timestamp and after_id must be given together"
+            )
+        return data
+
+
+class AuditStatsFilterSerializer(serializers.Serializer):
+    # Longest range a single stats request may cover, per period
+    max_buckets = {"hour": 24 * 31, "day": 366 * 3}
+
+    period = serializers.ChoiceField(
+        choices=AuditRollup.PERIOD_CHOICES, required=False, default="day"
+    )
+    start_date = serializers.DateTimeField(required=False)
+    end_date = serializers.DateTimeField(required=False)
+    module = serializers.ChoiceField(choices=AuditLog.MODULE_CHOICES, required=False)
+    action = serializers.ChoiceField(choices=AuditLog.ACTION_CHOICES, required=False)
+    status = serializers.ChoiceField(choices=["true", "false"], required=False)
+    user = serializers.CharField(required=False)
+    group_by = serializers.CharField(required=False, default="")
+
+    def validate_group_by(self, value):
+        dimensions = [name.strip() for name in value.split(",") if name.strip()]
+        unknown = set(dimensions) - {"module", "action", "status", "username"}
+        if unknown:
+            raise serializers.ValidationError(
+                f"Cannot group by: {', '.join(sorted(unknown))}"
+            )
+        return dimensions
+
+    def validate(self, data):
+        step = timedelta(hours=1) if data["period"] == "hour" else timedelta(days=1)
+        end = data.get("end_date") or timezone.now()
+        start = data.get("start_date") or end - step * (
+            48 if data["period"] == "hour" else 30
+        )
+        if start >= end:
+            raise serializers.ValidationError("start_date must be before end_date")
+        if (end - start) / step > self.max_buckets[data["period"]]:
+            raise serializers.ValidationError("Date range is too long for this period")
+        data["start_date"], data["end_date"] = start, end
+        return data
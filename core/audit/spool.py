@@ -0,0 +1,338 @@
+# core/audit/spool.py
+
+import atexit
+import os
+import socket
+import struct
+import threading
+import time
+import zlib
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.utils import timezone
+
+from core.logging.utils import get_logger
+from .models import AuditSpoolOffset
+from .writer import dump_entry, load_entry, persist_audit_entries
+
+logger = get_logger(__name__)
+
+# Record layout: payload length and CRC-32 of the payload, both unsigned
+# big-endian 32-bit, followed by the JSON payload
+RECORD_HEADER = struct.Struct(">II")
+OPEN_SUFFIX = ".open"
+SEGMENT_SUFFIX = ".seg"
+
+
+class SpoolCorruptError(Exception):
+    """A record in a spool segment fails its checksum."""
+
+
+def encode_record(entry):
+    payload = dump_entry(entry).encode("utf-8")
+    return RECORD_HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+def read_records(f, offset, limit=None):
+    """
+    Yield ``(end_offset, entry)`` for the complete records after ``offset``.
+
+    A record cut short at the end of the file is still being written and
+    ends the iteration; a checksum mismatch raises ``SpoolCorruptError``.
+    """
+    f.seek(offset)
+    count = 0
+    while limit is None or count < limit:
+        header = f.read(RECORD_HEADER.size)
+        if len(header) < RECORD_HEADER.size:
+            return
+        length, checksum = RECORD_HEADER.unpack(header)
+        payload = f.read(length)
+        if len(payload) < length:
+            return
+        if zlib.crc32(payload) != checksum:
+            raise SpoolCorruptError(f"Bad checksum at offset {offset}")
+        offset += RECORD_HEADER.size + length
+        count += 1
+        yield offset, load_entry(payload)
+
+
+class SpoolWriter:
+    """
+    Append audit entries to local segment files.
+
+    Each process writes its own ``<host>-<pid>-<start>.open`` segment with
+    one ``write()`` per record, so a request only pays for a buffered
+    append. ``fsync`` is batched: a flusher thread syncs pending writes
+    within ``fsync_interval`` seconds, so a crash of the machine (not of the
+    process) can lose that window. The flusher also touches the open
+    segment every ``heartbeat_interval`` seconds, the lease loaders on other
+    hosts check before taking it over. Segments are renamed to ``.seg`` once
+    they reach ``segment_bytes`` and are then owned by the loader.
+    """
+
+    def __init__(
+        self,
+        spool_dir,
+        segment_bytes=64 * 1024 * 1024,
+        fsync_interval=0.2,
+        heartbeat_interval=60,
+    ):
+        self.spool_dir = str(spool_dir)
+        self.segment_bytes = segment_bytes
+        self.fsync_interval = fsync_interval
+        self.heartbeat_interval = heartbeat_interval
+        self._lock = threading.Lock()
+        self._fd = None
+        self._pid = None
+        self._path = None
+        self._size = 0
+        self._dirty = False
+        self._touched_at = 0
+        self._flusher = None
+        self._closed = threading.Event()
+
+    def _open(self):
+        os.makedirs(self.spool_dir, exist_ok=True)
+        self._pid = os.getpid()
+        name = f"{socket.gethostname()}-{self._pid}-{time.time_ns()}{OPEN_SUFFIX}"
+        self._path = os.path.join(self.spool_dir, name)
+        self._fd = os.open(self._path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o600)
+        self._size = 0
+        self._touched_at = time.monotonic()
+        if not (self._flusher and self._flusher.is_alive()):
+            # Threads do not survive a fork, each process starts its own
+            self._flusher = threading.Thread(
+                target=self._flush_loop, name="audit-spool-flusher", daemon=True
+            )
+            self._flusher.start()
+
+    def append(self, entry):
+        record = encode_record(entry)
+        with self._lock:
+            if self._fd is None or self._pid != os.getpid():
+                # A forked worker must not share its parent's segment
+                self._open()
+            os.write(self._fd, record)
+            self._size += len(record)
+            # Synced by the flusher, never on the request thread
+            self._dirty = True
+            if self._size >= self.segment_bytes:
+                self._seal()
+
+    def _flush_loop(self):
+        pid = os.getpid()
+        while not self._closed.wait(self.fsync_interval):
+            fd = None
+            with self._lock:
+                if self._fd is None or self._pid != pid:
+                    continue
+                if self._dirty:
+                    # A duplicate is synced outside the lock, so appends go
+                    # on meanwhile and a seal cannot close it underneath
+                    fd = os.dup(self._fd)
+                    self._dirty = False
+                if time.monotonic() - self._touched_at >= self.heartbeat_interval:
+                    os.utime(self._path)
+                    self._touched_at = time.monotonic()
+            if fd is not None:
+                try:
+                    os.fsync(fd)
+                finally:
+                    os.close(fd)
+
+    def _seal(self):
+        os.fsync(self._fd)
+        os.close(self._fd)
+        os.replace(self._path, self._path[: -len(OPEN_SUFFIX)] + SEGMENT_SUFFIX)
+        self._fd = None
+        self._dirty = False
+
+    def close(self):
+        with self._lock:
+            if self._fd is not None and self._pid == os.getpid():
+                self._seal()
+            self._closed.set()
+
+
+def segment_id(name):
+    """
+    Segment name without its state suffix; offsets are stored under it so
+    they survive the ``.open`` -> ``.seg`` rename.
+    """
+    return name.rsplit(".", 1)[0]
+
+
+def segment_owner(name):
+    """``(host, pid)`` of the process that wrote segment ``name``."""
+    host, pid, _ = segment_id(name).rsplit("-", 2)
+    return host, int(pid)
+
+
+def is_abandoned(path, lease=600):
+    """
+    An open segment whose writer is gone: its process no longer runs on this
+    host or, for a segment of another host (a shared spool directory), its
+    writer has not touched it for ``lease`` seconds.
+    """
+    host, pid = segment_owner(os.path.basename(path))
+    if host != socket.gethostname():
+        try:
+            return time.time() - os.path.getmtime(path) > lease
+        except FileNotFoundError:
+            return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return True
+    except PermissionError:
+        pass
+    return False
+
+
+class SpoolLoader:
+    """
+    Move spooled entries into ``AuditLog`` exactly once.
+
+    The byte offset loaded so far is kept per segment (by ``segment_id``) in
+    ``AuditSpoolOffset``. Each batch locks that row, reads the records after
+    it, inserts them and advances it in the same transaction, so a crash
+    repeats nothing and concurrent loaders never load a record twice.
+    Fully loaded sealed segments are deleted.
+    """
+
+    def __init__(self, spool_dir, batch_size=1000, lease=600):
+        self.spool_dir = str(spool_dir)
+        self.batch_size = batch_size
+        self.lease = lease
+
+    def segments(self):
+        if not os.path.isdir(self.spool_dir):
+            return []
+        return sorted(
+            name
+            for name in os.listdir(self.spool_dir)
+            if name.endswith(OPEN_SUFFIX) or name.endswith(SEGMENT_SUFFIX)
+        )
+
+    def run_once(self):
+        """Load everything spooled so far; returns the number of entries."""
+        loaded = 0
+        for name in self.segments():
+            path = os.path.join(self.spool_dir, name)
+            if name.endswith(OPEN_SUFFIX) and is_abandoned(path, self.lease):
+                # The writer died before sealing it, nothing will append
+                name = self.seal(name)
+            try:
+                loaded += self.load_segment(name)
+            except FileNotFoundError:
+                # Sealed or finished by another loader meanwhile
+                continue
+            except SpoolCorruptError as e:
+                logger.error(
+                    "Audit spool segment is corrupt",
+                    extra={"segment": name, "error": str(e)},
+                )
+                path = os.path.join(self.spool_dir, name)
+                os.replace(path, f"{path}.corrupt")
+        self.forget_removed_segments()
+        return loaded
+
+    def forget_removed_segments(self, age=timedelta(days=1)):
+        """Drop offsets of segments removed more than ``age`` ago."""
+        present = {segment_id(name) for name in self.segments()}
+        stale = AuditSpoolOffset.objects.filter(
+            update_time__lt=timezone.now() - age
+        ).values_list("segment", flat=True)
+        removed = [segment for segment in stale if segment not in present]
+        if removed:
+            AuditSpoolOffset.objects.filter(segment__in=removed).delete()
+
+    def seal(self, name):
+        sealed = segment_id(name) + SEGMENT_SUFFIX
+        try:
+            os.replace(
+                os.path.join(self.spool_dir, name),
+                os.path.join(self.spool_dir, sealed),
+            )
+        except FileNotFoundError:
+            pass
+        return sealed
+
+    def load_segment(self, name):
+        path = os.path.join(self.spool_dir, name)
+        key = segment_id(name)
+        loaded = 0
+        with open(path, "rb") as f:
+            while True:
+                with transaction.atomic():
+                    AuditSpoolOffset.objects.get_or_create(segment=key)
+                    state = AuditSpoolOffset.objects.select_for_update().get(
+                        segment=key
+                    )
+                    batch = list(read_records(f, state.offset, self.batch_size))
+                    if not batch:
+                        break
+                    persist_audit_entries([entry for _, entry in batch])
+                    state.offset = batch[-1][0]
+                    state.save(update_fields=["offset", "update_time"])
+                loaded += len(batch)
+
+        if name.endswith(SEGMENT_SUFFIX) and state.offset >= os.path.getsize(path):
+            # The offset row stays: a loader that opened the file before
+            # this removal then still finds nothing left to load
+            os.remove(path)
+        if loaded:
+            logger.info(
+                "Audit spool loaded", extra={"segment": name, "entry_count": loaded}
+            )
+        return loaded
+
+    def run_forever(self, interval=1.0, stop=None):
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            close_old_connections()
+            try:
+                loaded = self.run_once()
+            except Exception as e:
+                loaded = 0
+                logger.error("Audit spool load failed", extra={"error": str(e)})
+            if not loaded:
+                stop.wait(interval)
+        connection.close()
+
+
+_writer = None
+_loader_thread = None
+_spool_lock = threading.Lock()
+
+
+def get_spool_writer():
+    global _writer, _loader_thread
+    with _spool_lock:
+        if _writer is None:
+            _writer = SpoolWriter(
+                settings.AUDIT_SPOOL_DIR,
+                segment_bytes=getattr(settings, "AUDIT_SPOOL_SEGMENT_BYTES", 64 << 20),
+                fsync_interval=getattr(settings, "AUDIT_SPOOL_FSYNC_MS", 200) / 1000,
+                heartbeat_interval=getattr(settings, "AUDIT_SPOOL_LEASE_SECONDS", 600)
+                / 10,
+            )
+            atexit.register(_writer.close)
+        if getattr(settings, "AUDIT_SPOOL_LOADER_THREAD", False) and not (
+            _loader_thread and _loader_thread.is_alive()
+        ):
+            loader = SpoolLoader(
+                settings.AUDIT_SPOOL_DIR,
+                batch_size=getattr(settings, "AUDIT_SPOOL_LOAD_BATCH_SIZE", 1000),
+                lease=getattr(settings, "AUDIT_SPOOL_LEASE_SECONDS", 600),
+            )
+            _loader_thread = threading.Thread(
+                target=loader.run_forever,
+                name="audit-spool-loader",
+                daemon=True,
+            )
+            _loader_thread.start()
+        return _writer
@@ -1,10 +1,15 @@
 from functools import wraps
-from .models import AuditLog
+from .payload import PayloadPolicy, response_summary
+from .writer import record_audit
 
 
 def audit_log(module, resource_type):
     """
     Decorator to automatically log audit events for views
+
+    The stored detail goes through ``PayloadPolicy``: secrets are redacted
+    and large values truncated. Field-level diffs of the rows a view changes
+    are recorded separately by ``core.audit.capture``.
     """
 
     def decorator(func):
@@ -56,20 +61,21 @@ def audit_log(module, resource_type):
                     else:
                         message = f"Failed to {method_to_action[request.method].lower()} {resource_type}: {response.data.get('message', '')}"
 
-                    AuditLog.objects.create(
-                        user=request.user if request.user.is_authenticated else None,
+                    record_audit(
+                        user=request.user,
                         username=username,
                         user_email=user_email,
                         action=method_to_action[request.method],
                         module=module,
                         resource_type=resource_type,
                         resource_id=str(resource_id),
-                        detail={
-                            "request_data": request.data,
-                            "response_data": getattr(response, "data", None),
-                            "params": request.query_params.dict(),
-                            "status_code": response.status_code,
-                        },
+                        detail=PayloadPolicy.from_settings().build(
+                            {
+                                "request_data": request.data,
+                                "response": response_summary(response),
+                                "params": request.query_params.dict(),
+                            }
+                        ),
                         ip_address=request.META.get("REMOTE_ADDR"),
                         status=True,
                         message=message,
@@ -88,19 +94,21 @@ def audit_log(module, resource_type):
                     request.user.email if hasattr(request.user, "email") else None
                 )
 
-                AuditLog.objects.create(
-                    user=request.user if request.user.is_authenticated else None,
+                record_audit(
+                    user=request.user,
                     username=username,
                     user_email=user_email,
                     action=method_to_action.get(request.method, "ERROR"),
                     module=module,
                     resource_type=resource_type,
                     resource_id=kwargs.get("pk", "N/A"),
-                    detail={
-                        "request_data": request.data,
-                        "error": str(e),
-                        "params": request.query_params.dict(),
-                    },
+                    detail=PayloadPolicy.from_settings().build(
+                        {
+                            "request_data": request.data,
+                            "error": str(e),
+                            "params": request.query_params.dict(),
+                        }
+                    ),
                     ip_address=request.META.get("REMOTE_ADDR"),
                     status=False,
                     message=f"Failed to {method_to_action.get(request.method, '').lower()} {resource_type}: {str(e)}",
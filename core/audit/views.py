@@ -1,13 +1,80 @@
-from rest_framework import viewsets
+import json
+
+from django.conf import settings
+from django.db.models import Sum
+from rest_framework import status, viewsets
+from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from django.db.models import Q
-from .models import AuditLog
-from .serializers import AuditLogSerializer, AuditLogFilterSerializer
+from rest_framework.views import APIView
+from .models import AuditLog, AuditRollup
+from .rollups import bucket_start
+from .serializers import (
+    AuditLogSerializer,
+    AuditLogExportFilterSerializer,
+    AuditLogFilterSerializer,
+    AuditStatsFilterSerializer,
+)
+from core.export import (
+    EXPORT_FORMATS,
+    csv_stream,
+    export_response,
+    iter_queryset_chunks,
+    ndjson_stream,
+)
+from core.logging.utils import get_logger
+from core.pagination import KeysetPagination
+from core.search import prefix_q
+from .search import audit_search_index
 from user.views import CustomPageNumberPagination
 from .permissions import AuditAccessPermission
 
+logger = get_logger(__name__)
+
+
+def filter_audit_logs(queryset, data):
+    """Apply validated ``AuditLogFilterSerializer`` data to ``queryset``."""
+    if start_date := data.get("start_date"):
+        queryset = queryset.filter(timestamp__gte=start_date)
+
+    if end_date := data.get("end_date"):
+        queryset = queryset.filter(timestamp__lte=end_date)
+
+    # Username or email prefix, served by their indexes
+    if user := data.get("user"):
+        queryset = queryset.filter(
+            prefix_q("username", user) | prefix_q("user_email", user)
+        )
+
+    if action := data.get("action"):
+        queryset = queryset.filter(action=action)
+
+    if module := data.get("module"):
+        queryset = queryset.filter(module=module)
+
+    if resource_type := data.get("resource_type"):
+        queryset = queryset.filter(resource_type=resource_type)
+
+    if resource_id := data.get("resource_id"):
+        queryset = queryset.filter(prefix_q("resource_id", resource_id))
+
+    # Full-text over message, resource type and resource id
+    if search := data.get("search"):
+        queryset = audit_search_index.filter(queryset, search)
+    return queryset
+
 
 class AuditLogViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Audit log list and detail.
+
+    The list keeps its numbered pages; ``?cursor=`` (empty for page one)
+    pages by ``(timestamp, id)`` cursors without ``COUNT(*)`` instead. It
+    leaves out ``detail`` unless it is asked for with ``?fields=``; the
+    detail endpoint returns one event in full.
+    """
+
+    # Left out of list responses unless requested in ?fields=
+    list_default_exclude = ("detail",)
     serializer_class = AuditLogSerializer
     permission_classes = [
         IsAuthenticated,
@@ -15,36 +82,189 @@ class AuditLogViewSet(viewsets.ReadOnlyModelViewSet):
     ]  # Easier way to check permissions
     pagination_class = CustomPageNumberPagination
 
+    @property
+    def paginator(self):
+        """Numbered pages unless the client asks for a cursor."""
+        if not hasattr(self, "_paginator"):
+            if KeysetPagination.is_requested(self.request):
+                self._paginator = KeysetPagination()
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
+
+    def get_default_exclude(self):
+        return self.list_default_exclude if self.action == "list" else ()
+
     def get_queryset(self):
         queryset = AuditLog.objects.all()
+        if self.action != "list":
+            return queryset
 
         filters = AuditLogFilterSerializer(data=self.request.query_params)
         filters.is_valid()
+        queryset = filter_audit_logs(queryset, filters.validated_data)
 
-        data = filters.validated_data
+        # ?fields= / ?exclude=; the username is denormalized on the row
+        return self.serializer_class.sparse_queryset(
+            queryset, self.request, self.get_default_exclude()
+        )
 
-        if start_date := data.get("start_date"):
-            queryset = queryset.filter(timestamp__gte=start_date)
+    def get_serializer(self, *args, **kwargs):
+        kwargs.setdefault(
+            "fields",
+            self.serializer_class.get_field_selection(
+                self.request, self.get_default_exclude()
+            ),
+        )
+        return super().get_serializer(*args, **kwargs)
 
-        if end_date := data.get("end_date"):
-            queryset = queryset.filter(timestamp__lte=end_date)
+    def retrieve(self, request, *args, **kwargs):
+        serializer = self.get_serializer(self.get_object())
+        return Response({"code": 200, "message": "Success", "data": serializer.data})
 
-        if user := data.get("user"):
+
+class AuditLogExportView(APIView):
+    """
+    Stream the audit events matching the list filters as NDJSON or CSV,
+    oldest first.
+
+    ``?export_format=ndjson|csv`` selects the encoding and ``?gzip=true``
+    compresses on the fly. Rows are read in ``(timestamp, id)`` keyset
+    chunks, so memory stays flat however long the range is; an interrupted
+    export resumes with the ``timestamp`` and ``id`` of the last row
+    received as ``?after_timestamp=&after_id=``.
+    """
+
+    permission_classes = [IsAuthenticated, AuditAccessPermission]
+
+    def get(self, request):
+        fmt = request.query_params.get("export_format", "ndjson").lower()
+        if fmt not in EXPORT_FORMATS:
+            return Response(
+                {
+                    "code": 400,
+                    "message": "Invalid format. Only NDJSON and CSV are allowed.",
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        compress = request.query_params.get("gzip", "").lower() == "true"
+
+        # An export must not silently widen to more rows than asked for
+        filters = AuditLogExportFilterSerializer(data=request.query_params)
+        if not filters.is_valid():
+            return Response(
+                {
+                    "code": 400,
+                    "message": "Invalid parameters",
+                    "errors": filters.errors,
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        data = filters.validated_data
+
+        queryset = filter_audit_logs(AuditLog.objects.all(), data).order_by(
+            "timestamp", "id"
+        )
+        if "after_id" in data:
+            keyset = KeysetPagination()
+            keyset.ordering = keyset.get_ordering(queryset)
             queryset = queryset.filter(
-                Q(username__icontains=user) | Q(user_email__icontains=user)
+                keyset.build_position_filter(
+                    [data["after_timestamp"], data["after_id"]]
+                )
             )
+        fields = AuditLogSerializer.get_field_selection(request)
+        queryset = AuditLogSerializer.sparse_queryset(queryset, request)
 
-        if action := data.get("action"):
-            queryset = queryset.filter(action=action)
+        chunks = (
+            AuditLogSerializer(logs, many=True, fields=fields).data
+            for logs in iter_queryset_chunks(
+                queryset, getattr(settings, "AUDIT_EXPORT_CHUNK_SIZE", 2000)
+            )
+        )
+        if fmt == "csv":
+            stream = csv_stream(
+                ([self.to_csv_row(row) for row in chunk] for chunk in chunks),
+                [
+                    name
+                    for name in AuditLogSerializer.Meta.fields
+                    if AuditLogSerializer.wants(fields, name)
+                ],
+            )
+        else:
+            stream = ndjson_stream(chunks)
 
-        if module := data.get("module"):
-            queryset = queryset.filter(module=module)
+        logger.info(
+            "Audit export started",
+            extra={"user_id": request.user.id, "format": fmt, "gzip": compress},
+        )
+        return export_response(stream, "audit-logs", fmt, compress=compress)
 
-        if search := data.get("search"):
-            queryset = queryset.filter(
-                Q(message__icontains=search)
-                | Q(resource_type__icontains=search)
-                | Q(resource_id__icontains=search)
+    @staticmethod
+    def to_csv_row(row):
+        row = dict(row)
+        if "detail" in row:
+            row["detail"] = json.dumps(row["detail"], ensure_ascii=False)
+        return row
+
+
+class AuditStatsView(APIView):
+    """
+    Audit event counts per hour or day for dashboards, read from the
+    rollup table rather than the audit log.
+
+    ``?period=hour|day`` with ``start_date``/``end_date`` (default: the last
+    48 hours or 30 days), optional ``module``, ``action``, ``status`` and
+    ``user`` (username prefix) filters, and ``group_by`` as a comma list of
+    ``module``, ``action``, ``status`` and ``username``.
+    """
+
+    permission_classes = [IsAuthenticated, AuditAccessPermission]
+
+    def get(self, request):
+        filters = AuditStatsFilterSerializer(data=request.query_params)
+        if not filters.is_valid():
+            return Response(
+                {
+                    "code": 400,
+                    "message": "Invalid parameters",
+                    "errors": filters.errors,
+                },
+                status=status.HTTP_400_BAD_REQUEST,
             )
+        data = filters.validated_data
+        period = data["period"]
+
+        queryset = AuditRollup.objects.filter(
+            period=period,
+            bucket__gte=bucket_start(data["start_date"], period),
+            bucket__lt=data["end_date"],
+        )
+        if module := data.get("module"):
+            queryset = queryset.filter(module=module)
+        if action := data.get("action"):
+            queryset = queryset.filter(action=action)
+        if "status" in data:
+            queryset = queryset.filter(status=data["status"] == "true")
+        if user := data.get("user"):
+            queryset = queryset.filter(prefix_q("username", user))
 
-        return queryset.select_related("user")
+        group_by = data["group_by"]
+        rows = (
+            queryset.values("bucket", *group_by)
+            .annotate(count=Sum("count"))
+            .order_by("bucket", *group_by)
+        )
+        return Response(
+            {
+                "code": 200,
+                "message": "Success",
+                "data": {
+                    "period": period,
+                    "start": bucket_start(data["start_date"], period),
+                    "end": data["end_date"],
+                    "buckets": list(rows),
+                    "total": sum(row["count"] for row in rows),
+                },
+            }
+        )
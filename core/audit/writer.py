@@ -0,0 +1,346 @@
+# core/audit/writer.py
+
+import atexit
+import glob
+import json
+import os
+import queue
+import threading
+import time
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import close_old_connections, connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from core.logging.utils import get_logger
+from .models import AuditLog
+from .rollups import add_to_rollups, count_entries
+from .search import audit_search_index
+
+logger = get_logger(__name__)
+
+OVERFLOW_POLICIES = ("block", "drop", "spill")
+# Seconds to wait before loading spilled entries again after a failed write
+SPILL_RETRY_DELAY = 5.0
+_STOP = object()
+
+
+def build_entry(user=None, **fields):
+    """
+    Turn audit fields into a plain dict that can be queued or spilled.
+
+    The timestamp is taken now, not when the row is eventually written, and
+    the user is kept as id plus the denormalized username/email.
+    """
+    if user is not None and getattr(user, "is_authenticated", False):
+        fields["user_id"] = user.pk
+        fields.setdefault("username", user.username)
+        fields.setdefault("user_email", user.email)
+    fields.setdefault("timestamp", timezone.now())
+    return fields
+
+
+def insert_audit_logs(logs):
+    """
+    ``bulk_create`` audit logs, one INSERT per ``AUDIT_BATCH_SIZE`` rows, and
+    return them with their primary keys set.
+
+    MySQL returns no ids from bulk inserts, but a multi-row INSERT takes one
+    consecutive block of auto-increment values starting at
+    ``LAST_INSERT_ID()``, spaced by ``auto_increment_increment``.
+    """
+    batch_size = getattr(settings, "AUDIT_BATCH_SIZE", 200)
+    for start in range(0, len(logs), batch_size):
+        batch = logs[start : start + batch_size]
+        AuditLog.objects.bulk_create(batch, batch_size=len(batch))
+        if batch[0].pk is None and connection.vendor == "mysql":
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT LAST_INSERT_ID(), @@auto_increment_increment")
+                first, step = cursor.fetchone()
+            for i, log in enumerate(batch):
+                log.pk = first + i * step
+    return logs
+
+
+def persist_audit_entries(entries):
+    """
+    Insert audit entries, index their messages and add them to the rollups,
+    all in one transaction. Only the new rows are indexed, so concurrent
+    writers never touch each other's index rows.
+    """
+    with transaction.atomic():
+        logs = insert_audit_logs([AuditLog(**entry) for entry in entries])
+        audit_search_index.add(logs)
+        add_to_rollups(count_entries(entries))
+
+
+def dump_entry(entry):
+    return json.dumps(entry, cls=DjangoJSONEncoder, default=str)
+
+
+def load_entry(line):
+    entry = json.loads(line)
+    if isinstance(entry.get("timestamp"), str):
+        entry["timestamp"] = parse_datetime(entry["timestamp"])
+    return entry
+
+
+class AsyncAuditWriter:
+    """
+    Buffer audit entries in a bounded queue and write them in batches.
+
+    A daemon thread ``bulk_create``s the buffer once it holds ``batch_size``
+    entries or ``flush_interval`` seconds after the first one arrived. When
+    the queue is full ``overflow`` decides what ``submit`` does:
+
+    - ``"block"``: wait for room, up to ``block_timeout`` seconds, then drop
+    - ``"drop"``: discard the entry and count it in ``dropped``
+    - ``"spill"``: append it to a JSONL file in ``spill_dir``, loaded again
+      by the flusher once the queue is idle
+
+    ``shutdown()`` (also registered with ``atexit``) drains the queue and
+    the spill file before the process exits.
+    """
+
+    def __init__(
+        self,
+        persist=persist_audit_entries,
+        queue_size=10000,
+        batch_size=200,
+        flush_interval=0.5,
+        overflow="block",
+        block_timeout=None,
+        spill_dir=None,
+    ):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown audit overflow policy: {overflow}")
+        if overflow == "spill" and not spill_dir:
+            raise ValueError("The spill overflow policy needs a spill_dir")
+        self.persist = persist
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.overflow = overflow
+        self.block_timeout = block_timeout
+        self.spill_dir = spill_dir
+        self.dropped = 0
+        self.spilled = 0
+        self.failed = 0
+        self._retry_at = 0
+        self._lock = threading.Lock()
+        self._spill_lock = threading.Lock()
+        self._pid = None
+        self._queue = None
+        self._thread = None
+
+    def _ensure_started(self):
+        # Threads do not survive fork, a preloaded app starts one per worker
+        if self._pid == os.getpid() and self._thread and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._pid == os.getpid() and self._thread and self._thread.is_alive():
+                return
+            if self._pid != os.getpid():
+                self._queue = queue.Queue(maxsize=self.queue_size)
+                self._pid = os.getpid()
+                atexit.register(self.shutdown)
+            self._thread = threading.Thread(
+                target=self._run, name="audit-writer", daemon=True
+            )
+            self._thread.start()
+
+    def submit(self, entry):
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(entry)
+            return
+        except queue.Full:
+            pass
+
+        if self.overflow == "block":
+            try:
+                self._queue.put(entry, timeout=self.block_timeout)
+                return
+            except queue.Full:
+                pass
+        elif self.overflow == "spill":
+            self._spill([entry])
+            return
+
+        with self._lock:
+            self.dropped += 1
+            dropped = self.dropped
+        # Power-of-two sampling keeps a flood of drops out of the logs
+        if dropped & (dropped - 1) == 0:
+            logger.warning(
+                "Audit queue full, entry dropped", extra={"dropped": dropped}
+            )
+
+    def _run(self):
+        buffer = []
+        deadline = None
+        while True:
+            timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+            if deadline is None and self.spilled:
+                # Idle with entries on disk: load them in a moment
+                timeout = max(self._retry_at - time.monotonic(), self.flush_interval)
+            try:
+                entry = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                entry = None
+
+            if entry is _STOP:
+                self._flush(buffer)
+                self._load_spill()
+                connection.close()
+                return
+            if entry is not None:
+                buffer.append(entry)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+                if len(buffer) < self.batch_size and time.monotonic() < deadline:
+                    continue
+
+            if buffer:
+                self._flush(buffer)
+                buffer = []
+                deadline = None
+            elif (
+                self.spilled
+                and self._queue.empty()
+                and time.monotonic() >= self._retry_at
+            ):
+                self._load_spill()
+
+    def _flush(self, entries):
+        if not entries:
+            return
+        close_old_connections()
+        try:
+            self.persist(entries)
+        except Exception as e:
+            self.failed += len(entries)
+            self._retry_at = time.monotonic() + SPILL_RETRY_DELAY
+            logger.error(
+                "Audit batch write failed",
+                extra={"error": str(e), "entry_count": len(entries)},
+            )
+            # Keep the batch if there is somewhere to keep it
+            if self.spill_dir:
+                self._spill(entries)
+
+    def _spill_path(self):
+        return os.path.join(self.spill_dir, f"audit-spill-{os.getpid()}.jsonl")
+
+    def _spill(self, entries):
+        with self._spill_lock:
+            os.makedirs(self.spill_dir, exist_ok=True)
+            with open(self._spill_path(), "a", encoding="utf-8") as f:
+                f.writelines(dump_entry(entry) + "\n" for entry in entries)
+            self.spilled += len(entries)
+
+    def _load_spill(self):
+        if not self.spill_dir:
+            return
+        with self._spill_lock:
+            path = self._spill_path()
+            if not os.path.exists(path):
+                self.spilled = 0
+                return
+            loading = f"{path}.{time.time_ns()}.loading"
+            os.replace(path, loading)
+            self.spilled = 0
+        # A failed batch is spilled to a fresh file and retried later
+        load_spill_file(loading, self._flush, self.batch_size)
+
+    def shutdown(self, timeout=10):
+        """Flush everything queued or spilled; safe to call more than once."""
+        if self._pid != os.getpid() or not self._thread:
+            return
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+        self._thread = None
+
+    def stats(self):
+        return {
+            "queued": self._queue.qsize() if self._queue else 0,
+            "dropped": self.dropped,
+            "spilled": self.spilled,
+            "failed": self.failed,
+        }
+
+
+def load_spill_file(path, persist, batch_size):
+    """Write the entries of a spill file in batches, then remove it."""
+    with open(path, encoding="utf-8") as f:
+        batch = []
+        for line in f:
+            if line.strip():
+                batch.append(load_entry(line))
+            if len(batch) >= batch_size:
+                persist(batch)
+                batch = []
+        if batch:
+            persist(batch)
+    os.remove(path)
+
+
+def spill_files(spill_dir):
+    return sorted(glob.glob(os.path.join(spill_dir, "audit-spill-*.jsonl*")))
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_audit_writer():
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = AsyncAuditWriter(
+                queue_size=getattr(settings, "AUDIT_QUEUE_SIZE", 10000),
+                batch_size=getattr(settings, "AUDIT_BATCH_SIZE", 200),
+                flush_interval=getattr(settings, "AUDIT_FLUSH_INTERVAL_MS", 500) / 1000,
+                overflow=getattr(settings, "AUDIT_OVERFLOW_POLICY", "block"),
+                block_timeout=getattr(settings, "AUDIT_BLOCK_TIMEOUT", None),
+                spill_dir=getattr(settings, "AUDIT_SPILL_DIR", None),
+            )
+        return _writer
+
+
+def shutdown_audit_writer(timeout=10):
+    """Flush pending audit entries, e.g. from a gunicorn ``worker_exit`` hook."""
+    if _writer is not None:
+        _writer.shutdown(timeout)
+
+
+def record_audit(user=None, **fields):
+    """
+    Record one audit entry through the ``AUDIT_PIPELINE``:
+
+    - ``"sync"``: INSERT it right away, inside the request
+    - ``"queue"``: hand it to the batching background writer
+    - ``"spool"``: append it to the local spool; ``SpoolLoader`` (a thread,
+      or the ``load_audit_spool`` command) inserts it later
+    """
+    record_audit_entries([build_entry(user, **fields)])
+
+
+def record_audit_entries(entries):
+    """Record entries made by ``build_entry``; ``"sync"`` inserts them at once."""
+    pipeline = getattr(settings, "AUDIT_PIPELINE", "sync")
+    if pipeline == "queue":
+        writer = get_audit_writer()
+        for entry in entries:
+            writer.submit(entry)
+    elif pipeline == "spool":
+        from .spool import get_spool_writer
+
+        spool = get_spool_writer()
+        for entry in entries:
+            spool.append(entry)
+    elif entries:
+        persist_audit_entries(entries)
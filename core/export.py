@@ -0,0 +1,95 @@
+# core/export.py
+
+import csv
+import io
+import json
+import zlib
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+
+from core.pagination import KeysetPagination
+
+EXPORT_FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "csv": ("text/csv; charset=utf-8", "csv"),
+}
+
+
+def iter_queryset_chunks(queryset, chunk_size=1000):
+    """
+    Yield the rows of ``queryset`` as lists of at most ``chunk_size`` objects.
+
+    Each chunk is a separate keyset query (``WHERE (ordering, id) > last``)
+    rather than one ``iterator()`` cursor: the MySQL drivers buffer the
+    complete result set client side, so only bounded queries keep memory
+    constant. Prefetches on the queryset run once per chunk.
+    """
+    keyset = KeysetPagination()
+    keyset.model = queryset.model
+    keyset.ordering = keyset.get_ordering(queryset)
+    queryset = queryset.order_by(
+        *[("-" if desc else "") + name for name, desc in keyset.ordering]
+    )
+
+    position = None
+    while True:
+        page = queryset
+        if position is not None:
+            page = page.filter(keyset.build_position_filter(position))
+        rows = list(page[:chunk_size])
+        if rows:
+            yield rows
+        if len(rows) < chunk_size:
+            return
+        position = keyset.get_position(rows[-1])
+
+
+def ndjson_stream(chunks):
+    """Encode chunks of dicts as newline-delimited JSON, one write per chunk."""
+    for chunk in chunks:
+        yield "".join(
+            json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False) + "\n"
+            for row in chunk
+        ).encode()
+
+
+def csv_stream(chunks, fieldnames):
+    """Encode chunks of dicts as CSV with a header row."""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fieldnames, extrasaction="ignore")
+    writer.writeheader()
+    for chunk in chunks:
+        writer.writerows(chunk)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def gzip_stream(stream, level=6):
+    """Gzip a byte stream on the fly."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # 31: gzip container
+    for data in stream:
+        compressed = compressor.compress(data)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def export_response(stream, basename, fmt, compress=False):
+    """Wrap an encoded byte stream in a download ``StreamingHttpResponse``."""
+    content_type, extension = EXPORT_FORMATS[fmt]
+    filename = f"{basename}.{extension}"
+    if compress:
+        stream = gzip_stream(stream)
+        content_type = "application/gzip"
+        filename += ".gz"
+
+    response = StreamingHttpResponse(stream, content_type=content_type)
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    response["Cache-Control"] = "no-store"
+    # Let reverse proxies pass chunks through instead of buffering the file
+    response["X-Accel-Buffering"] = "no"
+    return response
@@ -0,0 +1,62 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from core.audit.archive import ArchiveError, archive_month
+from core.audit.partitions import (
+    add_months,
+    ensure_partitions,
+    month_start,
+    months_before,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Archive audit log months older than the retention window to gzipped "
+        "JSONL files, drop them from the database and create the partitions "
+        "of the coming months"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--retention-months",
+            type=int,
+            default=getattr(settings, "AUDIT_RETENTION_MONTHS", 12),
+            help="Months kept in the database, the current one included",
+        )
+        parser.add_argument("--archive-dir", default=str(settings.AUDIT_ARCHIVE_DIR))
+        parser.add_argument("--chunk-size", type=int, default=5000)
+        parser.add_argument(
+            "--months-ahead",
+            type=int,
+            default=3,
+            help="Future months that must have a partition",
+        )
+        parser.add_argument(
+            "--keep",
+            action="store_true",
+            help="Write the archives but keep the rows",
+        )
+
+    def handle(self, *args, **options):
+        added = ensure_partitions(options["months_ahead"])
+        for month in added:
+            self.stdout.write(f"Created partition for {month:%Y-%m}")
+
+        cutoff = add_months(
+            month_start(timezone.now()), 1 - options["retention_months"]
+        )
+        for month in months_before(cutoff):
+            try:
+                rows = archive_month(
+                    month,
+                    options["archive_dir"],
+                    chunk_size=options["chunk_size"],
+                    drop=not options["keep"],
+                )
+            except ArchiveError as e:
+                self.stderr.write(f"Skipped {month:%Y-%m}: {e}")
+                continue
+            verb = "Archived" if options["keep"] else "Archived and dropped"
+            self.stdout.write(f"{verb} {month:%Y-%m} ({rows} rows)")
@@ -0,0 +1,51 @@
+import os
+import re
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.audit.writer import load_spill_file, persist_audit_entries, spill_files
+
+SPILL_PID_PATTERN = re.compile(r"audit-spill-(?P<pid>\d+)\.jsonl")
+
+
+def process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class Command(BaseCommand):
+    help = (
+        "Write audit entries spilled to disk by worker processes that exited "
+        "before loading them"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--include-running",
+            action="store_true",
+            help="Also load files of processes that still run on this host",
+        )
+
+    def handle(self, *args, **options):
+        spill_dir = getattr(settings, "AUDIT_SPILL_DIR", None)
+        if not spill_dir:
+            raise CommandError("AUDIT_SPILL_DIR is not configured")
+
+        for path in spill_files(spill_dir):
+            match = SPILL_PID_PATTERN.search(os.path.basename(path))
+            if (
+                match
+                and not options["include_running"]
+                and process_alive(int(match["pid"]))
+            ):
+                self.stdout.write(f"Skipped {path}, its process is running")
+                continue
+            load_spill_file(path, persist_audit_entries, options["batch_size"])
+            self.stdout.write(f"Loaded {path}")
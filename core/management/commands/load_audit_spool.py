@@ -0,0 +1,46 @@
+import signal
+import threading
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.audit.spool import SpoolLoader
+
+
+class Command(BaseCommand):
+    help = "Insert audit entries from the local spool into the audit log"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=getattr(settings, "AUDIT_SPOOL_LOAD_BATCH_SIZE", 1000),
+        )
+        parser.add_argument(
+            "--follow",
+            action="store_true",
+            help="Keep loading new entries until interrupted",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=1.0,
+            help="Seconds between polls when the spool is empty (with --follow)",
+        )
+
+    def handle(self, *args, **options):
+        loader = SpoolLoader(
+            settings.AUDIT_SPOOL_DIR,
+            options["batch_size"],
+            lease=getattr(settings, "AUDIT_SPOOL_LEASE_SECONDS", 600),
+        )
+        if not options["follow"]:
+            loaded = loader.run_once()
+            self.stdout.write(f"Loaded {loaded} audit entries")
+            return
+
+        stop = threading.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_: stop.set())
+        self.stdout.write(f"Loading audit spool from {settings.AUDIT_SPOOL_DIR}")
+        loader.run_forever(options["interval"], stop)
@@ -0,0 +1,146 @@
+import signal
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from core.audit.models import AuditLog
+from core.audit.partitions import add_months, month_range, month_start
+from core.audit.retention import AuditPurger, archived_cutoff
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete audit rows older than the retention window in small primary "
+        "key chunks, throttled on replication lag and lock waits"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--retention-months",
+            type=int,
+            default=getattr(settings, "AUDIT_PURGE_RETENTION_MONTHS", 24),
+            help="Months kept, the current one included",
+        )
+        parser.add_argument(
+            "--days",
+            type=int,
+            help="Keep this many days instead of whole months",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=getattr(settings, "AUDIT_PURGE_CHUNK_SIZE", 1000),
+        )
+        parser.add_argument(
+            "--sleep-ms",
+            type=int,
+            default=getattr(settings, "AUDIT_PURGE_SLEEP_MS", 100),
+            help="Pause between chunks",
+        )
+        parser.add_argument(
+            "--replica",
+            action="append",
+            dest="replicas",
+            help="Database alias whose replication lag is watched (repeatable)",
+        )
+        parser.add_argument(
+            "--max-lag",
+            type=float,
+            default=getattr(settings, "AUDIT_PURGE_MAX_LAG", 5),
+        )
+        parser.add_argument(
+            "--max-lock-wait",
+            type=float,
+            default=getattr(settings, "AUDIT_PURGE_MAX_LOCK_WAIT", 2),
+        )
+        parser.add_argument(
+            "--after-id",
+            type=int,
+            default=0,
+            help="Resume past the last id reported by an interrupted run",
+        )
+        parser.add_argument(
+            "--archive-dir",
+            default=str(settings.AUDIT_ARCHIVE_DIR),
+            help="Rows of months without an archive here are kept",
+        )
+        parser.add_argument(
+            "--unarchived",
+            action="store_true",
+            help="Also delete months archive_audit_logs has not written yet",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only count the expired rows",
+        )
+        parser.add_argument(
+            "--every",
+            type=float,
+            help="Keep running, purging again every this many seconds",
+        )
+
+    def cutoff(self, options):
+        if options["days"] is not None:
+            cutoff = timezone.now() - timedelta(days=options["days"])
+        else:
+            month = add_months(
+                month_start(timezone.now()), 1 - options["retention_months"]
+            )
+            cutoff = month_range(month)[0]
+        if options["unarchived"]:
+            return cutoff
+        archived = archived_cutoff(cutoff, options["archive_dir"])
+        if archived < cutoff:
+            self.stdout.write(
+                f"Keeping rows from {archived:%Y-%m} on, not archived yet "
+                "(--unarchived deletes them anyway)"
+            )
+        return archived
+
+    def progress(self, purger):
+        self.stdout.write(
+            f"Deleted {purger.deleted} rows, up to id {purger.last_id} "
+            f"(resume with --after-id {purger.last_id})"
+        )
+
+    def handle(self, *args, **options):
+        stop = threading.Event()
+        if options["every"] is not None:
+            for signum in (signal.SIGINT, signal.SIGTERM):
+                signal.signal(signum, lambda *_: stop.set())
+
+        while not stop.is_set():
+            cutoff = self.cutoff(options)
+            if options["dry_run"]:
+                expired = AuditLog.objects.filter(
+                    id__gt=options["after_id"], timestamp__lt=cutoff
+                ).count()
+                self.stdout.write(
+                    f"{expired} audit rows before {cutoff:%Y-%m-%d %H:%M}"
+                )
+                return
+
+            purger = AuditPurger(
+                cutoff,
+                chunk_size=options["chunk_size"],
+                sleep=options["sleep_ms"] / 1000,
+                replicas=options["replicas"]
+                or getattr(settings, "AUDIT_PURGE_REPLICAS", []),
+                max_lag=options["max_lag"],
+                max_lock_wait=options["max_lock_wait"],
+                after_id=options["after_id"],
+            )
+            deleted = purger.run(self.progress, stop)
+            verb = "Stopped after deleting" if stop.is_set() else "Purged"
+            self.stdout.write(
+                f"{verb} {deleted} audit rows before {cutoff:%Y-%m-%d %H:%M}"
+            )
+            if options["every"] is None:
+                return
+            # Later passes start over; rows below the cutoff are gone anyway
+            options["after_id"] = 0
+            stop.wait(options["every"])
@@ -0,0 +1,58 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.timezone import is_naive, make_aware
+
+from core.audit.archive import search_archive
+
+FILTER_FIELDS = (
+    "username",
+    "user_id",
+    "action",
+    "module",
+    "resource_type",
+    "resource_id",
+)
+
+
+def parse_moment(value):
+    moment = parse_datetime(value)
+    if moment is None:
+        day = parse_date(value)
+        if day is None:
+            raise CommandError(f"Invalid date: {value}")
+        moment = parse_datetime(f"{day.isoformat()}T00:00:00")
+    return make_aware(moment) if is_naive(moment) else moment
+
+
+class Command(BaseCommand):
+    help = "Search archived audit logs and print the matches as JSON lines"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--archive-dir", default=str(settings.AUDIT_ARCHIVE_DIR))
+        parser.add_argument("--from", dest="start", help="Date or datetime")
+        parser.add_argument("--to", dest="end", help="Exclusive date or datetime")
+        for field in FILTER_FIELDS:
+            parser.add_argument(f"--{field.replace('_', '-')}", dest=field)
+        parser.add_argument(
+            "--count", action="store_true", help="Only print the number of matches"
+        )
+
+    def handle(self, *args, **options):
+        start = parse_moment(options["start"]) if options["start"] else None
+        end = parse_moment(options["end"]) if options["end"] else None
+        filters = {
+            field: options[field]
+            for field in FILTER_FIELDS
+            if options[field] is not None
+        }
+
+        count = 0
+        for row in search_archive(options["archive_dir"], start, end, **filters):
+            count += 1
+            if not options["count"]:
+                self.stdout.write(json.dumps(row, ensure_ascii=False))
+        if options["count"]:
+            self.stdout.write(str(count))
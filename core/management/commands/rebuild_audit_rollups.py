@@ -0,0 +1,52 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from core.audit.models import AuditLog
+from core.audit.rollups import bucket_start, rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the hourly and daily audit rollups from the audit log, "
+        "e.g. after a backfill or an import"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--from",
+            dest="start",
+            help="First UTC day (YYYY-MM-DD), default: the oldest event",
+        )
+        parser.add_argument(
+            "--to", dest="end", help="Last UTC day, inclusive (default: today)"
+        )
+
+    def parse_day(self, value):
+        day = parse_date(value)
+        if day is None:
+            raise CommandError(f"Invalid date: {value}")
+        return datetime(day.year, day.month, day.day, tzinfo=dt_timezone.utc)
+
+    def handle(self, *args, **options):
+        if options["start"]:
+            start = self.parse_day(options["start"])
+        else:
+            oldest = (
+                AuditLog.objects.order_by("timestamp")
+                .values_list("timestamp", flat=True)
+                .first()
+            )
+            if oldest is None:
+                self.stdout.write("No audit events")
+                return
+            start = bucket_start(oldest, "day")
+        if options["end"]:
+            end = self.parse_day(options["end"]) + timedelta(days=1)
+        else:
+            end = bucket_start(timezone.now(), "day") + timedelta(days=1)
+
+        days = rebuild_rollups(start, end)
+        self.stdout.write(f"Rebuilt audit rollups for {days} days")
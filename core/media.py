@@ -0,0 +1,192 @@
+# core/media.py
+
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+from django.views.decorators.http import require_safe
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.request import Request
+
+RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def authenticate(request):
+    """Resolve the user from the JWT cookie, the way the API views do."""
+    from user.authentication import CookieJWTAuthentication
+
+    try:
+        result = CookieJWTAuthentication().authenticate(Request(request))
+    except AuthenticationFailed:
+        # Expired or invalid cookie (InvalidToken), deleted or inactive user
+        return None
+    return result[0] if result else None
+
+
+def is_immutable(path):
+    return any(
+        re.match(pattern, path)
+        for pattern in getattr(settings, "MEDIA_IMMUTABLE_PATHS", [])
+    )
+
+
+def cache_control(path):
+    scope = "private" if getattr(settings, "MEDIA_REQUIRE_AUTH", True) else "public"
+    if is_immutable(path):
+        return f"{scope}, max-age=31536000, immutable"
+    return f"{scope}, no-cache"
+
+
+@require_safe
+def serve_media(request, path):
+    """
+    Serve a file below ``MEDIA_ROOT`` after authorizing the request.
+
+    With ``MEDIA_ACCEL`` set, Django only answers with headers and the front
+    server sends the bytes:
+
+    - ``"nginx"``: ``X-Accel-Redirect`` to ``MEDIA_ACCEL_PREFIX + path``,
+      which must be an ``internal`` location aliased to ``MEDIA_ROOT``
+    - ``"sendfile"``: ``X-Sendfile`` with the absolute path (Apache
+      mod_xsendfile, lighttpd)
+
+    Otherwise the file is streamed by a ``FileResponse`` that supports
+    single ``Range`` requests and conditional GETs.
+    """
+    if getattr(settings, "MEDIA_REQUIRE_AUTH", True) and authenticate(request) is None:
+        return HttpResponse(status=401)
+
+    # Never expose dotfiles or in-flight temporary files
+    if any(part.startswith(".") for part in path.split("/")) or path.endswith(".tmp"):
+        raise Http404
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+        stat = os.stat(full_path)
+    except (ValueError, OSError):
+        raise Http404
+    if not os.path.isfile(full_path):
+        raise Http404
+
+    accel = getattr(settings, "MEDIA_ACCEL", None)
+    if accel:
+        return accel_response(accel, path, full_path)
+
+    etag = quote_etag(f"{int(stat.st_mtime_ns):x}-{stat.st_size:x}")
+    last_modified = int(stat.st_mtime)
+    headers = {
+        "ETag": etag,
+        "Last-Modified": http_date(last_modified),
+        "Cache-Control": cache_control(path),
+        "Accept-Ranges": "bytes",
+    }
+
+    not_modified = get_conditional_response(
+        request, etag=etag, last_modified=last_modified
+    )
+    if not_modified is not None:
+        for header, value in headers.items():
+            not_modified[header] = value
+        return not_modified
+
+    byte_range = None
+    range_match = RANGE_PATTERN.match(request.META.get("HTTP_RANGE", "").strip())
+    # Multi-range and malformed headers get the whole file
+    if range_match and if_range_matches(request, etag, last_modified):
+        byte_range = parse_range(range_match, stat.st_size)
+        if byte_range is None:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{stat.st_size}"
+            return response
+
+    content_type, encoding = mimetypes.guess_type(full_path)
+    f = open(full_path, "rb")
+    if byte_range:
+        start, end = byte_range
+        f.seek(start)
+        response = FileResponse(
+            RangeFile(f, end - start + 1),
+            status=206,
+            content_type=content_type or "application/octet-stream",
+        )
+        response["Content-Length"] = str(end - start + 1)
+        response["Content-Range"] = f"bytes {start}-{end}/{stat.st_size}"
+    else:
+        response = FileResponse(
+            f, content_type=content_type or "application/octet-stream"
+        )
+    if encoding:
+        response["Content-Encoding"] = encoding
+    for header, value in headers.items():
+        response[header] = value
+    return response
+
+
+def accel_response(accel, path, full_path):
+    response = HttpResponse()
+    # The front server fills these in from the file
+    del response["Content-Type"]
+    if accel == "nginx":
+        prefix = getattr(settings, "MEDIA_ACCEL_PREFIX", "/protected-media/")
+        response["X-Accel-Redirect"] = prefix.rstrip("/") + "/" + path
+    elif accel == "sendfile":
+        response["X-Sendfile"] = full_path
+    else:
+        raise ValueError(f"Unknown MEDIA_ACCEL backend: {accel}")
+    response["Cache-Control"] = cache_control(path)
+    return response
+
+
+def if_range_matches(request, etag, last_modified):
+    """A stale ``If-Range`` turns a range request into a full one."""
+    if_range = request.META.get("HTTP_IF_RANGE")
+    if not if_range:
+        return True
+    if if_range.startswith('"') or if_range.startswith("W/"):
+        return if_range == etag
+    return parse_http_date_safe(if_range) == last_modified
+
+
+def parse_range(match, size):
+    """
+    ``(start, end)``, inclusive, for a matched single ``bytes=`` range, or
+    ``None`` if it cannot be satisfied.
+    """
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0 or size == 0:
+            return None
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return None
+    return start, end
+
+
+class RangeFile:
+    """Read at most ``length`` bytes of an already positioned file."""
+
+    def __init__(self, f, length):
+        self.f = f
+        self.remaining = length
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b""
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.f.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.f.close()
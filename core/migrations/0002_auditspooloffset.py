@@ -0,0 +1,33 @@
+# Generated by Django 5.1.3 on 2026-10-19 16:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AuditSpoolOffset",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("segment", models.CharField(max_length=255, unique=True)),
+                ("offset", models.BigIntegerField(default=0)),
+                ("update_time", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "db_table": "sys_audit_spool_offset",
+            },
+        ),
+    ]
@@ -0,0 +1,87 @@
+# Generated by Django 5.1.3 on 2026-10-19 16:04
+
+from datetime import date
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+# Future months that get a partition right away, archive_audit_logs adds more
+MONTHS_AHEAD = 3
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_auditlog(apps, schema_editor):
+    """
+    Partition the audit table by month on MySQL.
+
+    Every unique key of a partitioned table must contain the partitioning
+    column, so the primary key becomes ``(id, timestamp)``. This rebuilds
+    the table; on a large table run it in a maintenance window.
+    """
+    if schema_editor.connection.vendor != "mysql":
+        return
+    AuditLog = apps.get_model("core", "AuditLog")
+    table = schema_editor.quote_name(AuditLog._meta.db_table)
+    oldest = (
+        AuditLog.objects.order_by("timestamp")
+        .values_list("timestamp", flat=True)
+        .first()
+        or timezone.now()
+    )
+    month = date(oldest.year, oldest.month, 1)
+    last = add_months(date.today().replace(day=1), MONTHS_AHEAD)
+
+    clauses = []
+    while month <= last:
+        boundary = add_months(month, 1)
+        clauses.append(
+            f"PARTITION p{month:%Y%m} "
+            f"VALUES LESS THAN (TO_DAYS('{boundary:%Y-%m-%d}'))"
+        )
+        month = boundary
+    clauses.append("PARTITION pmax VALUES LESS THAN MAXVALUE")
+
+    schema_editor.execute(
+        f"ALTER TABLE {table} DROP PRIMARY KEY, ADD PRIMARY KEY (id, timestamp)"
+    )
+    schema_editor.execute(
+        f"ALTER TABLE {table} PARTITION BY RANGE (TO_DAYS(timestamp)) "
+        f"({', '.join(clauses)})"
+    )
+
+
+def unpartition_auditlog(apps, schema_editor):
+    if schema_editor.connection.vendor != "mysql":
+        return
+    table = schema_editor.quote_name(apps.get_model("core", "AuditLog")._meta.db_table)
+    schema_editor.execute(f"ALTER TABLE {table} REMOVE PARTITIONING")
+    schema_editor.execute(f"ALTER TABLE {table} DROP PRIMARY KEY, ADD PRIMARY KEY (id)")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0002_auditspooloffset"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="auditlog",
+            name="user",
+            field=models.ForeignKey(
+                db_constraint=False,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="audit_logs",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.RunPython(partition_auditlog, unpartition_auditlog),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.1.3 on 2026-10-19 16:07
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0003_partition_auditlog"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="auditlog",
+            index=models.Index(
+                fields=["timestamp", "id"], name="core_auditlog_ts_id_idx"
+            ),
+        ),
+    ]
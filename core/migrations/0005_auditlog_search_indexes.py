@@ -0,0 +1,84 @@
+# Generated by Django 5.1.3 on 2026-10-19 16:09
+
+from django.conf import settings
+from django.db import migrations, models
+
+# The search table as of this migration, spelled out so later changes to
+# core.audit.search do not change what it does. A table of its own on MySQL:
+# the partitioned audit table cannot hold a FULLTEXT index
+
+MYSQL_CREATE = (
+    "CREATE TABLE core_auditlog_search (id BIGINT NOT NULL PRIMARY KEY, "
+    "message LONGTEXT NULL, resource_type LONGTEXT NULL, "
+    "resource_id LONGTEXT NULL, FULLTEXT INDEX core_auditlog_search_ft "
+    "(message, resource_type, resource_id) WITH PARSER ngram)"
+)
+MYSQL_FILL = (
+    "INSERT INTO core_auditlog_search (id, message, resource_type, resource_id) "
+    "SELECT id, message, resource_type, resource_id FROM core_auditlog"
+)
+
+SQLITE_CREATE = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS core_auditlog_search "
+    "USING fts5(message, resource_type, resource_id, tokenize='unicode61')"
+)
+SQLITE_FILL = (
+    "INSERT INTO core_auditlog_search (rowid, message, resource_type, resource_id) "
+    "SELECT id, message, resource_type, resource_id FROM core_auditlog"
+)
+
+DROP = "DROP TABLE IF EXISTS core_auditlog_search"
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "mysql":
+        schema_editor.execute(MYSQL_CREATE)
+        schema_editor.execute(MYSQL_FILL)
+    elif vendor == "sqlite":
+        schema_editor.execute(SQLITE_CREATE)
+        schema_editor.execute(SQLITE_FILL)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor in ("mysql", "sqlite"):
+        schema_editor.execute(DROP)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0004_auditlog_timestamp_id_index"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="auditlog",
+            index=models.Index(
+                fields=["module", "action", "timestamp"],
+                name="core_auditlog_mod_act_ts_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="auditlog",
+            index=models.Index(
+                fields=["action", "timestamp"], name="core_auditlog_act_ts_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="auditlog",
+            index=models.Index(
+                fields=["username", "timestamp"], name="core_auditlog_user_ts_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="auditlog",
+            index=models.Index(fields=["user_email"], name="core_auditlog_email_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="auditlog",
+            index=models.Index(fields=["resource_id"], name="core_auditlog_res_id_idx"),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.1.3 on 2026-10-19 16:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0005_auditlog_search_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AuditRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "period",
+                    models.CharField(
+                        choices=[("hour", "Hour"), ("day", "Day")], max_length=4
+                    ),
+                ),
+                ("bucket", models.DateTimeField()),
+                ("module", models.CharField(max_length=20)),
+                ("action", models.CharField(max_length=10)),
+                ("status", models.BooleanField()),
+                ("username", models.CharField(max_length=150)),
+                ("count", models.BigIntegerField(default=0)),
+            ],
+            options={
+                "db_table": "sys_audit_rollup",
+                "indexes": [
+                    models.Index(
+                        fields=["period", "module", "bucket"],
+                        name="sys_audit_rollup_mod_idx",
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=(
+                            "period",
+                            "bucket",
+                            "module",
+                            "action",
+                            "status",
+                            "username",
+                        ),
+                        name="sys_audit_rollup_key_uniq",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,42 @@
+# core/ordering.py
+
+
+class OrderingMixin:
+    """
+    Whitelisted, index-backed ordering for list views.
+
+    Views declare the public sort keys they accept and the column tuple each
+    key maps to. Every tuple should match a composite index (usually prefixed
+    by ``deleted_at``) and end with a unique column so that the order is
+    stable for pagination::
+
+        ordering_fields = {
+            "create_time": ("create_time", "id"),
+            "username": ("username",),
+        }
+        default_ordering = "-create_time"
+
+    ``?ordering=-create_time`` then becomes
+    ``order_by("-create_time", "-id")``. Only the first recognised key is
+    used and unknown keys are ignored, so clients cannot sort by arbitrary
+    or unindexed columns.
+    """
+
+    ordering_param = "ordering"
+    ordering_fields = {}
+    default_ordering = None
+
+    def get_ordering(self, request):
+        for term in request.query_params.get(self.ordering_param, "").split(","):
+            ordering = self.resolve_ordering_key(term.strip())
+            if ordering:
+                return ordering
+        return self.resolve_ordering_key(self.default_ordering or "")
+
+    def resolve_ordering_key(self, term):
+        descending = term.startswith("-")
+        columns = self.ordering_fields.get(term.lstrip("-"))
+        if not columns:
+            return []
+        prefix = "-" if descending else ""
+        return [prefix + column for column in columns]
@@ -0,0 +1,209 @@
+# core/pagination.py
+
+import base64
+import binascii
+import datetime
+import json
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, _positive_int
+from rest_framework.response import Response
+
+
+class CursorEncoder(DjangoJSONEncoder):
+    """DjangoJSONEncoder truncates to milliseconds, cursors need exact values."""
+
+    def default(self, o):
+        if isinstance(o, (datetime.datetime, datetime.time)):
+            return o.isoformat()
+        return super().default(o)
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor (keyset) pagination keyed on the queryset ordering plus ``id``.
+
+    Instead of ``OFFSET`` it filters on the last row of the previous page, so
+    deep pages cost the same as the first one when the ordering is backed by
+    an index. Cursors are opaque, forward-only tokens. Totals are optional:
+
+    - ``count=none`` (default): no ``COUNT(*)`` at all
+    - ``count=approx``: table statistics (MySQL, unfiltered) or a count
+      capped at ``approx_count_limit``
+    - ``count=exact``: a full ``COUNT(*)``
+
+    NULL ordering values follow MySQL/SQLite semantics (NULLs sort first in
+    ascending order).
+    """
+
+    page_size = 10
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    cursor_query_param = "cursor"
+    count_query_param = "count"
+    approx_count_limit = 10000
+
+    invalid_cursor_message = "Invalid cursor"
+
+    @classmethod
+    def is_requested(cls, request):
+        """Cursor mode is selected by passing ``cursor`` (empty for page one)."""
+        return cls.cursor_query_param in request.query_params
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(queryset)
+        self.model = queryset.model
+
+        queryset = queryset.order_by(
+            *[("-" if desc else "") + name for name, desc in self.ordering]
+        )
+        self.count, self.count_is_approximate = self.get_count(queryset, request)
+
+        position = self.decode_cursor(request)
+        if position is not None:
+            queryset = queryset.filter(self.build_position_filter(position))
+
+        rows = list(queryset[: self.page_size + 1])
+        self.has_next = len(rows) > self.page_size
+        rows = rows[: self.page_size]
+        self.next_cursor = self.encode_cursor(rows[-1]) if self.has_next else None
+        return rows
+
+    def get_paginated_data(self):
+        return {
+            "count": self.count,
+            "countIsApproximate": self.count_is_approximate,
+            "next": self.next_cursor,
+            "pageSize": self.page_size,
+        }
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "code": 200,
+                "message": "Success",
+                "data": data,
+                **self.get_paginated_data(),
+            }
+        )
+
+    def get_page_size(self, request):
+        try:
+            return _positive_int(
+                request.query_params[self.page_size_query_param],
+                strict=True,
+                cutoff=self.max_page_size,
+            )
+        except (KeyError, ValueError):
+            return self.page_size
+
+    @staticmethod
+    def get_ordering(queryset):
+        """
+        Return ``[(field_name, descending), ...]`` for the queryset ordering,
+        with ``id`` appended as a unique tie-breaker.
+        """
+        order_by = queryset.query.order_by or queryset.model._meta.ordering
+        opts = queryset.model._meta
+        ordering = []
+        for term in order_by:
+            if not isinstance(term, str):
+                raise ValueError("Keyset pagination only supports field ordering")
+            descending = term.startswith("-")
+            name = term.lstrip("-+")
+            if name == "pk":
+                name = opts.pk.name
+            try:
+                field = opts.get_field(name)
+            except FieldDoesNotExist:
+                raise ValueError(f"Cannot paginate by '{name}'")
+            if not field.concrete or field.is_relation:
+                raise ValueError(f"Cannot paginate by '{name}'")
+            ordering.append((field.attname, descending))
+
+        if opts.pk.attname not in [name for name, _ in ordering]:
+            last_descending = ordering[-1][1] if ordering else False
+            ordering.append((opts.pk.attname, last_descending))
+        return ordering
+
+    def get_count(self, queryset, request):
+        mode = request.query_params.get(self.count_query_param, "none")
+        if mode == "exact":
+            return queryset.count(), False
+        if mode == "approx":
+            return self.get_approximate_count(queryset), True
+        return None, False
+
+    def get_approximate_count(self, queryset):
+        connection = connections[queryset.db]
+        if connection.vendor == "mysql" and not queryset.query.where:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT TABLE_ROWS FROM information_schema.TABLES "
+                    "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+                    [queryset.model._meta.db_table],
+                )
+                row = cursor.fetchone()
+            if row and row[0] is not None:
+                return row[0]
+        # Bounded COUNT over a LIMIT subquery, never scans past the cap
+        return queryset.order_by()[: self.approx_count_limit].count()
+
+    def get_position(self, obj):
+        return [getattr(obj, name) for name, _ in self.ordering]
+
+    def encode_cursor(self, obj):
+        values = self.get_position(obj)
+        payload = json.dumps(values, cls=CursorEncoder, separators=(",", ":"))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    def decode_cursor(self, request):
+        token = request.query_params.get(self.cursor_query_param, "")
+        if not token:
+            return None
+        try:
+            padded = token + "=" * (-len(token) % 4)
+            values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            if not isinstance(values, list) or len(values) != len(self.ordering):
+                raise ValueError
+            opts = self.model._meta
+            return [
+                None if value is None else opts.get_field(name).to_python(value)
+                for (name, _), value in zip(self.ordering, values)
+            ]
+        except (ValueError, TypeError, binascii.Error, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def build_position_filter(self, position):
+        """Rows strictly after ``position`` in the pagination ordering."""
+        position_filter = None
+        equal_prefix = Q()
+        for (name, descending), value in zip(self.ordering, position):
+            after = self._after(name, descending, value)
+            if after is not None:
+                condition = equal_prefix & after
+                position_filter = (
+                    condition
+                    if position_filter is None
+                    else position_filter | condition
+                )
+            if value is None:
+                equal_prefix &= Q(**{f"{name}__isnull": True})
+            else:
+                equal_prefix &= Q(**{name: value})
+        return position_filter if position_filter is not None else Q(pk__in=[])
+
+    @staticmethod
+    def _after(name, descending, value):
+        if value is None:
+            # NULLs sort first ascending, last descending
+            return None if descending else Q(**{f"{name}__isnull": False})
+        if descending:
+            return Q(**{f"{name}__lt": value}) | Q(**{f"{name}__isnull": True})
+        return Q(**{f"{name}__gt": value})
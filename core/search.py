@@ -0,0 +1,287 @@
+# core/search.py
+
+import re
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connections
+from django.db.models import BooleanField, Q
+from django.db.models.expressions import RawSQL
+
+from core.logging.utils import get_logger
+
+logger = get_logger(__name__)
+
+
+def prefix_q(field, prefix):
+    """
+    ``Q`` for values starting with ``prefix`` written as a range, which a
+    B-tree index on ``field`` serves on every backend (``LIKE`` is only
+    index-friendly under some collations). Case sensitivity follows the
+    column collation.
+    """
+    return Q(**{f"{field}__gte": prefix, f"{field}__lt": prefix + "\uffff"})
+
+
+class FullTextIndex:
+    """
+    Full-text index over text columns of a model, with a LIKE fallback.
+
+    - MySQL: a ``FULLTEXT`` index using the ``ngram`` parser on the table
+      itself. InnoDB keeps it up to date, and ngram phrase queries match any
+      substring of at least ``ngram_token_size`` characters, which includes
+      prefixes.
+    - SQLite: an FTS5 table (``rowid`` = primary key) for local and test
+      deployments. It is kept in sync through ``sync()`` / ``remove()`` and
+      supports ``term*`` prefix queries.
+    - Anything else, or when the index has not been created: ``icontains``
+      over the same columns, i.e. the previous behaviour.
+
+    With ``separate_table`` the MySQL index lives in its own table
+    (``id`` plus the indexed columns), for tables that cannot carry a
+    ``FULLTEXT`` index themselves, such as partitioned ones. Like the FTS5
+    table it is filled by ``sync()``, or by ``add()`` for rows just inserted
+    (an idempotent insert that concurrent writers cannot conflict on).
+
+    The index itself is created by a migration of the model's app, which
+    spells out its SQL.
+    """
+
+    def __init__(
+        self, model_label, fields, name, min_term_length=2, separate_table=False
+    ):
+        self.model_label = model_label
+        self.fields = list(fields)
+        self.name = name
+        self.min_term_length = min_term_length
+        self.separate_table = separate_table
+        self._available = {}
+
+    @property
+    def model(self):
+        return apps.get_model(self.model_label)
+
+    @property
+    def table(self):
+        return self.model._meta.db_table
+
+    def columns(self):
+        opts = self.model._meta
+        return [opts.get_field(field).column for field in self.fields]
+
+    def is_available(self, using="default"):
+        """Whether the index exists on this database (checked once per process)."""
+        if not getattr(settings, "FULLTEXT_SEARCH_ENABLED", True):
+            return False
+        if using not in self._available:
+            self._available[using] = self._detect(connections[using])
+        return self._available[using]
+
+    def _detect(self, connection):
+        try:
+            with connection.cursor() as cursor:
+                if connection.vendor == "mysql" and self.separate_table:
+                    return self.name in connection.introspection.table_names(cursor)
+                if connection.vendor == "mysql":
+                    cursor.execute(
+                        "SELECT 1 FROM information_schema.STATISTICS "
+                        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s "
+                        "AND INDEX_NAME = %s AND INDEX_TYPE = 'FULLTEXT'",
+                        [self.table, self.name],
+                    )
+                    return cursor.fetchone() is not None
+                if connection.vendor == "sqlite":
+                    return self.name in connection.introspection.table_names(cursor)
+        except Exception as e:
+            logger.warning(
+                "Full-text index lookup failed",
+                extra={"index": self.name, "error": str(e)},
+            )
+        return False
+
+    # Querying
+
+    def filter(self, queryset, term):
+        """Restrict ``queryset`` to rows matching ``term`` in any indexed column."""
+        if not term.strip():
+            return queryset
+        return queryset.filter(self.q(term, using=queryset.db))
+
+    def q(self, term, using="default"):
+        """
+        ``Q`` object matching ``term`` in any indexed column, so the search can
+        be combined with other filters.
+        """
+        term = term.strip()
+        connection = connections[using]
+        if len(term) < self.min_term_length or not self.is_available(using):
+            return self.fallback_q(term)
+
+        quote = connection.ops.quote_name
+        if connection.vendor == "mysql" and self.separate_table:
+            columns = ", ".join(quote(column) for column in self.columns())
+            return Q(
+                pk__in=RawSQL(
+                    f"SELECT id FROM {quote(self.name)} "
+                    f"WHERE MATCH ({columns}) AGAINST (%s IN BOOLEAN MODE)",
+                    [self.mysql_query(term)],
+                )
+            )
+        if connection.vendor == "mysql":
+            columns = ", ".join(
+                f"{quote(self.table)}.{quote(column)}" for column in self.columns()
+            )
+            return Q(
+                RawSQL(
+                    f"MATCH ({columns}) AGAINST (%s IN BOOLEAN MODE)",
+                    [self.mysql_query(term)],
+                    output_field=BooleanField(),
+                )
+            )
+
+        fts5_query = self.fts5_query(term)
+        if not fts5_query:
+            return self.fallback_q(term)
+        return Q(
+            pk__in=RawSQL(
+                f"SELECT rowid FROM {quote(self.name)} "
+                f"WHERE {quote(self.name)} MATCH %s",
+                [fts5_query],
+            )
+        )
+
+    def fallback_q(self, term):
+        search_filters = Q()
+        for field in self.fields:
+            search_filters |= Q(**{f"{field}__icontains": term})
+        return search_filters
+
+    @staticmethod
+    def mysql_query(term):
+        # An ngram phrase matches the term anywhere in the column
+        return '"{}"'.format(term.replace('"', " "))
+
+    @staticmethod
+    def fts5_query(term):
+        # Every word must match as a prefix of some token
+        tokens = re.findall(r"\w+", term)
+        return " ".join('"{}"*'.format(token.replace('"', '""')) for token in tokens)
+
+    # Keeping the SQLite FTS5 table or the separate MySQL table in sync
+
+    def _maintained_connection(self, using):
+        """Connection if the index is a table we fill ourselves, else None."""
+        connection = connections[using]
+        maintained = connection.vendor == "sqlite" or (
+            connection.vendor == "mysql" and self.separate_table
+        )
+        if not maintained or not self.is_available(using):
+            return None
+        return connection
+
+    @staticmethod
+    def _key(connection):
+        return "rowid" if connection.vendor == "sqlite" else "id"
+
+    def sync(self, instances, using="default"):
+        """Index (or re-index) the given model instances."""
+        connection = self._maintained_connection(using)
+        instances = list(instances)
+        if connection is None or not instances:
+            return
+
+        with connection.cursor() as cursor:
+            self._delete_rows(
+                cursor, connection.ops.quote_name, [obj.pk for obj in instances]
+            )
+            self._insert_rows(cursor, instances)
+
+    def add(self, instances, using="default"):
+        """
+        Index rows that were just inserted. On MySQL keys that are already
+        indexed are skipped (``INSERT IGNORE``), so concurrent or repeated
+        calls never conflict and nothing but the new rows is touched.
+        """
+        connection = self._maintained_connection(using)
+        instances = [instance for instance in instances if instance.pk is not None]
+        if connection is None or not instances:
+            return
+        if connection.vendor != "mysql":
+            # SQLite has a single writer, re-indexing is just as safe
+            self.sync(instances, using=using)
+            return
+        with connection.cursor() as cursor:
+            self._insert_rows(cursor, instances, ignore=True)
+
+    def _insert_rows(self, cursor, instances, ignore=False):
+        quote = cursor.db.ops.quote_name
+        columns = ", ".join(quote(column) for column in self.columns())
+        placeholders = ", ".join(["%s"] * (len(self.fields) + 1))
+        rows = [
+            [instance.pk] + [getattr(instance, field) for field in self.fields]
+            for instance in instances
+        ]
+        cursor.executemany(
+            f"INSERT {'IGNORE ' if ignore else ''}INTO {quote(self.name)} "
+            f"({self._key(cursor.db)}, {columns}) VALUES ({placeholders})",
+            rows,
+        )
+
+    def remove(self, pks, using="default"):
+        connection = self._maintained_connection(using)
+        pks = list(pks)
+        if connection is None or not pks:
+            return
+        with connection.cursor() as cursor:
+            self._delete_rows(cursor, connection.ops.quote_name, pks)
+
+    def _delete_rows(self, cursor, quote, pks):
+        placeholders = ", ".join(["%s"] * len(pks))
+        cursor.execute(
+            f"DELETE FROM {quote(self.name)} "
+            f"WHERE {self._key(cursor.db)} IN ({placeholders})",
+            pks,
+        )
+
+    def catch_up(self, window=1000, using="default"):
+        """
+        Repair helper: index rows added without ``sync()``/``add()`` above the
+        highest indexed key, minus ``window`` keys. Not for the write path,
+        it scans a shared key range.
+        """
+        connection = self._maintained_connection(using)
+        if connection is None:
+            return
+        quote = connection.ops.quote_name
+        key = self._key(connection)
+        columns = ", ".join(quote(column) for column in self.columns())
+        pk_column = quote(self.model._meta.pk.column)
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT COALESCE(MAX({key}), 0) FROM {quote(self.name)}")
+            low = max(cursor.fetchone()[0] - window, 0)
+            ignore = "IGNORE " if connection.vendor == "mysql" else ""
+            cursor.execute(
+                f"INSERT {ignore}INTO {quote(self.name)} ({key}, {columns}) "
+                f"SELECT {pk_column}, {columns} FROM {quote(self.table)} "
+                f"WHERE {pk_column} > %s AND {pk_column} NOT IN "
+                f"(SELECT {key} FROM {quote(self.name)} WHERE {key} > %s)",
+                [low, low],
+            )
+
+    def rebuild(self, using="default"):
+        """Re-populate the SQLite FTS5 table or separate MySQL table."""
+        connection = connections[using]
+        if connection.vendor != "sqlite" and not (
+            connection.vendor == "mysql" and self.separate_table
+        ):
+            return
+        quote = connection.ops.quote_name
+        key = self._key(connection)
+        columns = ", ".join(quote(column) for column in self.columns())
+        pk_column = quote(self.model._meta.pk.column)
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {quote(self.name)}")
+            cursor.execute(
+                f"INSERT INTO {quote(self.name)} ({key}, {columns}) "
+                f"SELECT {pk_column}, {columns} FROM {quote(self.table)}"
+            )
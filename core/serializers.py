@@ -0,0 +1,94 @@
+# core/serializers.py
+
+
+class SparseFieldsMixin:
+    """
+    ``?fields=`` / ``?exclude=`` support for model serializers.
+
+    ``get_field_selection(request)`` turns the query parameters into the set
+    of serializer fields to emit, the serializer is built with
+    ``fields=selection`` and ``sparse_queryset()`` pushes the choice down to
+    SQL: ``only()`` for an explicit field list, ``defer()`` for exclusions.
+    ``id`` is always kept.
+
+    Serializer fields that are not plain model columns declare what they
+    read in ``field_sources``. An empty list means no column at all, e.g.
+    data from a prefetch the view skips when the field is not selected::
+
+        field_sources = {"is_active": ["status", "deleted_at"], "roles": []}
+    """
+
+    fields_param = "fields"
+    exclude_param = "exclude"
+    always_included = ("id",)
+    field_sources = {}
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+    @classmethod
+    def _parse(cls, request, param):
+        value = request.query_params.get(param) or ""
+        return {name.strip() for name in value.split(",") if name.strip()}
+
+    @classmethod
+    def get_field_selection(cls, request, default_exclude=()):
+        """
+        Serializer fields to emit, or ``None`` when nothing was requested.
+        ``default_exclude`` fields are left out unless listed in ``fields``.
+        """
+        available = set(cls.Meta.fields)
+        requested = cls._parse(request, cls.fields_param) & available
+        excluded = cls._parse(request, cls.exclude_param)
+        if not requested:
+            excluded |= set(default_exclude)
+        if not requested and not excluded:
+            return None
+        selection = (requested or available) - excluded
+        return selection | (set(cls.always_included) & available)
+
+    @classmethod
+    def wants(cls, selection, field_name):
+        return selection is None or field_name in selection
+
+    @classmethod
+    def get_sources(cls, field_name):
+        return cls.field_sources.get(field_name, [field_name])
+
+    @classmethod
+    def sparse_queryset(cls, queryset, request, default_exclude=()):
+        """Restrict ``queryset`` to the columns the selected fields read."""
+        selection = cls.get_field_selection(request, default_exclude)
+        if selection is None:
+            return queryset
+
+        needed = {source for name in selection for source in cls.get_sources(name)}
+        # Keyset pagination reads the ordering columns from the last row
+        opts = queryset.model._meta
+        needed |= {
+            term.lstrip("-")
+            for term in queryset.query.order_by or opts.ordering
+            if isinstance(term, str) and term.lstrip("-") != "pk"
+        }
+
+        # Only follow the relations a selected field traverses
+        if queryset.query.select_related:
+            relations = {source.split("__")[0] for source in needed if "__" in source}
+            queryset = queryset.select_related(None)
+            if relations:
+                queryset = queryset.select_related(*relations)
+
+        if cls._parse(request, cls.fields_param) & set(cls.Meta.fields):
+            return queryset.only(*sorted(needed))
+
+        columns = {field.name for field in opts.concrete_fields}
+        deferred = {
+            source
+            for name in set(cls.Meta.fields) - selection
+            for source in cls.get_sources(name)
+            if source in columns and source not in needed
+        }
+        return queryset.defer(*sorted(deferred)) if deferred else queryset
@@ -0,0 +1,300 @@
+# test_AuditLogViewSet.py
+
+import gzip
+import json
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.request import Request
+from rest_framework.test import APIClient
+
+from core.audit.models import AuditLog
+from core.audit.views import AuditLogViewSet
+from core.audit.writer import build_entry, persist_audit_entries
+from role.models import SysRole, SysUserRole
+
+User = get_user_model()
+
+
+@pytest.fixture
+def audit_client():
+    admin_role = SysRole.objects.create(
+        name="Super Admin", code="admin", is_system=True
+    )
+    admin = User.objects.create_user(
+        username="admin", email="admin@example.com", password="password"
+    )
+    SysUserRole.objects.create(user=admin, role=admin_role)
+
+    client = APIClient()
+    client.force_authenticate(user=admin)
+    client.credentials(HTTP_ACCEPT_LANGUAGE="en")
+    return client, admin
+
+
+def create_logs(user, count):
+    AuditLog.objects.bulk_create(
+        AuditLog(
+            user=user,
+            username=user.username,
+            action="UPDATE",
+            module="USER",
+            resource_type="USER",
+            resource_id=str(i),
+            detail={"payload": "x" * 1000},
+            message=f"Updated user {i}",
+        )
+        for i in range(count)
+    )
+
+
+@pytest.mark.django_db
+class TestAuditLogSparseFields:
+    def test_exclude_detail_is_not_selected(self, audit_client):
+        client, admin = audit_client
+        create_logs(admin, 3)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(reverse("audit-logs"), {"exclude": "detail"})
+
+        assert response.status_code == 200
+        assert all("detail" not in row for row in response.data["results"])
+        audit_selects = [
+            q["sql"] for q in queries if 'FROM "core_auditlog"' in q["sql"]
+        ]
+        assert audit_selects and not any('"detail"' in sql for sql in audit_selects)
+
+    def test_fields_select_columns(self, audit_client):
+        client, admin = audit_client
+        create_logs(admin, 2)
+
+        response = client.get(reverse("audit-logs"), {"fields": "username,action"})
+
+        assert response.status_code == 200
+        assert response.data["results"][0] == {
+            "id": response.data["results"][0]["id"],
+            "username": "admin",
+            "action": "UPDATE",
+        }
+
+
+@pytest.mark.django_db
+class TestAuditLogPagination:
+    def test_cursor_pages_walk_every_row_once(self, audit_client):
+        client, admin = audit_client
+        create_logs(admin, 5)
+        # Same timestamp for all rows, the id breaks the tie
+        AuditLog.objects.update(timestamp=AuditLog.objects.first().timestamp)
+
+        seen, cursor = [], ""
+        while cursor is not None:
+            response = client.get(
+                reverse("audit-logs"), {"cursor": cursor, "page_size": 2}
+            )
+            assert response.status_code == 200
+            seen += [row["id"] for row in response.data["data"]]
+            cursor = response.data["next"]
+
+        assert seen == sorted(AuditLog.objects.values_list("id", flat=True))[::-1]
+
+    def test_numbered_pages_by_default(self, audit_client):
+        client, admin = audit_client
+        create_logs(admin, 3)
+
+        response = client.get(reverse("audit-logs"), {"page_size": 2})
+
+        assert response.status_code == 200
+        assert response.data["count"] == 3
+        assert response.data["previous"] is None and response.data["next"]
+        assert len(response.data["results"]) == 2
+
+    def test_cursor_list_skips_detail_join_and_count(self, audit_client):
+        client, admin = audit_client
+        create_logs(admin, 3)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(reverse("audit-logs"), {"cursor": ""})
+
+        assert response.status_code == 200
+        assert response.data["count"] is None
+        row = response.data["data"][0]
+        assert "detail" not in row and row["username"] == "admin"
+        audit_selects = [
+            q["sql"] for q in queries if 'FROM "core_auditlog"' in q["sql"]
+        ]
+        assert len(audit_selects) == 1
+        assert '"detail"' not in audit_selects[0]
+        assert "JOIN" not in audit_selects[0] and "COUNT" not in audit_selects[0]
+
+    def test_detail_can_be_requested_in_list(self, audit_client):
+        client, admin = audit_client
+        create_logs(admin, 1)
+
+        response = client.get(reverse("audit-logs"), {"fields": "detail"})
+
+        assert response.data["results"][0]["detail"] == {"payload": "x" * 1000}
+
+    def test_retrieve_returns_full_event(self, audit_client):
+        client, admin = audit_client
+        create_logs(admin, 1)
+        log = AuditLog.objects.get()
+
+        response = client.get(reverse("audit-log-detail", args=[log.id]))
+
+        assert response.status_code == 200
+        assert response.data["data"]["detail"] == {"payload": "x" * 1000}
+        assert response.data["data"]["username"] == "admin"
+
+    def test_retrieve_unknown_event(self, audit_client):
+        client, _ = audit_client
+
+        response = client.get(reverse("audit-log-detail", args=[999]))
+
+        assert response.status_code == 404
+
+
+def record(username, message, module="USER", action="UPDATE", resource_id="1"):
+    persist_audit_entries(
+        [
+            build_entry(
+                username=username,
+                user_email=f"{username}@example.com",
+                action=action,
+                module=module,
+                resource_type=module,
+                resource_id=resource_id,
+                detail={},
+                message=message,
+            )
+        ]
+    )
+
+
+def audit_queryset(rf, **params):
+    view = AuditLogViewSet(action="list", request=Request(rf.get("/", params)))
+    return view.get_queryset().order_by("-timestamp", "-id")
+
+
+@pytest.mark.django_db
+class TestAuditLogSearch:
+    def test_search_matches_message_words(self, audit_client):
+        client, _ = audit_client
+        record("alice", "Successfully updated ROLE permissions")
+        record("bob", "Failed to delete USER")
+
+        response = client.get(reverse("audit-logs"), {"search": "permis"})
+
+        assert [row["username"] for row in response.data["results"]] == ["alice"]
+
+    def test_user_filter_is_a_prefix_match(self, audit_client):
+        client, _ = audit_client
+        record("alice", "one")
+        record("malice", "two")
+
+        response = client.get(reverse("audit-logs"), {"user": "ali"})
+
+        assert [row["username"] for row in response.data["results"]] == ["alice"]
+
+    def test_resource_id_prefix(self, audit_client):
+        client, _ = audit_client
+        record("alice", "one", resource_id="1234")
+        record("alice", "two", resource_id="5123")
+
+        response = client.get(reverse("audit-logs"), {"resource_id": "12"})
+
+        assert [row["resource_id"] for row in response.data["results"]] == ["1234"]
+
+    # The filters the audit screen sends are served by indexes, not scans
+    @pytest.mark.parametrize(
+        "params,index_name",
+        [
+            ({"module": "USER", "action": "UPDATE"}, "core_auditlog_mod_act_ts_idx"),
+            ({"action": "DELETE"}, "core_auditlog_act_ts_idx"),
+            ({"user": "ali"}, "core_auditlog_user_ts_idx"),
+            ({"resource_id": "12"}, "core_auditlog_res_id_idx"),
+            ({"search": "permissions"}, "core_auditlog_search"),
+        ],
+    )
+    def test_filters_use_indexes(self, rf, params, index_name):
+        plan = audit_queryset(rf, **params)[:10].explain()
+
+        assert index_name in plan
+        assert "SCAN core_auditlog\n" not in plan + "\n"
+
+    def test_module_action_page_needs_no_sort(self, rf):
+        plan = audit_queryset(rf, module="USER", action="UPDATE")[:10].explain()
+
+        assert "TEMP B-TREE" not in plan
+
+
+def export_rows(response):
+    content = b"".join(response.streaming_content)
+    return [json.loads(line) for line in content.splitlines()]
+
+
+@pytest.mark.django_db
+class TestAuditLogExport:
+    def test_streams_filtered_rows_oldest_first(self, audit_client, settings):
+        client, admin = audit_client
+        settings.AUDIT_EXPORT_CHUNK_SIZE = 2
+        for i in range(5):
+            record("alice", f"Updated user {i}")
+        record("bob", "Updated user 9")
+
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(reverse("audit-log-export"), {"user": "ali"})
+            rows = export_rows(response)
+
+        assert response["Content-Type"] == "application/x-ndjson"
+        assert [row["message"] for row in rows] == [
+            f"Updated user {i}" for i in range(5)
+        ]
+        # Three bounded chunk queries instead of one unbounded one
+        assert len([q for q in queries if AuditLog._meta.db_table in q["sql"]]) == 3
+
+    def test_resumes_after_last_row(self, audit_client):
+        client, _ = audit_client
+        for i in range(4):
+            record("alice", f"Updated user {i}")
+        first = export_rows(client.get(reverse("audit-log-export")))
+
+        response = client.get(
+            reverse("audit-log-export"),
+            {"after_timestamp": first[1]["timestamp"], "after_id": first[1]["id"]},
+        )
+
+        assert export_rows(response) == first[2:]
+
+    def test_gzip_csv(self, audit_client):
+        client, _ = audit_client
+        record("alice", "Updated user 1")
+
+        response = client.get(
+            reverse("audit-log-export"),
+            {"export_format": "csv", "gzip": "true", "fields": "username,detail"},
+        )
+
+        assert response["Content-Type"] == "application/gzip"
+        assert response["Content-Disposition"].endswith('audit-logs.csv.gz"')
+        content = gzip.decompress(b"".join(response.streaming_content)).decode()
+        header, row = content.splitlines()
+        assert header == "id,username,detail"
+        assert row.split(",")[1] == "alice"
+
+    @pytest.mark.parametrize(
+        "params",
+        [
+            {"export_format": "xml"},
+            {"start_date": "yesterday"},
+            {"after_id": "3"},
+        ],
+    )
+    def test_rejects_invalid_parameters(self, audit_client, params):
+        client, _ = audit_client
+
+        response = client.get(reverse("audit-log-export"), params)
+
+        assert response.status_code == 400
@@ -0,0 +1,109 @@
+# test_audit_archive.py
+
+import gzip
+import json
+import os
+from datetime import date, datetime, timezone as dt_timezone
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from core.audit.archive import archive_files, archive_month, search_archive
+from core.audit.models import AuditLog
+from core.audit.partitions import add_months, month_start, months_before
+
+
+def create_log(timestamp, username="alice", resource_id="1"):
+    return AuditLog.objects.create(
+        username=username,
+        action="UPDATE",
+        module="USER",
+        resource_type="USER",
+        resource_id=resource_id,
+        detail={"changed": ["email"]},
+        timestamp=timestamp,
+    )
+
+
+def at(year, month, day=15):
+    return datetime(year, month, day, 12, tzinfo=dt_timezone.utc)
+
+
+@pytest.mark.django_db
+class TestArchiveMonth:
+    def test_archives_and_drops_month(self, tmp_path):
+        create_log(at(2024, 1), resource_id="1")
+        create_log(at(2024, 1, 31), username="bob", resource_id="2")
+        kept = create_log(at(2024, 2, 1))
+
+        rows = archive_month(date(2024, 1, 1), tmp_path)
+
+        assert rows == 2
+        assert list(AuditLog.objects.values_list("id", flat=True)) == [kept.id]
+        [(month, path)] = archive_files(tmp_path)
+        assert month == date(2024, 1, 1)
+        with gzip.open(path, "rt") as f:
+            archived = [json.loads(line) for line in f]
+        assert [row["resource_id"] for row in archived] == ["1", "2"]
+        assert archived[0]["detail"] == {"changed": ["email"]}
+
+    def test_interrupted_run_is_not_archived_twice(self, tmp_path):
+        create_log(at(2024, 1))
+        archive_month(date(2024, 1, 1), tmp_path, drop=False)
+
+        assert archive_month(date(2024, 1, 1), tmp_path) == 0
+        assert len(archive_files(tmp_path)) == 1
+        assert not AuditLog.objects.exists()
+
+    def test_late_rows_go_to_a_new_part(self, tmp_path):
+        create_log(at(2024, 1))
+        archive_month(date(2024, 1, 1), tmp_path)
+        create_log(at(2024, 1, 20), resource_id="late")
+
+        assert archive_month(date(2024, 1, 1), tmp_path) == 1
+        names = [os.path.basename(path) for _, path in archive_files(tmp_path)]
+        assert names == ["audit-2024-01.jsonl.gz", "audit-2024-01.p1.jsonl.gz"]
+        assert len(list(search_archive(tmp_path))) == 2
+
+    def test_search_filters_by_range_and_fields(self, tmp_path):
+        create_log(at(2024, 1, 10), username="alice")
+        create_log(at(2024, 1, 20), username="bob")
+        create_log(at(2024, 2, 10), username="alice")
+        archive_month(date(2024, 1, 1), tmp_path)
+        archive_month(date(2024, 2, 1), tmp_path)
+
+        matches = list(
+            search_archive(
+                tmp_path, start=at(2024, 1, 15), end=at(2024, 3, 1), username="alice"
+            )
+        )
+
+        assert [row["timestamp"][:10] for row in matches] == ["2024-02-10"]
+
+
+@pytest.mark.django_db
+class TestArchiveCommands:
+    def test_archives_months_past_retention(self, tmp_path):
+        this_month = month_start(datetime.now(dt_timezone.utc))
+        old = add_months(this_month, -13)
+        create_log(at(old.year, old.month), username="old")
+        create_log(datetime.now(dt_timezone.utc), username="recent")
+
+        assert months_before(add_months(this_month, -11)) == [old]
+        call_command(
+            "archive_audit_logs",
+            "--retention-months=12",
+            f"--archive-dir={tmp_path}",
+            stdout=StringIO(),
+        )
+
+        assert list(AuditLog.objects.values_list("username", flat=True)) == ["recent"]
+        out = StringIO()
+        call_command(
+            "query_audit_archive",
+            f"--archive-dir={tmp_path}",
+            "--username=old",
+            stdout=out,
+        )
+        assert json.loads(out.getvalue())["username"] == "old"
@@ -0,0 +1,193 @@
+# test_audit_capture.py
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.audit import capture
+from core.audit.capture import capture_bulk_create
+from core.audit.models import AuditLog
+from core.test_AuditLogViewSet import audit_client  # noqa: F401
+from menu.models import SysMenu, SysRoleMenu
+from role.models import SysRole
+from user.bulk_actions import BulkUserAction
+
+User = get_user_model()
+
+
+def events(**filters):
+    return [
+        (log.action, log.resource_type, log.resource_id, log.detail["changes"])
+        for log in AuditLog.objects.filter(**filters).order_by("id")
+    ]
+
+
+@pytest.mark.django_db
+class TestChangeCapture:
+    def test_transaction_is_recorded_with_one_insert(
+        self, django_capture_on_commit_callbacks
+    ):
+        with CaptureQueriesContext(connection) as queries:
+            with django_capture_on_commit_callbacks(execute=True):
+                with transaction.atomic():
+                    role = SysRole.objects.create(name="Editor", code="editor")
+                    role.name = "Editors"
+                    role.save()
+                    menu = SysMenu.objects.create(name="Posts", path="/posts")
+
+        inserts = [
+            q
+            for q in queries
+            if q["sql"].startswith(f'INSERT INTO "{AuditLog._meta.db_table}"')
+        ]
+        assert len(inserts) == 1
+        assert events() == [
+            (
+                "CREATE",
+                "ROLE",
+                str(role.id),
+                {
+                    "id": [None, role.id],
+                    "name": [None, "Editors"],
+                    "code": [None, "editor"],
+                    "status": [None, 1],
+                    "is_system": [None, False],
+                },
+            ),
+            (
+                "CREATE",
+                "MENU",
+                str(menu.id),
+                {
+                    "id": [None, menu.id],
+                    "name": [None, "Posts"],
+                    "order_num": [None, 0],
+                    "path": [None, "/posts"],
+                    "status": [None, 1],
+                },
+            ),
+        ]
+
+    def test_update_records_changed_fields_only(
+        self, django_capture_on_commit_callbacks
+    ):
+        role = SysRole.objects.create(name="Editor", code="editor")
+        AuditLog.objects.all().delete()
+
+        with django_capture_on_commit_callbacks(execute=True):
+            with transaction.atomic():
+                role.remark = "Writes posts"
+                role.save()
+                role.save()
+
+        assert events() == [
+            ("UPDATE", "ROLE", str(role.id), {"remark": [None, "Writes posts"]})
+        ]
+
+    def test_rolled_back_and_short_lived_changes_leave_no_event(
+        self, django_capture_on_commit_callbacks
+    ):
+        with django_capture_on_commit_callbacks(execute=True):
+            with transaction.atomic():
+                SysRole.objects.create(name="Temp", code="temp").delete()
+                try:
+                    with transaction.atomic():
+                        SysMenu.objects.create(name="Gone")
+                        raise RuntimeError
+                except RuntimeError:
+                    pass
+                kept = SysMenu.objects.create(name="Kept")
+
+        assert [event[:3] for event in events()] == [("CREATE", "MENU", str(kept.id))]
+
+    def test_secrets_are_redacted(self, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=True):
+            user = User.objects.create_user(username="carol", password="secret-pass")
+
+        (event,) = events(resource_type="USER")
+        assert event[:3] == ("CREATE", "USER", str(user.id))
+        assert event[3]["password"] == "[REDACTED]"
+        assert event[3]["username"] == [None, "carol"]
+
+    def test_bulk_user_action_is_captured(self, django_capture_on_commit_callbacks):
+        user = User.objects.create_user(username="dave", password="pass")
+        user.status = 1
+        user.save()
+        AuditLog.objects.all().delete()
+
+        with django_capture_on_commit_callbacks(execute=True):
+            BulkUserAction("deactivate").run(User.objects.filter(pk=user.pk))
+
+        assert events() == [("UPDATE", "USER", str(user.id), {"status": [1, 0]})]
+
+    def test_request_user_is_recorded(
+        self, audit_client, django_capture_on_commit_callbacks  # noqa: F811
+    ):
+        client, admin = audit_client
+        role = SysRole.objects.create(name="Editor", code="editor")
+        old, new = SysMenu.objects.create(name="Old"), SysMenu.objects.create(
+            name="New"
+        )
+        SysRoleMenu.objects.create(role=role, menu=old)
+        AuditLog.objects.all().delete()
+
+        with django_capture_on_commit_callbacks(execute=True):
+            response = client.put(
+                reverse("role-menus", args=[role.id]),
+                {"menu_ids": [new.id]},
+                format="json",
+            )
+
+        assert response.status_code == 200
+        logs = list(AuditLog.objects.filter(resource_type="ROLE_MENU").order_by("id"))
+        assert [(log.action, log.resource_id) for log in logs] == [
+            ("DELETE", str(role.id)),
+            ("CREATE", str(role.id)),
+        ]
+        assert logs[0].detail["changes"]["menu_id"] == [old.id, None]
+        assert logs[1].detail["changes"]["menu_id"] == [None, new.id]
+        assert {log.username for log in logs} == {admin.username}
+        assert logs[0].user_id == admin.id
+
+    def test_rows_without_primary_key_are_kept_apart(
+        self, django_capture_on_commit_callbacks
+    ):
+        role = SysRole.objects.create(name="Editor", code="editor")
+        AuditLog.objects.all().delete()
+
+        with django_capture_on_commit_callbacks(execute=True):
+            with transaction.atomic():
+                # What bulk_create leaves behind on MySQL
+                capture_bulk_create(
+                    [SysRoleMenu(role=role, menu_id=menu_id) for menu_id in (1, 2)]
+                )
+
+        assert [event[3]["menu_id"] for event in events()] == [[None, 1], [None, 2]]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_failing_audit_write_does_not_fail_an_autocommit_save(monkeypatch):
+    def fail(entries):
+        raise RuntimeError("audit database is down")
+
+    monkeypatch.setattr(capture, "record_audit_entries", fail)
+
+    role = SysRole.objects.create(name="Editor", code="editor")
+
+    assert SysRole.objects.filter(pk=role.pk).exists()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_transaction_after_a_rollback_gets_a_new_batch():
+    try:
+        with transaction.atomic():
+            SysRole.objects.create(name="Gone", code="gone")
+            raise RuntimeError
+    except RuntimeError:
+        pass
+    with transaction.atomic():
+        role = SysRole.objects.create(name="Kept", code="kept")
+
+    assert [event[:3] for event in events()] == [("CREATE", "ROLE", str(role.id))]
@@ -0,0 +1,89 @@
+# test_audit_payload.py
+
+import json
+
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core.audit.models import AuditLog
+from core.audit.payload import REDACTED, PayloadPolicy, decode_detail
+from role.models import SysRole
+
+
+class TestPayloadPolicy:
+    def test_redacts_secret_keys_at_any_depth(self):
+        policy = PayloadPolicy()
+
+        cleaned = policy.clean(
+            {
+                "username": "alice",
+                "password": "hunter2",
+                "profile": {"api_key": "abc", "nested": [{"refresh_token": "x"}]},
+            }
+        )
+
+        assert cleaned == {
+            "username": "alice",
+            "password": REDACTED,
+            "profile": {"api_key": REDACTED, "nested": [{"refresh_token": REDACTED}]},
+        }
+
+    def test_truncates_long_strings_and_lists(self):
+        policy = PayloadPolicy(max_length=40, max_items=3)
+
+        cleaned = policy.clean({"comment": "x" * 1000, "ids": list(range(10))})
+
+        assert cleaned["comment"]["length"] == 1000
+        assert cleaned["comment"]["truncated"] == "x" * 10
+        assert len(cleaned["comment"]["sha256"]) == 64
+        assert cleaned["ids"] == [0, 1, 2, {"omitted_items": 7}]
+
+    def test_diff_keeps_only_changed_fields(self):
+        policy = PayloadPolicy()
+
+        changes = policy.diff(
+            {"email": "a@example.com", "phone": "1", "password": "old"},
+            {"email": "b@example.com", "phone": "1", "password": "new"},
+        )
+
+        assert changes == {
+            "email": ["a@example.com", "b@example.com"],
+            "password": REDACTED,
+        }
+
+    def test_compression_round_trip(self):
+        policy = PayloadPolicy(compression="zlib", compress_min_bytes=100)
+        detail = {"rows": [{"name": f"user{i}", "status": 1} for i in range(20)]}
+
+        stored = policy.build(detail)
+
+        assert "_compressed" in stored
+        assert len(json.dumps(stored)) < len(json.dumps(policy.clean(detail)))
+        assert decode_detail(stored) == policy.clean(detail)
+
+    def test_small_details_stay_plain(self):
+        policy = PayloadPolicy(compression="zlib", compress_min_bytes=1024)
+
+        assert policy.build({"a": 1}) == {"a": 1}
+
+
+@pytest.mark.django_db
+def test_signup_audit_does_not_store_the_password():
+    cache.clear()
+    SysRole.objects.create(name="Common User", code="common", is_system=True)
+    client = APIClient()
+    client.credentials(HTTP_ACCEPT_LANGUAGE="en")
+
+    response = client.post(
+        reverse("signup"),
+        {"username": "newbie", "email": "newbie@example.com", "password": "s3cret!"},
+        format="json",
+    )
+
+    assert response.status_code == 200
+    log = AuditLog.objects.get()
+    assert "s3cret!" not in json.dumps(log.detail)
+    assert log.detail["request_data"]["password"] == REDACTED
+    assert log.detail["response"]["id"] == response.data["data"]["id"]
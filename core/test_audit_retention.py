@@ -0,0 +1,160 @@
+# test_audit_retention.py
+
+import threading
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from core.audit import retention
+from core.audit.archive import archive_month
+from core.audit.models import AuditLog
+from core.audit.partitions import month_start
+from core.audit.retention import AuditPurger, archived_cutoff
+from core.audit.search import audit_search_index
+
+
+def create_log(timestamp, message="changed email"):
+    return AuditLog.objects.create(
+        username="alice",
+        action="UPDATE",
+        module="USER",
+        resource_type="USER",
+        resource_id="1",
+        message=message,
+        detail={},
+        timestamp=timestamp,
+    )
+
+
+CUTOFF = datetime(2024, 3, 1, tzinfo=dt_timezone.utc)
+
+
+@pytest.mark.django_db
+class TestAuditPurger:
+    def test_deletes_expired_rows_in_chunks(self):
+        expired = [create_log(CUTOFF - timedelta(days=day)) for day in range(1, 6)]
+        kept = create_log(CUTOFF)
+        audit_search_index.catch_up()
+        reports = []
+
+        purger = AuditPurger(CUTOFF, chunk_size=2, sleep=0)
+        deleted = purger.run(lambda p: reports.append((p.deleted, p.last_id)))
+
+        assert deleted == 5
+        assert list(AuditLog.objects.values_list("id", flat=True)) == [kept.id]
+        assert reports == [
+            (2, expired[1].id),
+            (4, expired[3].id),
+            (5, expired[4].id),
+        ]
+        assert list(audit_search_index.filter(AuditLog.objects.all(), "email")) == [
+            kept
+        ]
+
+    def test_stops_at_the_last_expired_id(self):
+        expired = [create_log(CUTOFF - timedelta(days=day)) for day in (2, 1)]
+        live = [create_log(CUTOFF + timedelta(days=day)) for day in (1, 2)]
+
+        purger = AuditPurger(CUTOFF, chunk_size=2, sleep=0)
+        assert purger.delete_chunk() == 2
+        assert purger.max_id == expired[-1].id
+        with CaptureQueriesContext(connection) as queries:
+            assert purger.delete_chunk() == 0
+        assert len(queries) == 0
+        assert set(AuditLog.objects.values_list("id", flat=True)) == {
+            log.id for log in live
+        }
+
+    def test_resumes_after_id(self):
+        first, second = create_log(CUTOFF - timedelta(days=2)), create_log(
+            CUTOFF - timedelta(days=1)
+        )
+
+        AuditPurger(CUTOFF, sleep=0, after_id=first.id).run()
+
+        assert list(AuditLog.objects.all()) == [first]
+        assert not AuditLog.objects.filter(id=second.id).exists()
+
+    def test_waits_while_replicas_lag(self, monkeypatch):
+        create_log(CUTOFF - timedelta(days=1))
+        lags = iter([30, 12])
+        monkeypatch.setattr(retention, "replication_lag", lambda aliases: next(lags, 0))
+        waits = []
+
+        class Stop(threading.Event):
+            def wait(self, timeout=None):
+                waits.append(timeout)
+
+        AuditPurger(CUTOFF, sleep=0, replicas=["replica"]).run(stop=Stop())
+
+        assert waits[:2] == [0.5, 1.0]
+        assert not AuditLog.objects.exists()
+
+    def test_stop_ends_the_purge(self):
+        create_log(CUTOFF - timedelta(days=1))
+        stop = threading.Event()
+        stop.set()
+
+        assert AuditPurger(CUTOFF).run(stop=stop) == 0
+        assert AuditLog.objects.count() == 1
+
+
+@pytest.mark.django_db
+class TestPurgeAuditLogsCommand:
+    def test_purges_rows_older_than_days(self):
+        create_log(timezone.now() - timedelta(days=40))
+        kept = create_log(timezone.now() - timedelta(days=10))
+        out = StringIO()
+
+        call_command(
+            "purge_audit_logs", "--dry-run", "--days=30", "--unarchived", stdout=out
+        )
+        assert out.getvalue().startswith("1 audit rows before")
+        assert AuditLog.objects.count() == 2
+
+        call_command(
+            "purge_audit_logs", "--days=30", "--unarchived", "--sleep-ms=0", stdout=out
+        )
+        assert list(AuditLog.objects.all()) == [kept]
+        assert "resume with --after-id" in out.getvalue()
+        assert "Purged 1 audit rows" in out.getvalue()
+
+    def test_keeps_months_not_archived_yet(self, tmp_path):
+        now = timezone.now()
+        old = create_log(now - timedelta(days=130))
+        newer = create_log(now - timedelta(days=70))
+        archive_month(month_start(old.timestamp), str(tmp_path), drop=False)
+        out = StringIO()
+
+        call_command(
+            "purge_audit_logs",
+            "--days=30",
+            "--sleep-ms=0",
+            f"--archive-dir={tmp_path}",
+            stdout=out,
+        )
+
+        assert "not archived yet" in out.getvalue()
+        assert not AuditLog.objects.filter(id=old.id).exists()
+        assert AuditLog.objects.filter(id=newer.id).exists()
+
+
+@pytest.mark.django_db
+def test_archived_cutoff_stops_at_the_first_unarchived_month(tmp_path):
+    create_log(datetime(2024, 1, 10, tzinfo=dt_timezone.utc))
+    create_log(datetime(2024, 2, 10, tzinfo=dt_timezone.utc))
+
+    assert archived_cutoff(CUTOFF, str(tmp_path)) == datetime(
+        2024, 1, 1, tzinfo=dt_timezone.utc
+    )
+    archive_month(date(2024, 1, 1), str(tmp_path), drop=False)
+    assert archived_cutoff(CUTOFF, str(tmp_path)) == datetime(
+        2024, 2, 1, tzinfo=dt_timezone.utc
+    )
+    archive_month(date(2024, 2, 1), str(tmp_path), drop=False)
+    assert archived_cutoff(CUTOFF, str(tmp_path)) == CUTOFF
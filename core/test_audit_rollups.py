@@ -0,0 +1,146 @@
+# test_audit_rollups.py
+
+from datetime import datetime, timezone as dt_timezone
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+
+from core.audit.models import AuditLog, AuditRollup
+from core.audit.writer import build_entry, persist_audit_entries
+from core.test_AuditLogViewSet import audit_client  # noqa: F401
+
+
+def at(day, hour=12):
+    return datetime(2024, 3, day, hour, 30, tzinfo=dt_timezone.utc)
+
+
+def entry(timestamp, module="USER", action="UPDATE", status=True, username="alice"):
+    return build_entry(
+        username=username,
+        action=action,
+        module=module,
+        resource_type=module,
+        resource_id="1",
+        detail={},
+        status=status,
+        timestamp=timestamp,
+    )
+
+
+def rollup_counts(period):
+    return {
+        (row.bucket, row.module, row.action, row.status, row.username): row.count
+        for row in AuditRollup.objects.filter(period=period)
+    }
+
+
+@pytest.mark.django_db
+class TestRollups:
+    def test_writer_adds_to_existing_buckets(self):
+        persist_audit_entries([entry(at(1)), entry(at(1, 13))])
+        persist_audit_entries([entry(at(1)), entry(at(1), action="DELETE")])
+
+        assert rollup_counts("day") == {
+            (at(1, 0).replace(minute=0), "USER", "UPDATE", True, "alice"): 3,
+            (at(1, 0).replace(minute=0), "USER", "DELETE", True, "alice"): 1,
+        }
+        assert (
+            rollup_counts("hour")[
+                (at(1).replace(minute=0), "USER", "UPDATE", True, "alice")
+            ]
+            == 2
+        )
+
+    def test_rebuild_matches_incremental_rollups(self):
+        persist_audit_entries(
+            [
+                entry(at(1)),
+                entry(at(1, 3), status=False),
+                entry(at(2), module="ROLE", username="bob"),
+            ]
+        )
+        incremental = {period: rollup_counts(period) for period in ("hour", "day")}
+        AuditRollup.objects.all().delete()
+        # Rows written around the writer need a rebuild
+        AuditLog.objects.create(**entry(at(3)))
+
+        call_command("rebuild_audit_rollups", "--from=2024-03-01", stdout=StringIO())
+
+        rebuilt = rollup_counts("day")
+        assert (
+            rebuilt.pop((at(3, 0).replace(minute=0), "USER", "UPDATE", True, "alice"))
+            == 1
+        )
+        assert rebuilt == incremental["day"]
+        assert len(rollup_counts("hour")) == len(incremental["hour"]) + 1
+
+
+@pytest.mark.django_db
+class TestAuditStatsView:
+    def test_counts_per_day_grouped_by_module(self, audit_client):  # noqa: F811
+        client, _ = audit_client
+        persist_audit_entries(
+            [
+                entry(at(1)),
+                entry(at(1), module="ROLE"),
+                entry(at(2)),
+                entry(at(2), action="DELETE"),
+                entry(at(5)),
+            ]
+        )
+
+        response = client.get(
+            reverse("audit-stats"),
+            {
+                "start_date": "2024-03-01T00:00:00Z",
+                "end_date": "2024-03-03T00:00:00Z",
+                "group_by": "module",
+            },
+        )
+
+        assert response.status_code == 200
+        buckets = [
+            (row["bucket"].day, row["module"], row["count"])
+            for row in response.data["data"]["buckets"]
+        ]
+        assert buckets == [(1, "ROLE", 1), (1, "USER", 1), (2, "USER", 2)]
+        assert response.data["data"]["total"] == 4
+
+    def test_filters_and_hourly_period(self, audit_client):  # noqa: F811
+        client, _ = audit_client
+        persist_audit_entries(
+            [entry(at(1, 9)), entry(at(1, 9), status=False), entry(at(1, 10))]
+        )
+
+        response = client.get(
+            reverse("audit-stats"),
+            {
+                "period": "hour",
+                "start_date": "2024-03-01T00:00:00Z",
+                "end_date": "2024-03-02T00:00:00Z",
+                "status": "true",
+                "user": "ali",
+            },
+        )
+
+        assert [
+            (row["bucket"].hour, row["count"])
+            for row in response.data["data"]["buckets"]
+        ] == [(9, 1), (10, 1)]
+
+    def test_rejects_unknown_dimension_and_long_ranges(
+        self, audit_client
+    ):  # noqa: F811
+        client, _ = audit_client
+
+        assert (
+            client.get(reverse("audit-stats"), {"group_by": "detail"}).status_code
+            == 400
+        )
+        response = client.get(
+            reverse("audit-stats"),
+            {"period": "hour", "start_date": "2024-01-01T00:00:00Z"},
+        )
+        assert response.status_code == 400
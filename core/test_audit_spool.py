@@ -0,0 +1,167 @@
+# test_audit_spool.py
+
+import os
+import threading
+import time
+
+import pytest
+
+from core.audit import spool
+from core.audit.models import AuditLog, AuditSpoolOffset
+from core.audit.spool import SpoolLoader, SpoolWriter, encode_record, segment_id
+from core.audit.writer import build_entry, record_audit
+
+
+def make_entry(i):
+    return build_entry(
+        username="admin",
+        action="UPDATE",
+        module="USER",
+        resource_type="USER",
+        resource_id=str(i),
+        detail={"i": i},
+    )
+
+
+def write_entries(spool_dir, count, segment_bytes=1 << 20):
+    writer = SpoolWriter(spool_dir, segment_bytes=segment_bytes)
+    for i in range(count):
+        writer.append(make_entry(i))
+    return writer
+
+
+@pytest.mark.django_db
+class TestSpoolLoader:
+    def test_loads_each_record_once(self, tmp_path):
+        write_entries(tmp_path, 5)
+        loader = SpoolLoader(tmp_path, batch_size=2)
+
+        assert loader.run_once() == 5
+        assert loader.run_once() == 0
+        assert sorted(AuditLog.objects.values_list("resource_id", flat=True)) == [
+            str(i) for i in range(5)
+        ]
+
+    def test_open_segment_keeps_loading_new_records(self, tmp_path):
+        writer = write_entries(tmp_path, 2)
+        loader = SpoolLoader(tmp_path)
+        loader.run_once()
+
+        writer.append(make_entry(2))
+        assert loader.run_once() == 1
+        assert AuditLog.objects.count() == 3
+
+    def test_sealed_segment_is_removed_after_loading(self, tmp_path):
+        writer = write_entries(tmp_path, 3)
+        writer.close()
+        name = os.listdir(tmp_path)[0]
+        assert name.endswith(".seg")
+
+        SpoolLoader(tmp_path).run_once()
+
+        assert os.listdir(tmp_path) == []
+        # The offset survives so a late loader cannot replay the segment
+        assert AuditSpoolOffset.objects.get(segment=segment_id(name)).offset > 0
+
+    def test_incomplete_record_waits_for_the_writer(self, tmp_path):
+        writer = write_entries(tmp_path, 2)
+        record = encode_record(make_entry(2))
+        with open(writer._path, "ab") as f:
+            f.write(record[:10])
+
+        assert SpoolLoader(tmp_path).run_once() == 2
+
+        with open(writer._path, "ab") as f:
+            f.write(record[10:])
+        assert SpoolLoader(tmp_path).run_once() == 1
+
+    def test_failed_batch_is_retried_without_duplicates(self, tmp_path, monkeypatch):
+        write_entries(tmp_path, 4)
+        persist = spool.persist_audit_entries
+        calls = []
+
+        def flaky_persist(entries):
+            calls.append(len(entries))
+            if len(calls) == 2:
+                raise RuntimeError("database unavailable")
+            persist(entries)
+
+        monkeypatch.setattr(spool, "persist_audit_entries", flaky_persist)
+        with pytest.raises(RuntimeError):
+            SpoolLoader(tmp_path, batch_size=2).run_once()
+        assert AuditLog.objects.count() == 2
+
+        SpoolLoader(tmp_path, batch_size=2).run_once()
+        assert sorted(AuditLog.objects.values_list("resource_id", flat=True)) == [
+            "0",
+            "1",
+            "2",
+            "3",
+        ]
+
+    def test_corrupt_segment_is_set_aside(self, tmp_path):
+        writer = write_entries(tmp_path, 1)
+        writer.close()
+        path = os.path.join(tmp_path, os.listdir(tmp_path)[0])
+        with open(path, "r+b") as f:
+            f.seek(10)
+            f.write(b"XX")
+
+        assert SpoolLoader(tmp_path).run_once() == 0
+        assert os.listdir(tmp_path) == [os.path.basename(path) + ".corrupt"]
+
+    @pytest.mark.parametrize("age, taken_over", [(3600, True), (0, False)])
+    def test_open_segment_of_another_host(self, tmp_path, age, taken_over):
+        path = tmp_path / f"other-host-123-{time.time_ns()}.open"
+        path.write_bytes(encode_record(make_entry(1)))
+        mtime = time.time() - age
+        os.utime(path, (mtime, mtime))
+
+        assert SpoolLoader(tmp_path, lease=600).run_once() == 1
+        # A live writer elsewhere keeps its segment, a dead one's is finished
+        assert path.exists() is not taken_over
+        assert os.listdir(tmp_path) == ([] if taken_over else [path.name])
+
+
+def test_quiet_writer_is_synced_within_the_interval(tmp_path, monkeypatch):
+    synced = []
+    fsync = os.fsync
+    monkeypatch.setattr(
+        spool.os,
+        "fsync",
+        lambda fd: synced.append(threading.current_thread()) or fsync(fd),
+    )
+    writer = SpoolWriter(tmp_path, fsync_interval=0.05)
+
+    writer.append(make_entry(1))
+    time.sleep(0.06)
+    writer.append(make_entry(2))
+    deadline = time.monotonic() + 2
+    while not synced and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert synced, "the last append was never fsynced"
+    # Appends leave syncing to the flusher, even past the interval
+    assert threading.current_thread() not in synced
+    writer.close()
+
+
+@pytest.mark.django_db
+def test_record_audit_appends_to_spool(settings, tmp_path, monkeypatch):
+    settings.AUDIT_PIPELINE = "spool"
+    settings.AUDIT_SPOOL_DIR = tmp_path
+    settings.AUDIT_SPOOL_LOADER_THREAD = False
+    monkeypatch.setattr(spool, "_writer", None)
+
+    record_audit(
+        username="admin",
+        action="DELETE",
+        module="USER",
+        resource_type="USER",
+        resource_id="7",
+        detail={},
+    )
+
+    assert AuditLog.objects.count() == 0
+    assert SpoolLoader(tmp_path).run_once() == 1
+    assert AuditLog.objects.get().resource_id == "7"
@@ -0,0 +1,142 @@
+# test_audit_writer.py
+
+import os
+import threading
+
+import pytest
+
+from core.audit.models import AuditLog
+from core.audit.writer import (
+    AsyncAuditWriter,
+    build_entry,
+    load_spill_file,
+    persist_audit_entries,
+)
+
+
+class RecordingPersist:
+    def __init__(self, fail=False, gate=None):
+        self.batches = []
+        self.fail = fail
+        self.gate = gate
+
+    def __call__(self, entries):
+        if self.gate:
+            self.gate.wait()
+        if self.fail:
+            raise RuntimeError("database unavailable")
+        self.batches.append(list(entries))
+
+    @property
+    def entries(self):
+        return [entry for batch in self.batches for entry in batch]
+
+
+def make_entry(i):
+    return build_entry(
+        username="admin",
+        action="UPDATE",
+        module="USER",
+        resource_type="USER",
+        resource_id=str(i),
+        detail={"i": i},
+    )
+
+
+class TestAsyncAuditWriter:
+    def test_batches_by_size_and_flushes_on_shutdown(self):
+        persist = RecordingPersist()
+        writer = AsyncAuditWriter(persist=persist, batch_size=3, flush_interval=60)
+
+        for i in range(7):
+            writer.submit(make_entry(i))
+        writer.shutdown()
+
+        assert [len(batch) for batch in persist.batches] == [3, 3, 1]
+        assert [e["resource_id"] for e in persist.entries] == [str(i) for i in range(7)]
+
+    def test_flushes_after_interval(self):
+        persist = RecordingPersist()
+        writer = AsyncAuditWriter(persist=persist, batch_size=100, flush_interval=0.05)
+
+        writer.submit(make_entry(1))
+        writer._thread.join(0.5)
+
+        assert len(persist.entries) == 1
+        writer.shutdown()
+
+    def test_drop_policy_counts_dropped_entries(self):
+        gate = threading.Event()
+        persist = RecordingPersist(gate=gate)
+        writer = AsyncAuditWriter(
+            persist=persist,
+            queue_size=2,
+            batch_size=1,
+            flush_interval=0,
+            overflow="drop",
+        )
+
+        # The flusher holds one entry while blocked on the gate
+        for i in range(10):
+            writer.submit(make_entry(i))
+        gate.set()
+        writer.shutdown()
+
+        assert writer.dropped > 0
+        assert len(persist.entries) + writer.dropped == 10
+
+    def test_spill_policy_keeps_every_entry(self, tmp_path):
+        gate = threading.Event()
+        persist = RecordingPersist(gate=gate)
+        writer = AsyncAuditWriter(
+            persist=persist,
+            queue_size=2,
+            batch_size=1,
+            flush_interval=0,
+            overflow="spill",
+            spill_dir=str(tmp_path),
+        )
+
+        for i in range(10):
+            writer.submit(make_entry(i))
+        assert writer.spilled > 0
+        gate.set()
+        writer.shutdown()
+
+        assert sorted(int(e["resource_id"]) for e in persist.entries) == list(range(10))
+        assert os.listdir(tmp_path) == []
+
+    def test_failed_batches_are_spilled(self, tmp_path):
+        persist = RecordingPersist(fail=True)
+        writer = AsyncAuditWriter(
+            persist=persist, batch_size=10, flush_interval=60, spill_dir=str(tmp_path)
+        )
+
+        for i in range(4):
+            writer.submit(make_entry(i))
+        writer.shutdown()
+
+        assert writer.failed >= 4
+        files = list(tmp_path.iterdir())
+        assert len(files) == 1
+        assert len(files[0].read_text().splitlines()) == 4
+
+
+@pytest.mark.django_db
+class TestLoadSpillFile:
+    def test_spilled_entries_are_inserted(self, tmp_path):
+        writer = AsyncAuditWriter(
+            persist=RecordingPersist(fail=True),
+            flush_interval=60,
+            spill_dir=str(tmp_path),
+        )
+        for i in range(3):
+            writer.submit(make_entry(i))
+        writer.shutdown()
+
+        path = next(tmp_path.iterdir())
+        load_spill_file(str(path), persist_audit_entries, batch_size=2)
+
+        assert AuditLog.objects.count() == 3
+        assert AuditLog.objects.filter(resource_id="2", detail={"i": 2}).exists()
+        assert not path.exists()
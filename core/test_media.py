@@ -0,0 +1,109 @@
+# test_media.py
+
+from datetime import timedelta
+
+import pytest
+from django.conf import settings as django_settings
+from django.contrib.auth import get_user_model
+from django.test import Client
+from django.utils.http import http_date
+from rest_framework_simplejwt.tokens import AccessToken
+
+AVATAR_PATH = "avatars/ab/" + "ab" * 32 + "/48.webp"
+
+
+@pytest.fixture
+def media(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    settings.MEDIA_REQUIRE_AUTH = False
+    settings.MEDIA_ACCEL = None
+    target = tmp_path / AVATAR_PATH
+    target.parent.mkdir(parents=True)
+    target.write_bytes(bytes(range(100)))
+    return target
+
+
+@pytest.mark.django_db
+class TestServeMedia:
+    def test_full_response_with_validators(self, media):
+        response = Client().get(f"/media/{AVATAR_PATH}")
+
+        assert response.status_code == 200
+        assert b"".join(response.streaming_content) == bytes(range(100))
+        assert response["Content-Type"] == "image/webp"
+        assert response["Cache-Control"] == "public, max-age=31536000, immutable"
+        assert response["ETag"] and response["Last-Modified"]
+
+    def test_conditional_get(self, media):
+        client = Client()
+        etag = client.get(f"/media/{AVATAR_PATH}")["ETag"]
+
+        assert (
+            client.get(f"/media/{AVATAR_PATH}", HTTP_IF_NONE_MATCH=etag).status_code
+            == 304
+        )
+        since = http_date(media.stat().st_mtime + 60)
+        assert (
+            client.get(
+                f"/media/{AVATAR_PATH}", HTTP_IF_MODIFIED_SINCE=since
+            ).status_code
+            == 304
+        )
+
+    @pytest.mark.parametrize(
+        "header, status, body",
+        [
+            ("bytes=10-19", 206, bytes(range(10, 20))),
+            ("bytes=-5", 206, bytes(range(95, 100))),
+            ("bytes=90-", 206, bytes(range(90, 100))),
+            ("bytes=100-", 416, b""),
+            ("bytes=0-1,5-6", 200, bytes(range(100))),
+        ],
+    )
+    def test_ranges(self, media, header, status, body):
+        response = Client().get(f"/media/{AVATAR_PATH}", HTTP_RANGE=header)
+
+        assert response.status_code == status
+        content = (
+            b"".join(response.streaming_content)
+            if response.streaming
+            else response.content
+        )
+        assert content == body
+
+    def test_stale_if_range_returns_full_file(self, media):
+        response = Client().get(
+            f"/media/{AVATAR_PATH}", HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE='"stale"'
+        )
+
+        assert response.status_code == 200
+
+    def test_accel_redirect(self, media, settings):
+        settings.MEDIA_ACCEL = "nginx"
+
+        response = Client().get(f"/media/{AVATAR_PATH}")
+
+        assert response["X-Accel-Redirect"] == f"/protected-media/{AVATAR_PATH}"
+        assert response.content == b""
+
+    def test_requires_authentication(self, media, settings):
+        settings.MEDIA_REQUIRE_AUTH = True
+
+        assert Client().get(f"/media/{AVATAR_PATH}").status_code == 401
+
+    def test_expired_cookie_is_unauthorized(self, media, settings):
+        settings.MEDIA_REQUIRE_AUTH = True
+        user = get_user_model().objects.create_user(username="erin", password="x")
+        token = AccessToken.for_user(user)
+        token.set_exp(lifetime=-timedelta(minutes=1))
+        client = Client()
+        client.cookies[django_settings.SIMPLE_JWT["AUTH_COOKIE"]] = str(token)
+
+        assert client.get(f"/media/{AVATAR_PATH}").status_code == 401
+
+        client.cookies[django_settings.SIMPLE_JWT["AUTH_COOKIE"]] = "not-a-token"
+        assert client.get(f"/media/{AVATAR_PATH}").status_code == 401
+
+    @pytest.mark.parametrize("path", ["../secret.txt", "avatars/.hidden"])
+    def test_rejects_paths_outside_media(self, media, path):
+        assert Client().get(f"/media/{path}").status_code == 404
@@ -49,6 +49,7 @@ MIDDLEWARE = [
     "django.middleware.locale.LocaleMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "core.audit.middleware.AuditContextMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -118,11 +119,45 @@ USE_TZ = True
 
 # Static files (CSS, JavaScript, Images)
 STATIC_URL = "static/"
+STATIC_ROOT = BASE_DIR / "staticfiles"
+
+# Precompiled per-role-set menu trees, written under STATIC_ROOT
+MENU_MANIFEST_DIR = "menus"
+# Role set -> compiled file index, private: it lists every role set's tree
+MENU_MANIFEST_INDEX = os.getenv(
+    "MENU_MANIFEST_INDEX", BASE_DIR / "var" / "menu_manifest.json"
+)
+MENU_MANIFEST_AUTO_REBUILD = True  # Rebuild on menu / role-menu changes
+MENU_MANIFEST_REBUILD_DELAY = 1.0  # Debounce window in seconds
+
+# Seconds before other processes pick up system role changes
+ROLE_REGISTRY_TTL = 300
+
+# Full-text search indexes (MySQL FULLTEXT/ngram, SQLite FTS5), set to False
+# to force the icontains fallback
+FULLTEXT_SEARCH_ENABLED = True
 
 # Media files (User uploaded content)
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Media delivery (core.media.serve_media). Requests are authorized by Django,
+# MEDIA_ACCEL hands the transfer to the front server: "nginx" sends
+# X-Accel-Redirect to MEDIA_ACCEL_PREFIX (an internal location aliased to
+# MEDIA_ROOT), "sendfile" sends X-Sendfile. None streams from Django.
+MEDIA_REQUIRE_AUTH = True
+MEDIA_ACCEL = os.getenv("MEDIA_ACCEL") or None
+MEDIA_ACCEL_PREFIX = "/protected-media/"
+# Paths whose content never changes, served with an immutable Cache-Control
+MEDIA_IMMUTABLE_PATHS = [r"^avatars/[0-9a-f]{2}/[0-9a-f]{64}/"]
+
+# Avatar uploads are re-encoded into these square sizes (WebP and JPEG)
+AVATAR_SIZES = (48, 128, 256)
+AVATAR_MAX_PIXELS = 40_000_000  # Reject larger images before decoding
+AVATAR_PROCESS_ASYNC = True  # Render on a worker pool, not the request thread
+AVATAR_PROCESSING_WORKERS = 2
+AVATAR_PROCESSING_WAIT = 2.0  # Seconds a request waits before answering 202
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
@@ -199,6 +234,86 @@ RATE_LIMITS = {
 }
 
 
+# Bulk user import (users/import/ endpoint)
+USER_IMPORT_CHUNK_SIZE = 1000
+# Hashing processes, one pool per server process shared by all import requests
+USER_IMPORT_WORKERS = int(os.getenv("USER_IMPORT_WORKERS", "2"))
+
+# Users per query when streaming users/export/
+USER_EXPORT_CHUNK_SIZE = 2000
+
+# Most users a single users/bulk/ request may change
+USER_BULK_ACTION_LIMIT = 1000
+
+# How audit entries reach the database: "sync" (INSERT in the request),
+# "queue" (batched by a background thread) or "spool" (appended to a local
+# file and loaded by core.audit.spool.SpoolLoader)
+AUDIT_PIPELINE = os.getenv("AUDIT_PIPELINE", "spool")
+# "queue" pipeline
+AUDIT_QUEUE_SIZE = 10000
+AUDIT_BATCH_SIZE = 200  # Flush after this many entries...
+AUDIT_FLUSH_INTERVAL_MS = 500  # ...or this long after the first queued one
+# What a full queue does: "block" (up to AUDIT_BLOCK_TIMEOUT seconds, then
+# drop), "drop" (counted and logged) or "spill" to files in AUDIT_SPILL_DIR
+AUDIT_OVERFLOW_POLICY = os.getenv("AUDIT_OVERFLOW_POLICY", "spill")
+AUDIT_BLOCK_TIMEOUT = 1.0
+AUDIT_SPILL_DIR = BASE_DIR / "logs" / "audit_spill"
+# "spool" pipeline
+AUDIT_SPOOL_DIR = BASE_DIR / "logs" / "audit_spool"
+AUDIT_SPOOL_SEGMENT_BYTES = 64 * 1024 * 1024
+AUDIT_SPOOL_FSYNC_MS = 200  # Most a host crash can lose
+AUDIT_SPOOL_LOAD_BATCH_SIZE = 1000
+# Open segments of other hosts (shared spool directory) untouched for this
+# long are taken over by the loader; writers touch theirs every tenth of it
+AUDIT_SPOOL_LEASE_SECONDS = 600
+# Load the spool from a thread in each web process; turn off when a
+# separate `manage.py load_audit_spool --follow` runs instead
+AUDIT_SPOOL_LOADER_THREAD = os.getenv("AUDIT_SPOOL_LOADER_THREAD", "True") == "True"
+# Audit detail payloads: values under keys containing one of
+# AUDIT_REDACT_KEYS are redacted, longer strings are cut to a prefix plus
+# length and SHA-256, lists to AUDIT_MAX_ITEMS. AUDIT_DETAIL_COMPRESSION
+# ("zlib", or "zstd" with the zstandard package) compresses details of at
+# least AUDIT_COMPRESS_MIN_BYTES
+AUDIT_REDACT_KEYS = (
+    "password",
+    "passwd",
+    "secret",
+    "token",
+    "authorization",
+    "cookie",
+    "csrf",
+    "api_key",
+    "apikey",
+    "private_key",
+)
+AUDIT_MAX_VALUE_LENGTH = 256
+AUDIT_MAX_ITEMS = 20
+AUDIT_MAX_DEPTH = 4
+AUDIT_DETAIL_COMPRESSION = os.getenv("AUDIT_DETAIL_COMPRESSION") or None
+AUDIT_COMPRESS_MIN_BYTES = 1024
+# Months kept in the audit table; `manage.py archive_audit_logs` moves older
+# ones to gzipped JSONL in AUDIT_ARCHIVE_DIR (`query_audit_archive` reads them)
+AUDIT_RETENTION_MONTHS = 12
+AUDIT_ARCHIVE_DIR = os.getenv("AUDIT_ARCHIVE_DIR", BASE_DIR / "archive" / "audit")
+# `manage.py purge_audit_logs` deletes rows older than
+# AUDIT_PURGE_RETENTION_MONTHS without archiving them, but only from months
+# already in AUDIT_ARCHIVE_DIR unless run with --unarchived. It works in
+# chunks, pausing while a replica in AUDIT_PURGE_REPLICAS (database aliases)
+# lags more than AUDIT_PURGE_MAX_LAG seconds or a lock wait exceeds
+# AUDIT_PURGE_MAX_LOCK_WAIT seconds
+AUDIT_PURGE_RETENTION_MONTHS = 24
+AUDIT_PURGE_CHUNK_SIZE = 1000
+AUDIT_PURGE_SLEEP_MS = 100
+AUDIT_PURGE_REPLICAS = []
+AUDIT_PURGE_MAX_LAG = 5
+AUDIT_PURGE_MAX_LOCK_WAIT = 2
+# Audit events per query when streaming audit/logs/export/
+AUDIT_EXPORT_CHUNK_SIZE = 2000
+# Record creates, updates and deletes of users, roles, menus and their links
+# as audit events, one batched insert per committed transaction
+# (core.audit.capture)
+AUDIT_CAPTURE_CHANGES = os.getenv("AUDIT_CAPTURE_CHANGES", "True") == "True"
+
 # Logging configuration
 # Create log directory if it doesn't exist
 LOG_DIR = BASE_DIR / "logs"
@@ -11,4 +11,22 @@ DATABASES = {
         'HOST': 'localhost',
         'PORT': '3306',
     }
-}
\ No newline at end of file
+}
+
+# Avoid background manifest rebuilds touching the filesystem during tests
+MENU_MANIFEST_AUTO_REBUILD = False
+
+# Fast hashing, tests create many users
+PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+
+# Hash imported passwords in-process
+USER_IMPORT_WORKERS = 0
+
+# Roles are recreated in every test, never serve them from the registry cache
+ROLE_REGISTRY_TTL = 0
+
+# Render avatars inline so tests see the result in their transaction
+AVATAR_PROCESS_ASYNC = False
+
+# Write audit entries inside the request so tests can assert on them
+AUDIT_PIPELINE = "sync"
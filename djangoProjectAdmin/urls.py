@@ -15,13 +15,15 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 
+import re
+
 from django.conf.urls.i18n import i18n_patterns
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
 from rest_framework_simplejwt import views as jwt_views
 from django.conf import settings
-from django.conf.urls.static import static
-from core.audit.views import AuditLogViewSet
+from core.audit.views import AuditLogExportView, AuditLogViewSet, AuditStatsView
+from core.media import serve_media
 
 
 # API URL patterns
@@ -40,6 +42,13 @@ api_patterns = [
     path("role/", include("role.urls")),
     path("menu/", include("menu.urls")),
     path("audit/logs/", AuditLogViewSet.as_view({"get": "list"}), name="audit-logs"),
+    path(
+        "audit/logs/<int:pk>/",
+        AuditLogViewSet.as_view({"get": "retrieve"}),
+        name="audit-log-detail",
+    ),
+    path("audit/logs/export/", AuditLogExportView.as_view(), name="audit-log-export"),
+    path("audit/stats/", AuditStatsView.as_view(), name="audit-stats"),
 ]
 
 # Main URL patterns with language support
@@ -50,5 +59,12 @@ urlpatterns = i18n_patterns(
     path("api/", include(api_patterns)),
 )
 
-# Serve media files
-urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+# Serve media files, authorized here and sent by the front server when
+# MEDIA_ACCEL is configured
+urlpatterns += [
+    re_path(
+        r"^%s(?P<path>.+)$" % re.escape(settings.MEDIA_URL.lstrip("/")),
+        serve_media,
+        name="media",
+    ),
+]
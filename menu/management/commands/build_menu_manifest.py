@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from menu.manifest import build_manifest, get_manifest_dir
+
+
+class Command(BaseCommand):
+    help = (
+        "Precompile the menu tree of every assigned role combination into "
+        "content-hashed JSON files under STATIC_ROOT"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--no-prune",
+            action="store_true",
+            help="Keep compiled files that are no longer referenced by the manifest",
+        )
+
+    def handle(self, *args, **options):
+        role_sets = build_manifest(prune=not options["no_prune"])
+        files = set(role_sets.values())
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Compiled {len(role_sets)} role sets into {len(files)} files "
+                f"in {get_manifest_dir()}"
+            )
+        )
@@ -0,0 +1,274 @@
+# menu/manifest.py
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, Max
+from django.templatetags.static import static
+
+from core.logging.utils import get_logger
+from role.models import SysRole, SysUserRole
+from .models import SysMenu, SysRoleMenu
+from .serializers import MenuSerializer
+
+logger = get_logger(__name__)
+
+_manifest_lock = threading.Lock()
+_manifest_cache = {"mtime": None, "data": None}
+
+_rebuild_lock = threading.Lock()
+_rebuild_timer = None
+
+
+def get_manifest_dir():
+    """Directory under STATIC_ROOT holding the compiled menu trees."""
+    return Path(settings.STATIC_ROOT) / settings.MENU_MANIFEST_DIR
+
+
+def get_manifest_path():
+    """The role set index, kept outside the publicly served STATIC_ROOT."""
+    return Path(settings.MENU_MANIFEST_INDEX)
+
+
+def role_set_key(role_ids):
+    """Stable manifest key for a set of role ids, e.g. ``"1-2-3"``."""
+    return "-".join(str(role_id) for role_id in sorted(set(role_ids))) or "none"
+
+
+def build_menu_tree(menus):
+    """Build the nested menu tree returned by ``UserMenuView``."""
+    menu_dict = {}
+    for menu in menus:
+        menu_dict[menu.id] = MenuSerializer(menu).data
+        menu_dict[menu.id]["children"] = []
+
+    tree = []
+    for menu in menus:
+        if menu.parent_id and menu.parent_id in menu_dict:
+            menu_dict[menu.parent_id]["children"].append(menu_dict[menu.id])
+        else:
+            tree.append(menu_dict[menu.id])
+
+    return tree
+
+
+def get_menus_for_roles(role_ids):
+    # Disabled and soft deleted roles grant nothing
+    menu_ids = (
+        SysRoleMenu.objects.filter(
+            role_id__in=list(role_ids), role__status=1, role__deleted_at__isnull=True
+        )
+        .values_list("menu_id", flat=True)
+        .distinct()
+    )
+    return SysMenu.objects.filter(
+        id__in=menu_ids, status=1, deleted_at__isnull=True
+    ).order_by("order_num")
+
+
+def role_set_version(role_ids):
+    """
+    Fingerprint of everything the menu tree of a role set is built from,
+    read from the database so every host sees a change at once: the roles'
+    and menus' last update plus the grant and menu counts, which also move on
+    deletes.
+    """
+    role_ids = sorted(set(role_ids))
+    roles = SysRole.objects.filter(id__in=role_ids).aggregate(
+        changed=Max("update_time"), count=Count("id")
+    )
+    grants = SysRoleMenu.objects.filter(role_id__in=role_ids).aggregate(
+        last=Max("id"), count=Count("id")
+    )
+    menus = SysMenu.objects.aggregate(changed=Max("update_time"), count=Count("id"))
+    state = [
+        roles["changed"],
+        roles["count"],
+        grants["last"],
+        grants["count"],
+        menus["changed"],
+        menus["count"],
+    ]
+    return hashlib.sha256(json.dumps(state, default=str).encode()).hexdigest()[:16]
+
+
+def get_assigned_role_sets():
+    """Distinct role combinations currently assigned to users."""
+    role_sets = set()
+    current_user, current_roles = None, set()
+    links = (
+        SysUserRole.objects.order_by("user_id")
+        .values_list("user_id", "role_id")
+        .iterator(chunk_size=5000)
+    )
+    for user_id, role_id in links:
+        if user_id != current_user:
+            if current_roles:
+                role_sets.add(frozenset(current_roles))
+            current_user, current_roles = user_id, set()
+        current_roles.add(role_id)
+    if current_roles:
+        role_sets.add(frozenset(current_roles))
+    return role_sets
+
+
+def _write_atomic(path, content):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as tmp_file:
+            tmp_file.write(content)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def write_menu_tree(role_ids):
+    """
+    Compile the menu tree for a role set into a content-hashed JSON file.
+
+    Returns the manifest entry: the file path relative to STATIC_ROOT and the
+    ``role_set_version`` it was built from. Identical trees share a file.
+    """
+    # Read first: a change made while compiling leaves the entry stale
+    version = role_set_version(role_ids)
+    tree = build_menu_tree(get_menus_for_roles(role_ids))
+    content = json.dumps(tree, separators=(",", ":"), sort_keys=True).encode()
+    digest = hashlib.sha256(content).hexdigest()[:16]
+
+    relative_path = f"{settings.MENU_MANIFEST_DIR}/{digest}.json"
+    target = Path(settings.STATIC_ROOT) / relative_path
+    if not target.exists():
+        _write_atomic(target, content)
+    return {"path": relative_path, "version": version}
+
+
+def load_manifest():
+    """Return the current manifest, re-reading the file only when it changed."""
+    path = get_manifest_path()
+    try:
+        mtime = path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return {"role_sets": {}}
+
+    with _manifest_lock:
+        if _manifest_cache["mtime"] != mtime:
+            with open(path, "rb") as manifest_file:
+                _manifest_cache["data"] = json.load(manifest_file)
+            _manifest_cache["mtime"] = mtime
+        return _manifest_cache["data"]
+
+
+def save_manifest(role_sets):
+    content = json.dumps({"role_sets": role_sets}, indent=2, sort_keys=True).encode()
+    _write_atomic(get_manifest_path(), content)
+
+
+def remove_unreferenced_files(role_sets):
+    referenced = {Path(entry["path"]).name for entry in role_sets.values()}
+    manifest_dir = get_manifest_dir()
+    if not manifest_dir.exists():
+        return 0
+
+    removed = 0
+    for entry in manifest_dir.glob("*.json"):
+        if entry.name not in referenced:
+            entry.unlink(missing_ok=True)
+            removed += 1
+    return removed
+
+
+def build_manifest(prune=True):
+    """
+    Compile the menu tree of every assigned role set and rewrite the manifest.
+    Returns the compiled file of each role set key.
+    """
+    role_sets = {}
+    for role_ids in get_assigned_role_sets():
+        role_sets[role_set_key(role_ids)] = write_menu_tree(role_ids)
+
+    with _manifest_lock:
+        save_manifest(role_sets)
+    if prune:
+        remove_unreferenced_files(role_sets)
+
+    logger.info("Menu manifest rebuilt", extra={"role_sets": len(role_sets)})
+    return {key: entry["path"] for key, entry in role_sets.items()}
+
+
+def get_manifest_entry(role_ids):
+    """
+    Return ``(key, relative_path)`` for a role set, compiling it on demand
+    when the role combination is not in the manifest yet or its entry was
+    built from an older ``role_set_version``, e.g. by another host's rebuild.
+    """
+    key = role_set_key(role_ids)
+    entry = load_manifest()["role_sets"].get(key)
+    if (
+        entry
+        and entry["version"] == role_set_version(role_ids)
+        and (Path(settings.STATIC_ROOT) / entry["path"]).exists()
+    ):
+        return key, entry["path"]
+
+    entry = write_menu_tree(role_ids)
+    with _manifest_lock:
+        path = get_manifest_path()
+        role_sets = {}
+        if path.exists():
+            with open(path, "rb") as manifest_file:
+                role_sets = json.load(manifest_file)["role_sets"]
+        role_sets[key] = entry
+        save_manifest(role_sets)
+    return key, entry["path"]
+
+
+def get_manifest_url(relative_path):
+    return static(relative_path)
+
+
+def _run_rebuild():
+    global _rebuild_timer
+    with _rebuild_lock:
+        _rebuild_timer = None
+    try:
+        build_manifest()
+    except Exception as e:
+        logger.error("Menu manifest rebuild failed", extra={"error": str(e)})
+    finally:
+        # The timer thread owns its own connection, release it before exiting
+        connection.close()
+
+
+def _schedule_rebuild():
+    global _rebuild_timer
+    with _rebuild_lock:
+        if _rebuild_timer is not None:
+            _rebuild_timer.cancel()
+        _rebuild_timer = threading.Timer(
+            settings.MENU_MANIFEST_REBUILD_DELAY, _run_rebuild
+        )
+        _rebuild_timer.daemon = True
+        _rebuild_timer.start()
+
+
+def request_rebuild():
+    """
+    Schedule a manifest rebuild after the current transaction commits.
+
+    Bursts of RBAC changes (e.g. reordering menus) are debounced into a single
+    rebuild that runs in a background thread. Other processes and hosts do
+    not need it: ``get_manifest_entry`` recompiles entries whose
+    ``role_set_version`` no longer matches the database.
+    """
+    if not settings.MENU_MANIFEST_AUTO_REBUILD:
+        return
+    transaction.on_commit(_schedule_rebuild)
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.3 on 2026-10-19 15:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("menu", "0005_alter_sysmenu_options"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="sysmenu",
+            index=models.Index(
+                fields=["deleted_at", "order_num", "id"], name="sys_menu_del_order_idx"
+            ),
+        ),
+    ]
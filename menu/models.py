@@ -45,6 +45,13 @@ class SysMenu(models.Model):
     class Meta:
         db_table = "sys_menu"
         ordering = ["parent_id", "order_num"]
+        indexes = [
+            # Back the whitelisted MenuListView sort keys
+            models.Index(
+                fields=["deleted_at", "order_num", "id"],
+                name="sys_menu_del_order_idx",
+            ),
+        ]
 
 
 class SysRoleMenu(models.Model):
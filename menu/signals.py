@@ -0,0 +1,30 @@
+# menu/signals.py
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from role.models import SysRole, SysUserRole
+from .manifest import request_rebuild
+from .models import SysMenu, SysRoleMenu
+
+
+@receiver(post_save, sender=SysMenu)
+@receiver(post_delete, sender=SysMenu)
+@receiver(post_save, sender=SysRoleMenu)
+@receiver(post_delete, sender=SysRoleMenu)
+@receiver(post_save, sender=SysUserRole)
+@receiver(post_delete, sender=SysUserRole)
+def rebuild_menu_manifest(sender, **kwargs):
+    """Recompile the static menu manifest whenever menus or grants change."""
+    request_rebuild()
+
+
+@receiver(post_save, sender=SysRole)
+@receiver(post_delete, sender=SysRole)
+def rebuild_menu_manifest_for_role(sender, instance, created=False, **kwargs):
+    """
+    A new role grants no menus yet; saves may disable or soft delete one,
+    which withdraws its menus.
+    """
+    if not created:
+        request_rebuild()
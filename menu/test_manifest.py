@@ -0,0 +1,211 @@
+# test_manifest.py
+
+import json
+from datetime import timedelta
+from pathlib import Path
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from menu import manifest
+from menu.manifest import (
+    build_manifest,
+    get_manifest_entry,
+    load_manifest,
+    role_set_key,
+)
+from menu.models import SysMenu, SysRoleMenu
+from role.models import SysRole, SysUserRole
+
+User = get_user_model()
+
+
+@pytest.fixture
+def static_root(settings, tmp_path):
+    settings.STATIC_ROOT = tmp_path
+    settings.STATIC_URL = "/static/"
+    settings.MENU_MANIFEST_INDEX = tmp_path.parent / f"{tmp_path.name}-index.json"
+    settings.MENU_MANIFEST_AUTO_REBUILD = False
+    manifest._manifest_cache.update(mtime=None, data=None)
+    yield tmp_path
+    manifest._manifest_cache.update(mtime=None, data=None)
+
+
+@pytest.fixture
+def rbac():
+    editor = SysRole.objects.create(name="Editor", code="editor")
+    viewer = SysRole.objects.create(name="Viewer", code="viewer")
+    dashboard = SysMenu.objects.create(name="Dashboard", order_num=1)
+    users = SysMenu.objects.create(name="Users", order_num=2)
+    SysMenu.objects.create(name="Users list", parent_id=users.id, order_num=1)
+    for role in (editor, viewer):
+        SysRoleMenu.objects.create(role=role, menu=dashboard)
+    return editor, viewer, users
+
+
+def user_with_roles(username, *roles):
+    user = User.objects.create_user(
+        username=username, email=f"{username}@example.com", password="password"
+    )
+    for role in roles:
+        SysUserRole.objects.create(user=user, role=role)
+    return user
+
+
+def read_tree(static_root, relative_path):
+    return json.loads((Path(static_root) / relative_path).read_bytes())
+
+
+@pytest.mark.django_db
+class TestMenuManifest:
+    def test_role_set_key_ignores_order_and_duplicates(self):
+        assert role_set_key([3, 1, 2, 1]) == role_set_key((2, 3, 1)) == "1-2-3"
+        assert role_set_key([]) == "none"
+
+    def test_build_compiles_every_assigned_role_set(self, static_root, rbac):
+        editor, viewer, users = rbac
+        SysRoleMenu.objects.create(role=editor, menu=users)
+        user_with_roles("alice", editor)
+        user_with_roles("bob", editor, viewer)
+
+        role_sets = build_manifest()
+
+        assert set(role_sets) == {
+            role_set_key([editor.id]),
+            role_set_key([editor.id, viewer.id]),
+        }
+        tree = read_tree(static_root, role_sets[role_set_key([editor.id])])
+        assert [menu["name"] for menu in tree] == ["Dashboard", "Users"]
+        assert {
+            key: entry["path"] for key, entry in load_manifest()["role_sets"].items()
+        } == role_sets
+        assert not list(static_root.rglob("manifest*.json"))
+
+    def test_identical_trees_share_one_file(self, static_root, rbac):
+        editor, viewer, _ = rbac
+        user_with_roles("alice", editor)
+        user_with_roles("bob", viewer)
+
+        role_sets = build_manifest()
+
+        assert role_sets[role_set_key([editor.id])] == (
+            role_sets[role_set_key([viewer.id])]
+        )
+        assert len(list((static_root / "menus").glob("*.json"))) == 1
+
+    def test_files_no_longer_referenced_are_removed(self, static_root, rbac):
+        editor, _, users = rbac
+        user_with_roles("alice", editor)
+        old_path = build_manifest()[role_set_key([editor.id])]
+
+        SysRoleMenu.objects.create(role=editor, menu=users)
+        new_path = build_manifest()[role_set_key([editor.id])]
+
+        assert new_path != old_path
+        assert not (static_root / old_path).exists()
+        assert (static_root / new_path).exists()
+
+    def test_unknown_role_set_is_compiled_on_demand(self, static_root, rbac):
+        editor, viewer, _ = rbac
+        build_manifest()
+
+        key, relative_path = get_manifest_entry([viewer.id, editor.id])
+
+        assert key == role_set_key([editor.id, viewer.id])
+        assert [menu["name"] for menu in read_tree(static_root, relative_path)] == [
+            "Dashboard"
+        ]
+        assert load_manifest()["role_sets"][key]["path"] == relative_path
+
+    @pytest.mark.parametrize(
+        "change",
+        [
+            lambda role, menu: SysRoleMenu.objects.create(role=role, menu=menu),
+            lambda role, menu: SysRoleMenu.objects.filter(role=role).delete(),
+            lambda role, menu: SysMenu.objects.filter(name="Dashboard").update(
+                name="Home", update_time=timezone.now() + timedelta(seconds=1)
+            ),
+            lambda role, menu: role.soft_delete(),
+        ],
+        ids=["grant added", "grant removed", "menu renamed", "role deleted"],
+    )
+    def test_stale_entries_are_recompiled(self, static_root, rbac, change):
+        editor, _, users = rbac
+        user_with_roles("alice", editor)
+        # Built elsewhere, no rebuild reaches this process after the change
+        old_path = build_manifest()[role_set_key([editor.id])]
+
+        change(editor, users)
+        _, relative_path = get_manifest_entry([editor.id])
+
+        assert relative_path != old_path
+        assert get_manifest_entry([editor.id])[1] == relative_path
+
+    def test_current_entries_are_reused(self, static_root, rbac):
+        editor, _, _ = rbac
+        user_with_roles("alice", editor)
+        path = build_manifest()[role_set_key([editor.id])]
+        (static_root / path).write_text("[]")
+
+        assert get_manifest_entry([editor.id])[1] == path
+
+    def test_disabled_roles_grant_no_menus(self, static_root, rbac):
+        editor, _, _ = rbac
+        editor.soft_delete()
+
+        _, relative_path = get_manifest_entry([editor.id])
+
+        assert read_tree(static_root, relative_path) == []
+
+    @pytest.mark.parametrize(
+        "change",
+        [
+            lambda role, user: role.soft_delete(),
+            lambda role, user: SysUserRole.objects.create(user=user, role=role),
+            lambda role, user: SysUserRole.objects.filter(user=user).delete(),
+        ],
+        ids=["role soft delete", "role assigned", "role removed"],
+    )
+    def test_role_changes_request_a_rebuild(
+        self, settings, monkeypatch, django_capture_on_commit_callbacks, rbac, change
+    ):
+        editor, viewer, _ = rbac
+        user = user_with_roles("alice", viewer)
+        settings.MENU_MANIFEST_AUTO_REBUILD = True
+        scheduled = []
+        monkeypatch.setattr(
+            manifest, "_schedule_rebuild", lambda: scheduled.append(True)
+        )
+
+        with django_capture_on_commit_callbacks(execute=True):
+            change(editor, user)
+
+        assert scheduled
+
+
+@pytest.mark.django_db
+class TestUserMenuManifestView:
+    def test_returns_key_and_static_url(self, static_root, rbac):
+        editor, viewer, _ = rbac
+        client = APIClient()
+        client.force_authenticate(user=user_with_roles("alice", viewer, editor))
+
+        response = client.get(reverse("user-menus-manifest"))
+
+        assert response.status_code == 200
+        assert response.data["code"] == 200
+        data = response.data["data"]
+        assert data["key"] == role_set_key([editor.id, viewer.id])
+        assert data["url"].startswith("/static/menus/")
+        relative_path = data["url"][len("/static/") :]
+        assert [menu["name"] for menu in read_tree(static_root, relative_path)] == [
+            "Dashboard"
+        ]
+
+    def test_requires_authentication(self, static_root):
+        response = APIClient().get(reverse("user-menus-manifest"))
+
+        assert response.status_code == 401
@@ -5,6 +5,7 @@ from .views import (
     MenuCreateView,
     MenuReorderView,
     UserMenuView,
+    UserMenuManifestView,
 )
 
 urlpatterns = [
@@ -13,6 +14,11 @@ urlpatterns = [
     path("menus/create/", MenuCreateView.as_view(), name="menu-create"),
     path("menus/reorder/", MenuReorderView.as_view(), name="menu-reorder"),
     path("user-menus/", UserMenuView.as_view(), name="user-menus"),  # For current user
+    path(
+        "user-menus/manifest/",
+        UserMenuManifestView.as_view(),
+        name="user-menus-manifest",
+    ),  # Static manifest key for current user
     path(
         "users/<int:user_id>/menus/",
         UserMenuView.as_view(),
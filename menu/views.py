@@ -3,8 +3,15 @@ from rest_framework import status
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from core.ordering import OrderingMixin
 from user.authentication import CookieJWTAuthentication
 from user.views import CustomPageNumberPagination, User
+from .manifest import (
+    build_menu_tree,
+    get_manifest_entry,
+    get_manifest_url,
+    get_menus_for_roles,
+)
 from .models import SysMenu, SysRoleMenu
 from .serializers import MenuSerializer
 
@@ -19,10 +26,16 @@ class AdminRequiredMixin:
         return None
 
 
-class MenuListView(AdminRequiredMixin, APIView):
+class MenuListView(AdminRequiredMixin, OrderingMixin, APIView):
     permission_classes = [IsAuthenticated]
     authentication_classes = [CookieJWTAuthentication]
     pagination_class = CustomPageNumberPagination  # Add pagination class
+    # Public sort keys -> columns backed by the sys_menu composite index
+    ordering_fields = {
+        "order_num": ("order_num", "id"),
+        "id": ("id",),
+    }
+    default_ordering = "order_num"
 
     def get(self, request):
         admin_check = self.check_admin(request)
@@ -43,10 +56,8 @@ class MenuListView(AdminRequiredMixin, APIView):
                     | Q(remark__icontains=search)
                 )
 
-            # Apply ordering
-            ordering = request.query_params.get("ordering", "order_num")
-            if ordering:
-                queryset = queryset.order_by(ordering)
+            # Apply ordering, restricted to indexed sort keys
+            queryset = queryset.order_by(*self.get_ordering(request))
 
             # Build tree structure
             menu_tree = self.build_menu_tree(queryset)
@@ -253,17 +264,7 @@ class UserMenuView(APIView):
 
     def get_user_menus(self, user):
         role_ids = user.roles.values_list("id", flat=True)
-        menu_ids = (
-            SysRoleMenu.objects.filter(role_id__in=role_ids)
-            .values_list("menu_id", flat=True)
-            .distinct()
-        )
-
-        menus = SysMenu.objects.filter(
-            id__in=menu_ids, status=1, deleted_at__isnull=True
-        ).order_by("order_num")
-
-        return self.build_menu_tree(menus)
+        return build_menu_tree(get_menus_for_roles(role_ids))
 
     def get(self, request, *args, **kwargs):
         try:
@@ -284,17 +285,26 @@ class UserMenuView(APIView):
         except Exception as e:
             return Response({"code": 500, "message": str(e)}, status=500)
 
-    def build_menu_tree(self, menus):
-        menu_dict = {}
-        for menu in menus:
-            menu_dict[menu.id] = MenuSerializer(menu).data
-            menu_dict[menu.id]["children"] = []
 
-        tree = []
-        for menu in menus:
-            if menu.parent_id and menu.parent_id in menu_dict:
-                menu_dict[menu.parent_id]["children"].append(menu_dict[menu.id])
-            else:
-                tree.append(menu_dict[menu.id])
+class UserMenuManifestView(APIView):
+    """
+    Return the manifest key and static URL of the precompiled menu tree for the
+    current user's role set, so the tree itself is served by the web server.
+    """
+
+    permission_classes = [IsAuthenticated]
+    authentication_classes = [CookieJWTAuthentication]
 
-        return tree
+    def get(self, request):
+        try:
+            role_ids = request.user.roles.values_list("id", flat=True)
+            key, relative_path = get_manifest_entry(role_ids)
+            return Response(
+                {
+                    "code": 200,
+                    "message": "User menu manifest retrieved successfully",
+                    "data": {"key": key, "url": get_manifest_url(relative_path)},
+                }
+            )
+        except Exception as e:
+            return Response({"code": 500, "message": str(e)}, status=500)
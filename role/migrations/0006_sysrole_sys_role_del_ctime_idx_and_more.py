@@ -0,0 +1,27 @@
+# Generated by Django 5.1.3 on 2026-10-19 15:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("role", "0005_alter_sysrole_code_alter_sysrole_name_and_more"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="sysrole",
+            index=models.Index(
+                fields=["deleted_at", "create_time", "id"],
+                name="sys_role_del_ctime_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="sysrole",
+            index=models.Index(
+                fields=["deleted_at", "update_time", "id"],
+                name="sys_role_del_utime_idx",
+            ),
+        ),
+    ]
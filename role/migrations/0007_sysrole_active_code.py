@@ -0,0 +1,32 @@
+# Generated by Django 5.1.3 on 2026-10-19 15:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("role", "0006_sysrole_sys_role_del_ctime_idx_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="sysrole",
+            name="active_code",
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=models.Case(
+                    models.When(deleted_at__isnull=True, then=models.F("code")),
+                    default=None,
+                ),
+                output_field=models.CharField(max_length=100, null=True),
+                verbose_name="Active Role Code",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="sysrole",
+            constraint=models.UniqueConstraint(
+                fields=("active_code",), name="sys_role_active_code_uniq"
+            ),
+        ),
+    ]
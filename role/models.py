@@ -29,9 +29,37 @@ class SysRole(models.Model):
     remark = models.CharField(
         max_length=500, null=True, blank=True, verbose_name="Comment"
     )
+    # ``code`` while the role is not soft deleted, NULL afterwards. MySQL has
+    # no partial indexes, a unique index on this column enforces one active
+    # role per code and serves code lookups.
+    active_code = models.GeneratedField(
+        expression=models.Case(
+            models.When(deleted_at__isnull=True, then=models.F("code")),
+            default=None,
+        ),
+        output_field=models.CharField(max_length=100, null=True),
+        db_persist=True,
+        verbose_name="Active Role Code",
+    )
 
     class Meta:
         db_table = "sys_role"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["active_code"], name="sys_role_active_code_uniq"
+            ),
+        ]
+        indexes = [
+            # Back the whitelisted RoleListView sort keys
+            models.Index(
+                fields=["deleted_at", "create_time", "id"],
+                name="sys_role_del_ctime_idx",
+            ),
+            models.Index(
+                fields=["deleted_at", "update_time", "id"],
+                name="sys_role_del_utime_idx",
+            ),
+        ]
 
     def soft_delete(self):
         self.deleted_at = timezone.now()
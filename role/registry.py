@@ -0,0 +1,99 @@
+# role/registry.py
+
+import threading
+import time
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+
+from .models import SysRole
+
+ADMIN_ROLE_CODE = "admin"
+COMMON_ROLE_CODE = "common"
+SYSTEM_ROLE_CODES = (ADMIN_ROLE_CODE, COMMON_ROLE_CODE)
+
+
+class SystemRoleRegistry:
+    """
+    In-process cache of the system roles, keyed by code.
+
+    Holds ``admin``, ``common`` and every active ``is_system`` role. It is
+    loaded on first use (apps must not query the database while starting)
+    and dropped after any committed ``SysRole`` change in this process. The
+    ``ROLE_REGISTRY_TTL`` expiry bounds how long other processes may serve
+    a stale entry.
+
+    Cached instances are shared between threads and must be treated as
+    read-only.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._roles = None
+        self._loaded_at = 0.0
+
+    def _get_roles(self):
+        roles, loaded_at = self._roles, self._loaded_at
+        ttl = getattr(settings, "ROLE_REGISTRY_TTL", 300)
+        if roles is not None and time.monotonic() - loaded_at < ttl:
+            return roles
+        with self._lock:
+            if self._roles is roles:
+                self._roles = self.load()
+                self._loaded_at = time.monotonic()
+            return self._roles
+
+    @staticmethod
+    def load():
+        return {
+            role.code: role
+            for role in SysRole.objects.filter(
+                Q(code__in=SYSTEM_ROLE_CODES) | Q(is_system=True),
+                deleted_at__isnull=True,
+            )
+        }
+
+    def invalidate(self):
+        with self._lock:
+            self._roles = None
+
+    def get(self, code):
+        """
+        Return the active role with ``code``, raising ``SysRole.DoesNotExist``
+        like ``SysRole.objects.get()``. Codes outside the registry are looked
+        up in the database.
+        """
+        role = self._get_roles().get(code)
+        if role is not None:
+            return role
+        if code in SYSTEM_ROLE_CODES:
+            raise SysRole.DoesNotExist(f"System role '{code}' does not exist")
+        return SysRole.objects.get(active_code=code)
+
+    def get_id(self, code):
+        """The id of the active role with ``code``, or ``None``."""
+        try:
+            return self.get(code).id
+        except SysRole.DoesNotExist:
+            return None
+
+    @property
+    def admin(self):
+        return self.get(ADMIN_ROLE_CODE)
+
+    @property
+    def common(self):
+        return self.get(COMMON_ROLE_CODE)
+
+
+role_registry = SystemRoleRegistry()
+
+
+def invalidate_role_registry():
+    """
+    Drop the cache now and again once the current transaction commits, so a
+    reload in between cannot keep uncommitted state.
+    """
+    role_registry.invalidate()
+    transaction.on_commit(role_registry.invalidate)
@@ -1,10 +1,12 @@
 from rest_framework import serializers
+
+from core.serializers import SparseFieldsMixin
 from .models import SysRole
 
 RESERVED_ROLE_CODE = ["admin", "common"]  # Only admin and common is reserved
 
 
-class SysRoleSerializer(serializers.ModelSerializer):
+class SysRoleSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     is_active = serializers.BooleanField(read_only=True)
 
     class Meta:
@@ -25,6 +27,8 @@ class SysRoleSerializer(serializers.ModelSerializer):
             "remark": {"required": False, "allow_null": True}  # Make remark optional
         }
 
+    field_sources = {"is_active": ["status", "deleted_at"]}
+
     def validate_code(self, value):
         """
         Validate that the role code is unique and not one of the reserved code
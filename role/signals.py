@@ -0,0 +1,14 @@
+# role/signals.py
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import SysRole
+from .registry import invalidate_role_registry
+
+
+@receiver(post_save, sender=SysRole)
+@receiver(post_delete, sender=SysRole)
+def refresh_role_registry(sender, **kwargs):
+    """Reload the system role registry after role changes."""
+    invalidate_role_registry()
@@ -0,0 +1,48 @@
+# test_registry.py
+
+import pytest
+from django.db import IntegrityError, connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from role.models import SysRole
+from role.registry import role_registry
+
+
+@pytest.fixture
+def cached_registry(settings):
+    settings.ROLE_REGISTRY_TTL = 300
+    role_registry.invalidate()
+    yield role_registry
+    role_registry.invalidate()
+
+
+@pytest.mark.django_db
+class TestSystemRoleRegistry:
+    def test_lookups_are_cached(self, cached_registry):
+        common = SysRole.objects.create(name="Common Role", code="common")
+        SysRole.objects.create(name="Auditor", code="auditor", is_system=True)
+
+        assert cached_registry.common.id == common.id
+        with CaptureQueriesContext(connection) as queries:
+            assert cached_registry.get("common").id == common.id
+            assert cached_registry.get("auditor").code == "auditor"
+            assert cached_registry.get_id("admin") is None
+        assert len(queries) == 0
+
+    def test_role_changes_refresh_the_registry(self, cached_registry):
+        common = SysRole.objects.create(name="Common Role", code="common")
+        assert cached_registry.common.id == common.id
+
+        common.soft_delete()
+        with pytest.raises(SysRole.DoesNotExist):
+            cached_registry.get("common")
+
+        replacement = SysRole.objects.create(name="Common Role", code="common")
+        assert cached_registry.common.id == replacement.id
+
+    def test_active_codes_are_unique(self):
+        SysRole.objects.create(name="Editor", code="editor").soft_delete()
+        SysRole.objects.create(name="Editor", code="editor")
+
+        with pytest.raises(IntegrityError), transaction.atomic():
+            SysRole.objects.create(name="Editor 2", code="editor")
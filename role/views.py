@@ -1,9 +1,15 @@
+from django.db import transaction
 from django.db.models import Q
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
+from rest_framework.exceptions import NotFound
 
+from core.audit.capture import capture_bulk_create
+from core.ordering import OrderingMixin
+from core.pagination import KeysetPagination
+from menu.manifest import request_rebuild
 from menu.models import SysMenu, SysRoleMenu
 from user.views import CustomPageNumberPagination
 from .models import SysRole, SysUserRole
@@ -23,10 +29,17 @@ class AdminRequiredMixin:
         return None
 
 
-class RoleListView(AdminRequiredMixin, APIView):
+class RoleListView(AdminRequiredMixin, OrderingMixin, APIView):
     permission_classes = [IsAuthenticated]
     authentication_classes = [CookieJWTAuthentication]
     pagination_class = CustomPageNumberPagination
+    # Public sort keys -> columns backed by the sys_role composite indexes
+    ordering_fields = {
+        "create_time": ("create_time", "id"),
+        "update_time": ("update_time", "id"),
+        "id": ("id",),
+    }
+    default_ordering = "-create_time"
 
     def get(self, request):
         # Check admin permission
@@ -49,28 +62,49 @@ class RoleListView(AdminRequiredMixin, APIView):
                     | Q(remark__icontains=search_query)
                 )
 
-            # Apply ordering
-            ordering = request.query_params.get("ordering", "-create_time")
-            if ordering:
-                queryset = queryset.order_by(ordering)
+            # Apply ordering, restricted to indexed sort keys
+            queryset = queryset.order_by(*self.get_ordering(request))
+
+            # Sparse fieldsets: ?fields= / ?exclude=
+            fields = SysRoleSerializer.get_field_selection(request)
+            queryset = SysRoleSerializer.sparse_queryset(queryset, request)
+
+            # Cursor mode: keyset pagination, no OFFSET and optional totals
+            if KeysetPagination.is_requested(request):
+                paginator = KeysetPagination()
+                roles = paginator.paginate_queryset(queryset, request)
+                serializer = SysRoleSerializer(roles, many=True, fields=fields)
+                return Response(
+                    {
+                        "code": 200,
+                        "message": "Roles retrieved successfully",
+                        "data": serializer.data,
+                        **paginator.get_paginated_data(),
+                    }
+                )
 
             # Apply pagination
             paginator = self.pagination_class()
             paginated_users = paginator.paginate_queryset(queryset, request)
 
-            serializer = SysRoleSerializer(queryset, many=True)
+            serializer = SysRoleSerializer(queryset, many=True, fields=fields)
             return Response(
                 {
                     "code": 200,
                     "message": "Roles retrieved successfully",
                     "data": serializer.data,
-                    "count": queryset.count(),
+                    "count": paginator.page.paginator.count,
                     "page": int(request.query_params.get("page", 1)),
                     "pageSize": int(
                         request.query_params.get("pageSize", paginator.page_size)
                     ),
                 }
             )
+        except NotFound as e:
+            return Response(
+                {"code": 404, "message": str(e.detail)},
+                status=status.HTTP_404_NOT_FOUND,
+            )
         except Exception as e:
             return Response(
                 {"code": 500, "message": str(e)},
@@ -268,11 +302,16 @@ class RoleMenuView(AdminRequiredMixin, APIView):
             )
 
         menu_ids = request.data.get("menu_ids", [])
-        # Clear existing and create new
-        SysRoleMenu.objects.filter(role=role).delete()
-        SysRoleMenu.objects.bulk_create(
-            [SysRoleMenu(role=role, menu_id=menu_id) for menu_id in menu_ids]
-        )
+        # Clear existing and create new, audited as one transaction
+        with transaction.atomic():
+            SysRoleMenu.objects.filter(role=role).delete()
+            links = SysRoleMenu.objects.bulk_create(
+                [SysRoleMenu(role=role, menu_id=menu_id) for menu_id in menu_ids]
+            )
+            # bulk_create does not send signals, audit the links and refresh
+            # the static menu manifest here
+            capture_bulk_create(links)
+        request_rebuild()
 
         return Response({"code": 200, "message": "Menu items updated successfully"})
 
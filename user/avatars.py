@@ -0,0 +1,349 @@
+# user/avatars.py
+
+import hashlib
+import io
+import os
+import re
+import shutil
+import threading
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, connections, transaction
+from django.db.models import Case, F, When
+from django.utils import timezone
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from core.audit.capture import capture_update
+from core.logging.utils import get_logger
+from .models import AvatarBlob
+
+logger = get_logger(__name__)
+User = get_user_model()
+
+AVATAR_DIR = "avatars"
+# Output format -> (Pillow format, file extension, save options)
+AVATAR_FORMATS = {
+    "webp": ("WEBP", "webp", {"quality": 80, "method": 4}),
+    "jpeg": ("JPEG", "jpg", {"quality": 85, "optimize": True, "progressive": True}),
+}
+DEFAULT_AVATAR_FORMAT = "webp"
+# Processed avatars are stored as ``<dir>/<size>.<ext>``
+VARIANT_NAME_PATTERN = re.compile(r"^(?P<base>.+)/(?P<size>\d+)\.(?:webp|jpg)$")
+# Content-addressed avatars live in ``avatars/<aa>/<sha256>/``
+BLOB_PATTERN = re.compile(
+    r"/avatars/(?P<shard>[0-9a-f]{2})/(?P<digest>[0-9a-f]{64})/\d+\.(?:webp|jpg)$"
+)
+
+
+class AvatarProcessingError(Exception):
+    """The uploaded file is not an image we can process."""
+
+
+def get_avatar_sizes():
+    return sorted(getattr(settings, "AVATAR_SIZES", (48, 128, 256)))
+
+
+def inspect_image(data):
+    """
+    Cheap pre-flight check run in the request: parses the image header only
+    and rejects unreadable files and decompression bombs before any pixels
+    are decoded.
+    """
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            width, height = image.size
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError):
+        raise AvatarProcessingError("File is not a valid image")
+    if width * height > getattr(settings, "AVATAR_MAX_PIXELS", 40_000_000):
+        raise AvatarProcessingError("Image dimensions are too large")
+
+
+def render_variants(data):
+    """
+    Decode ``data`` once and encode every configured size and format.
+
+    The image is rotated according to its EXIF orientation, cropped to a
+    centred square and re-encoded without EXIF/XMP/ICC metadata. Returns
+    ``{(size, format): bytes}``.
+    """
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            image.seek(0)  # First frame of animated GIFs
+            image = ImageOps.exif_transpose(image)
+            has_alpha = image.mode in ("RGBA", "LA") or "transparency" in image.info
+            image = image.convert("RGBA" if has_alpha else "RGB")
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError) as e:
+        raise AvatarProcessingError(f"Cannot decode image: {e}")
+
+    variants = {}
+    for size in sorted(get_avatar_sizes(), reverse=True):
+        # Downscale from the previous (larger) variant, never upscale
+        target = min(size, image.width, image.height)
+        image = ImageOps.fit(image, (target, target), Image.LANCZOS)
+        for fmt, (pil_format, _, options) in AVATAR_FORMATS.items():
+            frame = image
+            if has_alpha and pil_format == "JPEG":
+                frame = Image.new("RGB", image.size, (255, 255, 255))
+                frame.paste(image, mask=image.getchannel("A"))
+            buffer = io.BytesIO()
+            frame.save(buffer, pil_format, **options)
+            variants[(size, fmt)] = buffer.getvalue()
+    return variants
+
+
+def variant_name(size, fmt):
+    return f"{size}.{AVATAR_FORMATS[fmt][1]}"
+
+
+def content_digest(variants):
+    """SHA-256 over all rendered variants, the identity of a stored avatar."""
+    digest = hashlib.sha256()
+    for (size, fmt), content in sorted(variants.items()):
+        digest.update(f"{variant_name(size, fmt)}:{len(content)}:".encode())
+        digest.update(content)
+    return digest.hexdigest()
+
+
+def blob_directory(digest):
+    return f"{AVATAR_DIR}/{digest[:2]}/{digest}"
+
+
+def blob_digest(avatar):
+    """Content hash of a content-addressed avatar URL, else ``None``."""
+    match = BLOB_PATTERN.search(avatar or "")
+    return match["digest"] if match else None
+
+
+def write_variants(directory, variants):
+    """
+    Write variants into ``MEDIA_ROOT/<directory>``, each file atomically.
+    Files that already exist are left alone, the content is the same.
+    """
+    root = os.path.join(settings.MEDIA_ROOT, directory)
+    os.makedirs(root, exist_ok=True)
+    for (size, fmt), content in variants.items():
+        path = os.path.join(root, variant_name(size, fmt))
+        if os.path.exists(path):
+            continue
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+
+
+def media_url(relative_path):
+    return f"{settings.MEDIA_URL.rstrip('/')}/{relative_path}"
+
+
+def avatar_variant_url(avatar, size=None, fmt=DEFAULT_AVATAR_FORMAT):
+    """
+    URL of the smallest stored variant at least ``size`` pixels wide (the
+    largest one when ``size`` is omitted or bigger than all variants).
+    Avatars uploaded before processing existed are returned unchanged.
+    """
+    match = VARIANT_NAME_PATTERN.match(avatar or "")
+    if not match:
+        return avatar
+    sizes = get_avatar_sizes()
+    chosen = next((s for s in sizes if size and s >= size), sizes[-1])
+    return f"{match['base']}/{variant_name(chosen, fmt)}"
+
+
+def process_avatar(user_id, data):
+    """
+    Render, store and assign a new avatar. Returns the stored avatar URL
+    (the largest WebP variant; other variants sit next to it).
+
+    Variants are stored once per content hash, so the URL never changes
+    meaning and identical uploads share files. The previous avatar is only
+    dereferenced here; ``gc_avatars`` deletes blobs nobody references.
+    """
+    variants = render_variants(data)
+    digest = content_digest(variants)
+    directory = blob_directory(digest)
+    write_variants(directory, variants)
+    avatar = media_url(f"{directory}/{variant_name(get_avatar_sizes()[-1], 'webp')}")
+
+    with transaction.atomic():
+        previous = (
+            User.objects.select_for_update()
+            .filter(pk=user_id)
+            .values_list("avatar", flat=True)
+            .first()
+        )
+        if previous != avatar:
+            acquire_blob(digest, sum(map(len, variants.values())))
+            changes = {"avatar": avatar, "update_time": timezone.now()}
+            User.objects.filter(pk=user_id).update(**changes)
+            capture_update(User, {user_id: {"avatar": previous}}, changes)
+            release_blob(blob_digest(previous))
+
+    # The collector may have removed the files of a blob that was
+    # unreferenced until this upload claimed it again
+    write_variants(directory, variants)
+
+    logger.info(
+        "Avatar processed",
+        extra={"user_id": user_id, "digest": digest},
+    )
+    return avatar
+
+
+def acquire_blob(digest, size):
+    """Add a reference to the blob ``digest``, creating its row if needed."""
+    updated = AvatarBlob.objects.filter(digest=digest).update(
+        ref_count=F("ref_count") + 1, unreferenced_at=None
+    )
+    if updated:
+        return
+    try:
+        with transaction.atomic():
+            AvatarBlob.objects.create(digest=digest, ref_count=1, size=size)
+    except IntegrityError:
+        # Created concurrently by an identical upload
+        AvatarBlob.objects.filter(digest=digest).update(
+            ref_count=F("ref_count") + 1, unreferenced_at=None
+        )
+
+
+def release_blob(digest):
+    """Drop a reference, stamping the time the blob became unreferenced."""
+    if not digest:
+        return
+    AvatarBlob.objects.filter(digest=digest).update(
+        ref_count=F("ref_count") - 1,
+        unreferenced_at=Case(
+            When(ref_count__lte=1, then=timezone.now()),
+            default=F("unreferenced_at"),
+        ),
+    )
+
+
+def collect_unreferenced_blobs(cutoff, batch_size=500, dry_run=False):
+    """
+    Delete blobs unreferenced since before ``cutoff``, files first. Rows
+    are locked while their files go, so a concurrent upload of the same
+    image waits and then recreates both. Returns the number removed.
+    """
+    removed = 0
+    last_pk = 0
+    while True:
+        with transaction.atomic():
+            blobs = list(
+                AvatarBlob.objects.select_for_update()
+                .filter(pk__gt=last_pk, ref_count__lte=0, unreferenced_at__lt=cutoff)
+                .order_by("pk")[:batch_size]
+            )
+            if not blobs:
+                return removed
+            last_pk = blobs[-1].pk
+            if dry_run:
+                removed += len(blobs)
+                continue
+            for blob in blobs:
+                shutil.rmtree(
+                    os.path.join(settings.MEDIA_ROOT, blob_directory(blob.digest)),
+                    ignore_errors=True,
+                )
+            AvatarBlob.objects.filter(pk__in=[blob.pk for blob in blobs]).delete()
+            removed += len(blobs)
+
+
+def sweep_orphaned_files(cutoff, dry_run=False):
+    """
+    Delete files under ``MEDIA_ROOT/avatars`` that nothing points at and
+    that were last modified before ``cutoff``: blob directories without a
+    row (a failed upload) and avatars stored before content addressing
+    that no user references anymore. Returns the deleted paths.
+    """
+    root = os.path.join(settings.MEDIA_ROOT, AVATAR_DIR)
+    if not os.path.isdir(root):
+        return []
+
+    prefix = media_url(f"{AVATAR_DIR}/")
+    referenced = set()
+    for avatar in (
+        User.objects.filter(avatar__startswith=prefix)
+        .values_list("avatar", flat=True)
+        .iterator()
+    ):
+        referenced.add(avatar[len(prefix) :].split("/", 1)[0])
+
+    cutoff_ts = cutoff.timestamp()
+    removed = []
+    for entry in os.scandir(root):
+        if re.fullmatch(r"[0-9a-f]{2}", entry.name) and entry.is_dir():
+            names = [
+                blob.name
+                for blob in os.scandir(entry.path)
+                if blob.is_dir() and blob.stat().st_mtime < cutoff_ts
+            ]
+            known = set(
+                AvatarBlob.objects.filter(digest__in=names).values_list(
+                    "digest", flat=True
+                )
+            )
+            orphans = [
+                os.path.join(entry.path, name) for name in names if name not in known
+            ]
+        elif entry.name not in referenced and entry.stat().st_mtime < cutoff_ts:
+            orphans = [entry.path]
+        else:
+            orphans = []
+
+        for path in orphans:
+            if not dry_run:
+                if os.path.isdir(path):
+                    shutil.rmtree(path, ignore_errors=True)
+                else:
+                    os.remove(path)
+            removed.append(path)
+    return removed
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, "AVATAR_PROCESSING_WORKERS", 2),
+                thread_name_prefix="avatar",
+            )
+        return _executor
+
+
+def _process_in_background(user_id, data):
+    try:
+        return process_avatar(user_id, data)
+    except Exception as e:
+        logger.error(
+            "Avatar processing failed", extra={"user_id": user_id, "error": str(e)}
+        )
+        raise
+    finally:
+        # Pool threads keep their own connections, do not leak them
+        connections.close_all()
+
+
+def submit_avatar(user_id, data):
+    """
+    Process an upload on the avatar worker pool and return a ``Future`` of
+    the new avatar URL. With ``AVATAR_PROCESS_ASYNC = False`` the work runs
+    inline and the returned future is already resolved.
+    """
+    if getattr(settings, "AVATAR_PROCESS_ASYNC", True):
+        return get_executor().submit(_process_in_background, user_id, data)
+
+    future = Future()
+    try:
+        future.set_result(process_avatar(user_id, data))
+    except Exception as e:
+        future.set_exception(e)
+    return future
@@ -0,0 +1,161 @@
+# user/bulk_actions.py
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
+
+from core.audit.capture import capture_bulk_create, capture_update
+from core.logging.utils import get_logger
+from role.models import SysUserRole
+from role.registry import ADMIN_ROLE_CODE, COMMON_ROLE_CODE, role_registry
+
+logger = get_logger(__name__)
+User = get_user_model()
+
+BULK_ACTIONS = ("activate", "deactivate", "delete", "restore")
+
+
+class BulkUserAction:
+    """
+    Apply a status change, soft delete or restore to many users at once.
+
+    The candidates and their role links are locked with ``SELECT ... FOR
+    UPDATE``, so neither their state nor their admin role can change until
+    the commit. The eligible ids are picked from the locked rows and changed
+    by a single ``UPDATE ... WHERE id IN (...)``. Everything runs in one
+    transaction and yields a result per id.
+    """
+
+    def __init__(self, action, acting_user=None):
+        if action not in BULK_ACTIONS:
+            raise ValueError(f"Unsupported action: {action}")
+        self.action = action
+        self.acting_user = acting_user
+
+    def is_eligible(self, row):
+        """Whether the action would change a locked candidate ``row``."""
+        if row["is_admin"]:
+            return False
+        if self.action == "activate":
+            return row["deleted_at"] is None and row["status"] != 1
+        if self.action == "deactivate":
+            return row["deleted_at"] is None and row["status"] != 0
+        if self.action == "delete":
+            return row["deleted_at"] is None
+        return row["deleted_at"] is not None
+
+    def changes(self, now):
+        if self.action == "activate":
+            return {"status": 1, "update_time": now}
+        if self.action == "deactivate":
+            return {"status": 0, "update_time": now}
+        if self.action == "delete":
+            return {"deleted_at": now, "status": 0, "update_time": now}
+        return {"deleted_at": None, "status": 1, "update_time": now}
+
+    def run(self, queryset, requested_ids=None):
+        """
+        Apply the action to ``queryset`` and return ``(updated, results)``.
+
+        ``requested_ids`` lists ids the caller asked for explicitly, so that
+        missing ones can be reported as ``not_found``.
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            candidates = list(
+                queryset.order_by("pk")
+                .select_for_update()
+                .values("id", "status", "deleted_at")
+            )
+            candidate_ids = [row["id"] for row in candidates]
+
+            # Locking the links also blocks new grants to these users
+            admin_ids = set()
+            if candidate_ids:
+                admin_role_id = role_registry.get_id(ADMIN_ROLE_CODE)
+                for user_id, role_id in (
+                    SysUserRole.objects.filter(user_id__in=candidate_ids)
+                    .order_by("pk")
+                    .select_for_update()
+                    .values_list("user_id", "role_id")
+                ):
+                    if role_id == admin_role_id:
+                        admin_ids.add(user_id)
+            for row in candidates:
+                row["is_admin"] = row["id"] in admin_ids
+
+            eligible = [row for row in candidates if self.is_eligible(row)]
+            updated_ids = {row["id"] for row in eligible}
+            if updated_ids:
+                User.objects.filter(pk__in=updated_ids).update(**self.changes(now))
+                # QuerySet.update() sends no signals
+                capture_update(
+                    User,
+                    {
+                        row["id"]: {
+                            "status": row["status"],
+                            "deleted_at": row["deleted_at"],
+                        }
+                        for row in eligible
+                    },
+                    self.changes(now),
+                )
+                self.after_update(updated_ids)
+
+        results = []
+        for row in candidates:
+            results.append(self.result_for(row, row["id"] in updated_ids))
+        if requested_ids is not None:
+            found = set(candidate_ids)
+            results.extend(
+                {"id": user_id, "result": "not_found", "message": "User not found"}
+                for user_id in requested_ids
+                if user_id not in found
+            )
+
+        logger.info(
+            "Bulk user action applied",
+            extra={
+                "action": self.action,
+                "user_id": getattr(self.acting_user, "id", None),
+                "updated_count": len(updated_ids),
+                "candidate_count": len(candidates),
+            },
+        )
+        return len(updated_ids), results
+
+    def after_update(self, user_ids):
+        if self.action == "delete":
+            # Same as the single-user delete, role links go with the user
+            SysUserRole.objects.filter(user_id__in=user_ids).delete()
+        elif self.action == "restore":
+            # Restored users come back with the default role
+            common_role_id = role_registry.get_id(COMMON_ROLE_CODE)
+            if common_role_id:
+                with_roles = set(
+                    SysUserRole.objects.filter(user_id__in=user_ids).values_list(
+                        "user_id", flat=True
+                    )
+                )
+                links = SysUserRole.objects.bulk_create(
+                    SysUserRole(user_id=user_id, role_id=common_role_id)
+                    for user_id in sorted(user_ids - with_roles)
+                )
+                capture_bulk_create(links)
+
+    def result_for(self, row, updated):
+        if updated:
+            return {"id": row["id"], "result": "updated"}
+        if row["is_admin"]:
+            return {
+                "id": row["id"],
+                "result": "protected",
+                "message": "Cannot modify user with admin role",
+            }
+        if self.action == "restore":
+            message = "User is not deleted"
+        elif row["deleted_at"] is not None:
+            message = "User is deleted"
+        else:
+            message = "No change needed"
+        return {"id": row["id"], "result": "skipped", "message": message}
@@ -0,0 +1,305 @@
+# user/bulk_import.py
+
+import csv
+import json
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import identify_hasher, make_password
+from django.contrib.auth.password_validation import validate_password
+from django.contrib.auth.validators import UnicodeUsernameValidator
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from core.audit.capture import capture_bulk_create
+from core.logging.utils import get_logger
+from role.models import SysUserRole
+from role.registry import role_registry
+from . import hashing
+from .search import user_search_index
+
+logger = get_logger(__name__)
+User = get_user_model()
+
+IMPORT_FORMATS = ("csv", "jsonl")
+MAX_REPORTED_ERRORS = 1000
+
+_shared_pool = None
+_shared_pool_lock = threading.Lock()
+
+
+def create_hashing_pool(workers):
+    # spawn: forked children would share the parent's DB sockets
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=hashing.init_worker,
+    )
+
+
+def shared_hashing_pool(workers):
+    """
+    Hashing pool kept for the life of the process and reused by every web
+    import, so a request does not spawn interpreters. ``None`` for 0 workers.
+    """
+    global _shared_pool
+    if workers <= 0:
+        return None
+    with _shared_pool_lock:
+        # A worker that died breaks the pool for good, start a new one
+        if _shared_pool is None or _shared_pool._broken:
+            _shared_pool = create_hashing_pool(workers)
+        return _shared_pool
+
+
+def detect_format(filename, default="csv"):
+    extension = os.path.splitext(filename or "")[1].lower().lstrip(".")
+    if extension in ("jsonl", "ndjson"):
+        return "jsonl"
+    if extension == "csv":
+        return "csv"
+    return default
+
+
+def iter_records(stream, fmt):
+    """
+    Yield ``(line_number, record)`` from a text stream without loading it.
+
+    ``record`` is ``None`` for lines that cannot be parsed.
+    """
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for record in reader:
+            yield reader.line_num, record
+    elif fmt == "jsonl":
+        for line_number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                record = None
+            yield line_number, record if isinstance(record, dict) else None
+    else:
+        raise ValueError(f"Unsupported import format: {fmt}")
+
+
+class UserImporter:
+    """
+    Import users in chunks with a constant number of queries per chunk.
+
+    Per chunk: rows are validated, uniqueness is pre-checked with a single
+    ``IN`` query, passwords are hashed in a process pool, and users plus
+    their default role links are inserted with ``bulk_create`` inside one
+    transaction. Rows may carry an already hashed ``password_hash`` instead
+    of ``password``, which skips hashing. ``executor`` is a hashing pool owned
+    by the caller; without one a pool of ``workers`` lives for the run.
+    """
+
+    username_validator = UnicodeUsernameValidator()
+
+    def __init__(
+        self, chunk_size=1000, workers=None, role_code="common", executor=None
+    ):
+        self.chunk_size = chunk_size
+        self.workers = os.cpu_count() if workers is None else workers
+        self.role_code = role_code
+        self.executor = executor
+        self.report = {"total": 0, "created": 0, "failed": 0, "errors": []}
+        self._seen_usernames = set()
+        self._seen_emails = set()
+
+    def run(self, records, progress=None):
+        role = role_registry.get(self.role_code)
+        executor = owned = None
+        if self.executor is not None:
+            executor = self.executor
+        elif self.workers > 0:
+            executor = owned = create_hashing_pool(self.workers)
+        try:
+            records = iter(records)
+            while chunk := list(islice(records, self.chunk_size)):
+                self.import_chunk(chunk, role, executor)
+                if progress:
+                    progress(self.report)
+        finally:
+            if owned:
+                owned.shutdown()
+
+        logger.info(
+            "User import finished",
+            extra={
+                "total": self.report["total"],
+                "created_count": self.report["created"],
+                "failed_count": self.report["failed"],
+            },
+        )
+        return self.report
+
+    def import_chunk(self, chunk, role, executor=None):
+        self.report["total"] += len(chunk)
+        rows = []
+        for line_number, record in chunk:
+            try:
+                rows.append((line_number, self.clean(record)))
+            except ValidationError as e:
+                self.add_error(line_number, record, " ".join(e.messages))
+
+        rows = self.exclude_existing(rows)
+        if not rows:
+            return
+
+        plain = [
+            (i, row["password"])
+            for i, (_, row) in enumerate(rows)
+            if not row["password_hash"]
+        ]
+        if plain:
+            passwords = [password for _, password in plain]
+            if executor:
+                hashes = executor.map(
+                    hashing.hash_password,
+                    passwords,
+                    chunksize=max(1, len(plain) // (self.workers * 4)),
+                )
+            else:
+                hashes = map(make_password, passwords)
+            for (i, _), password_hash in zip(plain, hashes):
+                rows[i][1]["password_hash"] = password_hash
+
+        now = timezone.now()
+        try:
+            self.insert([row for _, row in rows], role, now)
+        except IntegrityError as e:
+            # A concurrent insert took a username or email, find out which
+            logger.warning("User import chunk conflicted", extra={"error": str(e)})
+            for line_number, row in rows:
+                try:
+                    self.insert([row], role, now)
+                except IntegrityError as e:
+                    self.add_error(line_number, row, f"Insert failed: {e}")
+                else:
+                    self.report["created"] += 1
+        except Exception as e:
+            logger.error("User import chunk failed", extra={"error": str(e)})
+            for line_number, row in rows:
+                self.add_error(line_number, row, f"Insert failed: {e}")
+        else:
+            self.report["created"] += len(rows)
+
+    def insert(self, rows, role, now):
+        """Insert cleaned ``rows`` and their role links in one transaction."""
+        users = [
+            User(
+                username=row["username"],
+                email=row["email"],
+                password=row["password_hash"],
+                phone=row["phone"],
+                comment=row["comment"],
+                status=1,  # Active status
+                create_time=now,
+                date_joined=now,
+            )
+            for row in rows
+        ]
+        with transaction.atomic():
+            User.objects.bulk_create(users)
+            # MySQL does not return primary keys from bulk inserts
+            user_ids = dict(
+                User.objects.filter(
+                    username__in=[user.username for user in users]
+                ).values_list("username", "id")
+            )
+            for user in users:
+                user.pk = user_ids[user.username]
+            links = SysUserRole.objects.bulk_create(
+                [SysUserRole(user_id=user.pk, role=role) for user in users]
+            )
+            user_search_index.sync(users)
+            # bulk_create sends no signals
+            capture_bulk_create(users + links)
+
+    def clean(self, record):
+        if record is None:
+            raise ValidationError("Malformed record")
+
+        row = {
+            field: (str(record.get(field) or "").strip() or None)
+            for field in (
+                "username",
+                "email",
+                "password",
+                "password_hash",
+                "phone",
+                "comment",
+            )
+        }
+        for field in ("username", "email"):
+            if not row[field]:
+                raise ValidationError(f"{field} is required")
+        if not row["password"] and not row["password_hash"]:
+            raise ValidationError("password is required")
+
+        self.username_validator(row["username"])
+        if len(row["username"]) > 150:
+            raise ValidationError("Username is too long")
+        validate_email(row["email"])
+        if row["phone"] and (not row["phone"].isdigit() or len(row["phone"]) > 11):
+            raise ValidationError("Phone number must be at most 11 digits")
+        if row["comment"] and len(row["comment"]) > 500:
+            raise ValidationError("Comment is too long")
+        if row["password_hash"]:
+            try:
+                identify_hasher(row["password_hash"])
+            except ValueError:
+                raise ValidationError("Unknown password hash format")
+        else:
+            validate_password(
+                row["password"], User(username=row["username"], email=row["email"])
+            )
+
+        if row["username"] in self._seen_usernames:
+            raise ValidationError("Duplicate username in import")
+        if row["email"] in self._seen_emails:
+            raise ValidationError("Duplicate email in import")
+        self._seen_usernames.add(row["username"])
+        self._seen_emails.add(row["email"])
+        return row
+
+    def exclude_existing(self, rows):
+        """Drop rows whose username or email already exists, in one query."""
+        if not rows:
+            return rows
+        usernames = [row["username"] for _, row in rows]
+        emails = [row["email"] for _, row in rows]
+        existing_usernames, existing_emails = set(), set()
+        for username, email in User.objects.filter(
+            Q(username__in=usernames) | Q(email__in=emails)
+        ).values_list("username", "email"):
+            existing_usernames.add(username)
+            existing_emails.add(email)
+
+        remaining = []
+        for line_number, row in rows:
+            if row["username"] in existing_usernames:
+                self.add_error(line_number, row, "Username already exists")
+            elif row["email"] in existing_emails:
+                self.add_error(line_number, row, "Email already exists")
+            else:
+                remaining.append((line_number, row))
+        return remaining
+
+    def add_error(self, line_number, record, message):
+        self.report["failed"] += 1
+        if len(self.report["errors"]) < MAX_REPORTED_ERRORS:
+            username = record.get("username") if isinstance(record, dict) else None
+            self.report["errors"].append(
+                {"line": line_number, "username": username, "message": message}
+            )
@@ -0,0 +1,16 @@
+# user/hashing.py
+
+# Entry points for password hashing worker processes. Spawned workers unpickle
+# these by importing this module, so it must not import models at module level.
+
+
+def init_worker():
+    import django
+
+    django.setup()
+
+
+def hash_password(password):
+    from django.contrib.auth.hashers import make_password
+
+    return make_password(password)
@@ -0,0 +1,130 @@
+import random
+import statistics
+import string
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from user.search import user_search_index
+
+User = get_user_model()
+
+BENCH_PREFIX = "bench_"
+WORDS = [
+    "alpha",
+    "bravo",
+    "charlie",
+    "delta",
+    "echo",
+    "foxtrot",
+    "golf",
+    "hotel",
+    "india",
+    "juliet",
+    "kilo",
+    "lima",
+    "mike",
+    "november",
+    "oscar",
+    "papa",
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure UserListView search latency with the full-text index against "
+        "the icontains fallback, optionally seeding synthetic users first"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "terms",
+            nargs="*",
+            default=["bench_42", "juliet", "example.com", "1380", "zz-no-match"],
+            help="Search terms to measure",
+        )
+        parser.add_argument("--repeat", type=int, default=20)
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=0,
+            help="Insert this many synthetic users (e.g. 1000000) before measuring",
+        )
+        parser.add_argument("--batch-size", type=int, default=10000)
+        parser.add_argument(
+            "--cleanup",
+            action="store_true",
+            help="Delete the synthetic users after measuring",
+        )
+
+    def handle(self, *args, **options):
+        if options["seed"]:
+            self.seed(options["seed"], options["batch_size"])
+
+        total = User.objects.count()
+        indexed = user_search_index.is_available()
+        self.stdout.write(f"Users: {total}, full-text index available: {indexed}")
+
+        for term in options["terms"]:
+            index_times = self.measure(user_search_index.q(term), options["repeat"])
+            fallback_times = self.measure(
+                user_search_index.fallback_q(term), options["repeat"]
+            )
+            self.stdout.write(
+                f"{term!r:>16}  index p50={self.p(index_times, 50):8.2f}ms "
+                f"p95={self.p(index_times, 95):8.2f}ms  "
+                f"fallback p50={self.p(fallback_times, 50):8.2f}ms "
+                f"p95={self.p(fallback_times, 95):8.2f}ms"
+            )
+
+        if options["cleanup"]:
+            deleted, _ = User.objects.filter(username__startswith=BENCH_PREFIX).delete()
+            user_search_index.rebuild()
+            self.stdout.write(f"Removed {deleted} synthetic users")
+
+    @staticmethod
+    def measure(search_q, repeat):
+        """Time what UserListView runs per request: a COUNT and the first page."""
+        queryset = User.objects.filter(deleted_at__isnull=True).filter(search_q)
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            queryset.count()
+            list(queryset.order_by("-create_time")[:10])
+            timings.append((time.perf_counter() - start) * 1000)
+        return timings
+
+    @staticmethod
+    def p(timings, percentile):
+        if len(timings) < 2:
+            return timings[0] if timings else 0.0
+        return statistics.quantiles(timings, n=100)[percentile - 1]
+
+    def seed(self, count, batch_size):
+        start_index = User.objects.filter(username__startswith=BENCH_PREFIX).count()
+        now = timezone.now()
+        created = 0
+        while created < count:
+            size = min(batch_size, count - created)
+            users = []
+            for i in range(start_index + created, start_index + created + size):
+                words = random.sample(WORDS, 3)
+                users.append(
+                    User(
+                        username=f"{BENCH_PREFIX}{i}",
+                        password="!",  # Unusable password
+                        email=f"{words[0]}.{i}@example.com",
+                        phone="".join(random.choices(string.digits, k=11)),
+                        comment=" ".join(words),
+                        status=1,
+                        create_time=now,
+                    )
+                )
+            User.objects.bulk_create(users, batch_size=batch_size)
+            created += size
+            self.stdout.write(f"Seeded {created}/{count} users")
+
+        # bulk_create skips signals, refresh the FTS5 table where one is used
+        user_search_index.rebuild()
@@ -0,0 +1,44 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from user.avatars import collect_unreferenced_blobs, sweep_orphaned_files
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete avatar blobs no user references anymore, and optionally "
+        "orphaned avatar files from before content addressing"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--grace-hours",
+            type=float,
+            default=24,
+            help="Keep unreferenced avatars this long, cached pages may still use them",
+        )
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument(
+            "--sweep",
+            action="store_true",
+            help="Also delete unreferenced files under MEDIA_ROOT/avatars",
+        )
+        parser.add_argument("--dry-run", action="store_true")
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(hours=options["grace_hours"])
+        dry_run = options["dry_run"]
+        verb = "Would remove" if dry_run else "Removed"
+
+        removed = collect_unreferenced_blobs(
+            cutoff, batch_size=options["batch_size"], dry_run=dry_run
+        )
+        self.stdout.write(f"{verb} {removed} unreferenced avatar blobs")
+
+        if options["sweep"]:
+            paths = sweep_orphaned_files(cutoff, dry_run=dry_run)
+            for path in paths:
+                self.stdout.write(f"  {path}")
+            self.stdout.write(f"{verb} {len(paths)} orphaned avatar files")
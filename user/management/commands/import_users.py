@@ -0,0 +1,61 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from role.models import SysRole
+from user.bulk_import import IMPORT_FORMATS, UserImporter, detect_format, iter_records
+
+
+class Command(BaseCommand):
+    help = "Stream users from a CSV or JSONL file (or stdin) into sys_user"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Input file, or '-' for stdin")
+        parser.add_argument("--format", choices=IMPORT_FORMATS)
+        parser.add_argument("--chunk-size", type=int, default=1000)
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=None,
+            help="Password hashing processes (default: CPU count, 0: in-process)",
+        )
+        parser.add_argument(
+            "--role", default="common", help="Role code assigned to imported users"
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        fmt = options["format"] or detect_format(path)
+        importer = UserImporter(
+            chunk_size=options["chunk_size"],
+            workers=options["workers"],
+            role_code=options["role"],
+        )
+
+        def progress(report):
+            self.stdout.write(
+                f"Processed {report['total']} rows: "
+                f"{report['created']} created, {report['failed']} failed"
+            )
+
+        try:
+            if path == "-":
+                report = importer.run(iter_records(sys.stdin, fmt), progress)
+            else:
+                with open(path, newline="", encoding="utf-8-sig") as stream:
+                    report = importer.run(iter_records(stream, fmt), progress)
+        except SysRole.DoesNotExist:
+            raise CommandError(f"Role '{options['role']}' does not exist")
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+
+        for error in report["errors"]:
+            self.stderr.write(
+                f"line {error['line']} ({error['username']}): {error['message']}"
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {report['created']} of {report['total']} users, "
+                f"{report['failed']} failed"
+            )
+        )
@@ -0,0 +1,50 @@
+# Generated by Django 5.1.3 on 2026-10-19 09:00
+
+from django.db import migrations
+
+# The search index as of this migration, spelled out so later changes to
+# user.search do not change what it does
+
+MYSQL_CREATE = (
+    "ALTER TABLE sys_user ADD FULLTEXT INDEX sys_user_search "
+    "(username, email, phone, comment) WITH PARSER ngram"
+)
+MYSQL_DROP = "ALTER TABLE sys_user DROP INDEX sys_user_search"
+
+SQLITE_CREATE = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS sys_user_search "
+    "USING fts5(username, email, phone, comment, tokenize='unicode61')"
+)
+SQLITE_FILL = (
+    "INSERT INTO sys_user_search (rowid, username, email, phone, comment) "
+    "SELECT id, username, email, phone, comment FROM sys_user"
+)
+SQLITE_DROP = "DROP TABLE IF EXISTS sys_user_search"
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "mysql":
+        schema_editor.execute(MYSQL_CREATE)
+    elif vendor == "sqlite":
+        schema_editor.execute(SQLITE_CREATE)
+        schema_editor.execute(SQLITE_FILL)
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "mysql":
+        schema_editor.execute(MYSQL_DROP)
+    elif vendor == "sqlite":
+        schema_editor.execute(SQLITE_DROP)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("user", "0004_remove_sysuser_is_active_sysuser_deleted_at"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.1.3 on 2026-10-19 15:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("auth", "0012_alter_user_first_name_max_length"),
+        ("user", "0005_sysuser_search_index"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="sysuser",
+            index=models.Index(
+                fields=["deleted_at", "create_time", "id"],
+                name="sys_user_del_ctime_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="sysuser",
+            index=models.Index(
+                fields=["deleted_at", "update_time", "id"],
+                name="sys_user_del_utime_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="sysuser",
+            index=models.Index(
+                fields=["deleted_at", "username"], name="sys_user_del_uname_idx"
+            ),
+        ),
+    ]
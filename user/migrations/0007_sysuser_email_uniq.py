@@ -0,0 +1,44 @@
+# Generated by Django 5.1.3 on 2026-10-19 15:53
+
+from django.db import migrations, models
+
+
+def clear_duplicate_emails(apps, schema_editor):
+    """
+    Store blank emails as NULL and keep each remaining email on one user:
+    the oldest active one, otherwise the oldest. The others lose it, so the
+    unique constraint can be added to a populated table.
+    """
+    SysUser = apps.get_model("user", "SysUser")
+    SysUser.objects.filter(email="").update(email=None)
+    duplicates = (
+        SysUser.objects.exclude(email=None)
+        .values("email")
+        .annotate(count=models.Count("id"))
+        .filter(count__gt=1)
+        .values_list("email", flat=True)
+    )
+    for email in list(duplicates):
+        users = SysUser.objects.filter(email=email).order_by(
+            models.F("deleted_at").asc(nulls_first=True), "id"
+        )
+        keep = users.values_list("id", flat=True).first()
+        users.exclude(id=keep).update(email=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("auth", "0012_alter_user_first_name_max_length"),
+        ("user", "0006_sysuser_sys_user_del_ctime_idx_and_more"),
+    ]
+
+    operations = [
+        migrations.RunPython(clear_duplicate_emails, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="sysuser",
+            constraint=models.UniqueConstraint(
+                fields=("email",), name="sys_user_email_uniq"
+            ),
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.1.3 on 2026-10-19 15:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("user", "0007_sysuser_email_uniq"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AvatarBlob",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "digest",
+                    models.CharField(
+                        max_length=64, unique=True, verbose_name="Content Hash"
+                    ),
+                ),
+                (
+                    "ref_count",
+                    models.IntegerField(default=0, verbose_name="Reference Count"),
+                ),
+                ("size", models.IntegerField(default=0, verbose_name="Stored Bytes")),
+                (
+                    "create_time",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Create Time"),
+                ),
+                (
+                    "unreferenced_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Unreferenced Since"
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "sys_avatar_blob",
+                "indexes": [
+                    models.Index(
+                        fields=["ref_count", "unreferenced_at"],
+                        name="sys_avatar_blob_gc_idx",
+                    )
+                ],
+            },
+        ),
+    ]
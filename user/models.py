@@ -18,6 +18,31 @@ class SysUser(AbstractUser):
 
     class Meta:
         db_table = "sys_user"
+        constraints = [
+            # Duplicate emails are rejected by the database, not a lookup
+            models.UniqueConstraint(fields=["email"], name="sys_user_email_uniq"),
+        ]
+        indexes = [
+            # Back the whitelisted UserListView sort keys
+            models.Index(
+                fields=["deleted_at", "create_time", "id"],
+                name="sys_user_del_ctime_idx",
+            ),
+            models.Index(
+                fields=["deleted_at", "update_time", "id"],
+                name="sys_user_del_utime_idx",
+            ),
+            models.Index(
+                fields=["deleted_at", "username"], name="sys_user_del_uname_idx"
+            ),
+        ]
+
+    def save(self, *args, **kwargs):
+        # A missing email is stored as NULL, which sys_user_email_uniq allows
+        # any number of times, unlike ""
+        if not self.email:
+            self.email = None
+        super().save(*args, **kwargs)
 
     @property
     def roles(self):
@@ -33,3 +58,28 @@ class SysUser(AbstractUser):
     @property
     def is_active(self):
         return self.status == 1 and not self.deleted_at
+
+
+class AvatarBlob(models.Model):
+    """
+    A processed avatar stored under its content hash and shared by every
+    user whose upload renders to the same bytes. Blobs whose ``ref_count``
+    drops to zero are removed by the ``gc_avatars`` command.
+    """
+
+    digest = models.CharField(max_length=64, unique=True, verbose_name="Content Hash")
+    ref_count = models.IntegerField(default=0, verbose_name="Reference Count")
+    size = models.IntegerField(default=0, verbose_name="Stored Bytes")
+    create_time = models.DateTimeField(auto_now_add=True, verbose_name="Create Time")
+    unreferenced_at = models.DateTimeField(
+        null=True, blank=True, verbose_name="Unreferenced Since"
+    )
+
+    class Meta:
+        db_table = "sys_avatar_blob"
+        indexes = [
+            models.Index(
+                fields=["ref_count", "unreferenced_at"],
+                name="sys_avatar_blob_gc_idx",
+            ),
+        ]
@@ -0,0 +1,10 @@
+# user/search.py
+
+from core.search import FullTextIndex
+
+# Backs the general "search" box of UserListView
+user_search_index = FullTextIndex(
+    "user.SysUser",
+    fields=["username", "email", "phone", "comment"],
+    name="sys_user_search",
+)
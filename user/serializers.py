@@ -4,7 +4,9 @@ from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from django.contrib.auth.password_validation import validate_password
 from django.core.exceptions import ValidationError
+from django.db.models import Prefetch
 
+from core.serializers import SparseFieldsMixin
 from role.models import SysUserRole
 from user.models import SysUser
 
@@ -127,7 +129,21 @@ class PasswordUpdateSerializer(serializers.Serializer):
         return value
 
 
-class UserProfileSerializer(serializers.ModelSerializer):
+def user_roles_prefetch():
+    """
+    Prefetch the non-deleted roles of a user queryset in one query, so that
+    UserProfileSerializer does not query roles per user.
+    """
+    return Prefetch(
+        "sysuserrole_set",
+        queryset=SysUserRole.objects.filter(role__deleted_at__isnull=True)
+        .select_related("role")
+        .order_by("role_id"),
+        to_attr="active_user_roles",
+    )
+
+
+class UserProfileSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     roles = serializers.SerializerMethodField()
     is_active = serializers.BooleanField(read_only=True)
 
@@ -155,10 +171,17 @@ class UserProfileSerializer(serializers.ModelSerializer):
             "deleted_at",
         ]
 
+    # Columns read by non-column fields, roles come from user_roles_prefetch()
+    field_sources = {"roles": [], "is_active": ["status", "deleted_at"]}
+
     def get_roles(self, obj):
-        user_roles = obj.roles.filter(
-            deleted_at__isnull=True
-        )  # Only get non-deleted roles
+        if hasattr(obj, "active_user_roles"):
+            # Loaded for the whole page by user_roles_prefetch()
+            user_roles = [user_role.role for user_role in obj.active_user_roles]
+        else:
+            user_roles = obj.roles.filter(
+                deleted_at__isnull=True
+            )  # Only get non-deleted roles
         return [
             {"id": role.id, "name": role.name, "code": role.code} for role in user_roles
         ]
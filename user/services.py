@@ -0,0 +1,70 @@
+# user/services.py
+
+import re
+
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from role.models import SysUserRole
+from role.registry import role_registry
+
+User = get_user_model()
+
+
+class UserCreationError(Exception):
+    """A user could not be created because of the submitted data."""
+
+    def __init__(self, message):
+        super().__init__(message)
+        self.message = message
+
+
+# The violated key as reported by MySQL, SQLite and PostgreSQL. Only the key
+# is inspected, the duplicate value itself may contain any text.
+UNIQUE_KEY_PATTERN = re.compile(
+    r"for key '([^']+)'|constraint failed: (\S+)|unique constraint \"([^\"]+)\""
+)
+
+
+def duplicate_field_message(error):
+    """Map a unique-constraint ``IntegrityError`` to the API error message."""
+    match = UNIQUE_KEY_PATTERN.search(str(error))
+    if not match:
+        return None
+    key = next(group for group in match.groups() if group).lower()
+    if "email" in key:
+        return "Email already exists"
+    if "username" in key:
+        return "Username already exists"
+    return None
+
+
+def create_user(username, email, password, **extra_fields):
+    """
+    Create an active user with the default ``common`` role.
+
+    The user and the role link are inserted in one transaction and the
+    unique constraints on ``username`` and ``email`` are the duplicate check,
+    so there is no separate ``exists()`` query and no window for two
+    concurrent signups to claim the same name. Duplicates raise
+    ``UserCreationError`` with the usual 400 message.
+    """
+    default_role = role_registry.common
+    try:
+        with transaction.atomic():
+            user = User.objects.create_user(
+                username=username,
+                email=email,
+                password=password,
+                create_time=timezone.now(),
+                status=1,  # Active status
+                **extra_fields,
+            )
+            SysUserRole.objects.create(user=user, role=default_role)
+    except IntegrityError as e:
+        message = duplicate_field_message(e)
+        if message is None:
+            raise
+        raise UserCreationError(message) from e
+    return user
@@ -0,0 +1,22 @@
+# user/signals.py
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import SysUser
+from .search import user_search_index
+
+
+@receiver(post_save, sender=SysUser)
+def index_user(sender, instance, using, update_fields=None, **kwargs):
+    """Keep the user search index in sync (no-op where the DB maintains it)."""
+    if update_fields is not None and not set(update_fields) & set(
+        user_search_index.fields
+    ):
+        return
+    user_search_index.sync([instance], using=using)
+
+
+@receiver(post_delete, sender=SysUser)
+def unindex_user(sender, instance, using, **kwargs):
+    user_search_index.remove([instance.pk], using=using)
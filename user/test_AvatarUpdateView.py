@@ -0,0 +1,176 @@
+# test_AvatarUpdateView.py
+
+import io
+import os
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from PIL import Image
+from rest_framework.test import APIClient
+
+from user.models import AvatarBlob
+
+User = get_user_model()
+
+
+@pytest.fixture
+def user_client(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    user = User.objects.create_user(
+        username="testuser", email="test@example.com", password="password"
+    )
+    client = APIClient()
+    client.force_authenticate(user=user)
+    client.credentials(HTTP_ACCEPT_LANGUAGE="en")
+    return client, user
+
+
+def make_upload(
+    size=(640, 480), fmt="JPEG", content_type="image/jpeg", color=(200, 30, 30)
+):
+    exif = Image.Exif()
+    exif[0x010E] = "holiday snapshot"  # ImageDescription
+    buffer = io.BytesIO()
+    Image.new("RGB", size, color).save(buffer, fmt, exif=exif)
+    return SimpleUploadedFile("photo.jpg", buffer.getvalue(), content_type)
+
+
+@pytest.mark.django_db
+class TestAvatarUpdateView:
+    def test_upload_renders_square_variants_without_metadata(
+        self, user_client, settings
+    ):
+        client, user = user_client
+
+        response = client.post(
+            reverse("avatar-update"), {"avatar": make_upload()}, format="multipart"
+        )
+
+        assert response.status_code == 200
+        variants = response.data["data"]["variants"]
+        assert sorted(variants) == [48, 128, 256]
+        user.refresh_from_db()
+        assert user.avatar == variants[256]
+
+        directory = os.path.dirname(
+            os.path.join(settings.MEDIA_ROOT, user.avatar.split("/media/", 1)[1])
+        )
+        assert sorted(os.listdir(directory)) == [
+            "128.jpg",
+            "128.webp",
+            "256.jpg",
+            "256.webp",
+            "48.jpg",
+            "48.webp",
+        ]
+        with Image.open(os.path.join(directory, "48.jpg")) as image:
+            assert image.size == (48, 48)
+            assert not image.getexif()
+
+    def test_identical_uploads_share_one_blob(self, user_client):
+        client, user = user_client
+        other = User.objects.create_user(
+            username="other", email="other@example.com", password="password"
+        )
+        client.post(
+            reverse("avatar-update"), {"avatar": make_upload()}, format="multipart"
+        )
+        client.force_authenticate(user=other)
+        client.post(
+            reverse("avatar-update"), {"avatar": make_upload()}, format="multipart"
+        )
+
+        user.refresh_from_db()
+        other.refresh_from_db()
+        assert user.avatar == other.avatar
+        assert list(AvatarBlob.objects.values_list("ref_count", flat=True)) == [2]
+
+    def test_replaced_avatar_is_collected_after_grace(self, user_client, settings):
+        client, user = user_client
+        client.post(
+            reverse("avatar-update"), {"avatar": make_upload()}, format="multipart"
+        )
+        user.refresh_from_db()
+        first_dir = os.path.dirname(
+            os.path.join(settings.MEDIA_ROOT, user.avatar.split("/media/", 1)[1])
+        )
+
+        client.post(
+            reverse("avatar-update"),
+            {"avatar": make_upload(color=(30, 30, 200))},
+            format="multipart",
+        )
+
+        # Nothing is deleted inline, only the reference is dropped
+        first_blob = AvatarBlob.objects.get(digest=os.path.basename(first_dir))
+        assert first_blob.ref_count == 0
+        assert os.path.isdir(first_dir)
+
+        call_command("gc_avatars", stdout=io.StringIO())
+        assert os.path.isdir(first_dir)
+
+        call_command("gc_avatars", "--grace-hours=0", stdout=io.StringIO())
+        assert not os.path.exists(first_dir)
+        assert list(AvatarBlob.objects.values_list("ref_count", flat=True)) == [1]
+
+    def test_rejects_undecodable_upload(self, user_client):
+        client, _ = user_client
+        upload = SimpleUploadedFile("fake.png", b"not an image", "image/png")
+
+        response = client.post(
+            reverse("avatar-update"), {"avatar": upload}, format="multipart"
+        )
+
+        assert response.status_code == 400
+
+    def test_get_avatar_returns_requested_variant(self, user_client):
+        client, user = user_client
+        client.post(
+            reverse("avatar-update"), {"avatar": make_upload()}, format="multipart"
+        )
+        user.refresh_from_db()  # The client authenticates with this instance
+
+        response = client.get(
+            reverse("get-avatar"), {"size": "64", "image_format": "jpeg"}
+        )
+
+        assert response.data["data"]["avatar_url"].endswith("/128.jpg")
+
+
+@pytest.mark.django_db
+class TestUserAvatarBatchView:
+    def test_batch_lookup_uses_one_query_and_revalidates(self, user_client):
+        client, user = user_client
+        client.post(
+            reverse("avatar-update"), {"avatar": make_upload()}, format="multipart"
+        )
+        other = User.objects.create_user(
+            username="other", email="other@example.com", password="password"
+        )
+        params = {"user_ids": f"{user.id},{other.id},999999", "size": "48"}
+
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(reverse("user-avatars"), params)
+
+        assert len(queries) == 1
+        avatars = response.data["data"]["avatars"]
+        assert avatars[user.id].endswith("/48.webp")
+        assert avatars[other.id] is None and avatars[999999] is None
+
+        etag = response["ETag"]
+        response = client.get(reverse("user-avatars"), params, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+
+        client.post(
+            reverse("avatar-update"),
+            {"avatar": make_upload(color=(30, 30, 200))},
+            format="multipart",
+        )
+        response = client.get(reverse("user-avatars"), params, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response["ETag"] != etag
@@ -0,0 +1,481 @@
+# test_UserListView.py
+
+import csv
+import gzip
+import io
+import json
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIClient
+
+from role.models import SysRole, SysUserRole
+from user.bulk_import import UserImporter
+from user.views import UserListView
+
+User = get_user_model()
+PASSWORD = "Tr1cky-Imp0rt"
+
+
+@pytest.fixture
+def roles():
+    admin_role = SysRole.objects.create(
+        name="Super Admin", code="admin", is_system=True
+    )
+    common_role = SysRole.objects.create(name="Common Role", code="common")
+    return admin_role, common_role
+
+
+@pytest.fixture
+def admin_client(roles):
+    admin_role, _ = roles
+    admin = User.objects.create_user(
+        username="admin", email="admin@example.com", password="password", status=1
+    )
+    SysUserRole.objects.create(user=admin, role=admin_role)
+
+    client = APIClient()
+    client.force_authenticate(user=admin)
+    client.credentials(HTTP_ACCEPT_LANGUAGE="en")
+    return client
+
+
+def create_users(count, role, start=0):
+    for i in range(start, start + count):
+        user = User.objects.create_user(
+            username=f"user{i}", email=f"user{i}@example.com", password="password"
+        )
+        SysUserRole.objects.create(user=user, role=role)
+
+
+@pytest.mark.django_db
+class TestUserListView:
+
+    # Roles are loaded for the whole page, not once per user
+    def test_query_count_is_constant_per_page(self, admin_client, roles):
+        _, common_role = roles
+        url = reverse("user-list")
+
+        create_users(2, common_role)
+        with CaptureQueriesContext(connection) as small_page:
+            response = admin_client.get(url, {"page_size": 100})
+        assert response.status_code == 200
+        assert len(response.data["data"]) == 3
+
+        create_users(30, common_role, start=2)
+        with CaptureQueriesContext(connection) as large_page:
+            response = admin_client.get(url, {"page_size": 100})
+        assert response.status_code == 200
+        assert len(response.data["data"]) == 33
+
+        assert len(large_page) == len(small_page)
+
+    # Soft-deleted roles are not listed for a user
+    def test_prefetched_roles_skip_deleted_roles(self, admin_client, roles):
+        _, common_role = roles
+        retired_role = SysRole.objects.create(name="Retired", code="retired")
+        user = User.objects.create_user(username="member", password="password")
+        SysUserRole.objects.create(user=user, role=common_role)
+        SysUserRole.objects.create(user=user, role=retired_role)
+        retired_role.soft_delete()
+
+        response = admin_client.get(reverse("user-list"), {"username": "member"})
+
+        assert response.status_code == 200
+        member = next(u for u in response.data["data"] if u["username"] == "member")
+        assert [role["code"] for role in member["roles"]] == ["common"]
+
+    # Walking cursor pages returns every user exactly once
+    def test_cursor_pagination_walks_all_users(self, admin_client, roles):
+        _, common_role = roles
+        create_users(11, common_role)
+        url = reverse("user-list")
+
+        seen = []
+        params = {"cursor": "", "page_size": 5, "count": "exact"}
+        while True:
+            response = admin_client.get(url, params)
+            assert response.status_code == 200
+            assert response.data["count"] == 12
+            seen.extend(user["id"] for user in response.data["data"])
+            if not response.data["next"]:
+                break
+            params["cursor"] = response.data["next"]
+
+        assert len(seen) == 12
+        assert seen == sorted(set(seen), reverse=True)
+
+    # Tampered cursors are rejected
+    def test_invalid_cursor_returns_not_found(self, admin_client):
+        response = admin_client.get(reverse("user-list"), {"cursor": "not-a-cursor"})
+
+        assert response.status_code == 404
+
+    # General search matches prefixes and follows updates to the user
+    def test_search_matches_prefix_and_tracks_updates(self, admin_client):
+        user = User.objects.create_user(
+            username="johnny", email="johnny@example.com", password="password"
+        )
+        url = reverse("user-list")
+
+        response = admin_client.get(url, {"search": "john"})
+        assert [u["username"] for u in response.data["data"]] == ["johnny"]
+
+        user.comment = "platform team"
+        user.save()
+        response = admin_client.get(url, {"search": "platf"})
+        assert [u["username"] for u in response.data["data"]] == ["johnny"]
+
+
+@pytest.mark.django_db
+class TestUserListOrdering:
+
+    # Unknown or unindexed sort keys fall back to the default ordering
+    def test_only_whitelisted_sort_keys_are_used(self, rf):
+        view = UserListView()
+
+        def resolve(ordering):
+            return view.get_ordering(Request(rf.get("/", {"ordering": ordering})))
+
+        assert resolve("-update_time") == ["-update_time", "-id"]
+        assert resolve("password,username") == ["username"]
+        assert resolve("sysuserrole__role__name") == ["-create_time", "-id"]
+
+    # The default list query is served by the composite index, not a filesort
+    @pytest.mark.parametrize(
+        "ordering,index_name",
+        [
+            ("-create_time", "sys_user_del_ctime_idx"),
+            ("update_time", "sys_user_del_utime_idx"),
+        ],
+    )
+    def test_sorted_page_uses_composite_index(self, rf, ordering, index_name):
+        view = UserListView()
+        request = Request(rf.get("/", {"ordering": ordering}))
+        queryset = User.objects.filter(deleted_at__isnull=True).order_by(
+            *view.get_ordering(request)
+        )
+
+        plan = queryset[:10].explain()
+
+        assert index_name in plan
+        assert "filesort" not in plan.lower()
+        assert "TEMP B-TREE" not in plan
+
+
+@pytest.mark.django_db
+class TestUserImportView:
+    def test_import_reports_row_errors(self, admin_client, roles):
+        _, common_role = roles
+        create_users(1, common_role)
+        payload = "\n".join(
+            [
+                json.dumps({"username": name, "email": email, "password": password})
+                for name, email, password in [
+                    ("new1", "new1@example.com", PASSWORD),
+                    ("new2", "new2@example.com", PASSWORD),
+                    ("user0", "other@example.com", PASSWORD),
+                    ("new1", "dup@example.com", PASSWORD),
+                    ("new3", "new3@example.com", "12345"),
+                ]
+            ]
+            + ["not json"]
+        )
+        upload = SimpleUploadedFile("users.jsonl", payload.encode())
+
+        response = admin_client.post(
+            reverse("user-import"), {"file": upload}, format="multipart"
+        )
+
+        assert response.status_code == 200
+        report = response.data["data"]
+        assert (report["total"], report["created"], report["failed"]) == (6, 2, 4)
+        assert [error["line"] for error in report["errors"]] == [4, 5, 6, 3]
+        new_user = User.objects.get(username="new1")
+        assert new_user.check_password(PASSWORD)
+        assert list(new_user.sysuserrole_set.values_list("role__code", flat=True)) == [
+            "common"
+        ]
+
+    def test_conflicting_rows_fail_alone(self, monkeypatch, roles):
+        _, common_role = roles
+        create_users(1, common_role)
+        # As if user0 had been inserted after the existence check
+        monkeypatch.setattr(UserImporter, "exclude_existing", lambda self, rows: rows)
+        records = enumerate(
+            [
+                {"username": "new1", "email": "new1@example.com", "password": PASSWORD},
+                {
+                    "username": "user0",
+                    "email": "new2@example.com",
+                    "password": PASSWORD,
+                },
+                {"username": "new3", "email": "new3@example.com", "password": PASSWORD},
+            ],
+            start=1,
+        )
+
+        report = UserImporter(workers=0).run(records)
+
+        assert (report["created"], report["failed"]) == (2, 1)
+        assert [error["line"] for error in report["errors"]] == [2]
+        assert report["errors"][0]["message"].startswith("Insert failed")
+        assert set(
+            User.objects.filter(username__startswith="new").values_list(
+                "username", flat=True
+            )
+        ) == {"new1", "new3"}
+
+
+@pytest.mark.django_db
+class TestUserExportView:
+    def test_streams_ndjson_in_chunks(self, admin_client, roles, settings):
+        _, common_role = roles
+        create_users(7, common_role)
+        settings.USER_EXPORT_CHUNK_SIZE = 3
+
+        with CaptureQueriesContext(connection) as queries:
+            response = admin_client.get(
+                reverse("user-export"), {"username": "user", "ordering": "username"}
+            )
+            rows = [
+                json.loads(line)
+                for line in b"".join(response.streaming_content).splitlines()
+            ]
+
+        assert response["Content-Type"] == "application/x-ndjson"
+        assert [row["username"] for row in rows] == [f"user{i}" for i in range(7)]
+        assert rows[0]["roles"] == [
+            {"id": common_role.id, "name": "Common Role", "code": "common"}
+        ]
+        # 3 chunks, each one user query and one role query
+        assert len(queries) <= 2 + 3 * 2
+
+    def test_gzip_csv(self, admin_client, roles):
+        _, common_role = roles
+        create_users(2, common_role)
+
+        response = admin_client.get(
+            reverse("user-export"),
+            {"export_format": "csv", "gzip": "true", "show_deleted": "true"},
+        )
+        content = gzip.decompress(b"".join(response.streaming_content)).decode()
+
+        assert response["Content-Type"] == "application/gzip"
+        assert 'filename="users.csv.gz"' in response["Content-Disposition"]
+        rows = list(csv.DictReader(io.StringIO(content)))
+        assert len(rows) == 3
+        assert {row["roles"] for row in rows} == {"admin", "common"}
+
+
+@pytest.mark.django_db
+class TestUserBulkActionView:
+    def test_soft_delete_by_ids(self, admin_client, roles):
+        admin_role, common_role = roles
+        create_users(3, common_role)
+        user0, user1, user2 = User.objects.filter(username__startswith="user")
+        SysUserRole.objects.create(user=user2, role=admin_role)
+        user1.soft_delete()
+
+        response = admin_client.post(
+            reverse("user-bulk-action"),
+            {"action": "delete", "ids": [user0.id, user1.id, user2.id, 999999]},
+            format="json",
+        )
+
+        assert response.status_code == 200
+        results = {row["id"]: row["result"] for row in response.data["data"]["results"]}
+        assert results == {
+            user0.id: "updated",
+            user1.id: "skipped",
+            user2.id: "protected",
+            999999: "not_found",
+        }
+        user0.refresh_from_db()
+        assert user0.deleted_at is not None and user0.status == 0
+        assert not SysUserRole.objects.filter(user=user0).exists()
+        assert User.objects.get(pk=user2.pk).deleted_at is None
+
+    def test_updates_the_locked_eligible_ids(self, admin_client, roles):
+        admin_role, common_role = roles
+        create_users(3, common_role)
+        user0, user1, user2 = User.objects.filter(username__startswith="user")
+        User.objects.filter(pk=user1.pk).update(status=0)
+        SysUserRole.objects.create(user=user2, role=admin_role)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = admin_client.post(
+                reverse("user-bulk-action"),
+                {"action": "deactivate", "ids": [user0.id, user1.id, user2.id]},
+                format="json",
+            )
+
+        assert response.data["data"]["updated"] == 1
+        updates = [
+            query["sql"]
+            for query in queries
+            if query["sql"].startswith(f'UPDATE "{User._meta.db_table}"')
+        ]
+        assert len(updates) == 1
+        assert f"IN ({user0.id})" in updates[0]
+        assert User.objects.get(pk=user2.pk).status != 0
+
+    def test_deactivate_and_restore_by_filter(self, admin_client, roles):
+        _, common_role = roles
+        create_users(2, common_role)
+        User.objects.filter(username__startswith="user").update(status=1)
+
+        response = admin_client.post(
+            reverse("user-bulk-action"),
+            {"action": "deactivate", "filter": {"username": "user"}},
+            format="json",
+        )
+        assert response.data["data"]["updated"] == 2
+        assert set(
+            User.objects.filter(username__startswith="user").values_list(
+                "status", flat=True
+            )
+        ) == {0}
+
+        admin_client.post(
+            reverse("user-bulk-action"),
+            {"action": "delete", "filter": {"username": "user"}},
+            format="json",
+        )
+        response = admin_client.post(
+            reverse("user-bulk-action"),
+            {
+                "action": "restore",
+                "filter": {"username": "user", "show_deleted": "true"},
+            },
+            format="json",
+        )
+        assert response.data["data"]["updated"] == 2
+        restored = User.objects.get(username="user0")
+        assert restored.deleted_at is None and restored.status == 1
+        assert list(restored.roles.values_list("code", flat=True)) == ["common"]
+
+
+@pytest.mark.django_db
+class TestUserCreate:
+    def test_create_assigns_common_role(self, admin_client, roles):
+        response = admin_client.post(
+            reverse("user-list"),
+            {"username": "new", "email": "new@example.com", "password": "pw"},
+            format="json",
+        )
+
+        assert response.status_code == 200
+        assert response.data["data"]["roles"][0]["code"] == "common"
+
+    @pytest.mark.parametrize(
+        "payload, message",
+        [
+            (
+                {"username": "user0", "email": "other@example.com"},
+                "Username already exists",
+            ),
+            (
+                {"username": "email", "email": "user0@example.com"},
+                "Email already exists",
+            ),
+        ],
+    )
+    def test_duplicates_are_rejected(self, admin_client, roles, payload, message):
+        _, common_role = roles
+        create_users(1, common_role)
+
+        response = admin_client.post(
+            reverse("user-list"), {**payload, "password": "pw"}, format="json"
+        )
+
+        assert response.status_code == 400
+        assert response.data["message"] == message
+        assert User.objects.count() == 2
+
+    def test_users_without_email_do_not_collide(self):
+        first = User.objects.create_user(username="first", password="pw")
+        second = User.objects.create_user(username="second", email="", password="pw")
+        User.objects.create_superuser(username="root", email="", password="pw")
+
+        assert first.email is None and second.email is None
+        second.email = "second@example.com"
+        second.save()
+        second.email = ""
+        second.save()
+        assert User.objects.filter(email__isnull=True).count() == 3
+
+
+@pytest.mark.django_db(transaction=True)
+def test_email_migration_clears_blank_and_duplicate_emails():
+    executor = MigrationExecutor(connection)
+    before, after = [("user", "0006_sysuser_sys_user_del_ctime_idx_and_more")], [
+        ("user", "0007_sysuser_email_uniq")
+    ]
+    executor.migrate(before)
+    OldUser = executor.loader.project_state(before).apps.get_model("user", "SysUser")
+    for username, email, deleted_at in [
+        ("old", "a@example.com", timezone.now()),
+        ("kept", "a@example.com", None),
+        ("twin", "a@example.com", None),
+        ("first", "b@example.com", None),
+        ("second", "b@example.com", None),
+        ("blank", "", None),
+        ("empty", "", None),
+    ]:
+        OldUser.objects.create(username=username, email=email, deleted_at=deleted_at)
+
+    executor = MigrationExecutor(connection)
+    executor.migrate(after)
+    executor = MigrationExecutor(connection)
+    executor.migrate(executor.loader.graph.leaf_nodes())
+
+    assert dict(User.objects.values_list("username", "email")) == {
+        "old": None,
+        "kept": "a@example.com",
+        "twin": None,
+        "first": "b@example.com",
+        "second": None,
+        "blank": None,
+        "empty": None,
+    }
+
+
+@pytest.mark.django_db
+class TestSparseFieldsets:
+    def test_fields_limit_columns_and_skip_roles(self, admin_client, roles):
+        _, common_role = roles
+        create_users(3, common_role)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = admin_client.get(
+                reverse("user-list"), {"fields": "username,email", "cursor": ""}
+            )
+
+        assert response.status_code == 200
+        assert set(response.data["data"][0]) == {"id", "username", "email"}
+        user_queries = [q["sql"] for q in queries if 'FROM "sys_user"' in q["sql"]]
+        assert len(user_queries) == 1
+        assert '"phone"' not in user_queries[0]
+        assert not any("sys_user_role" in q["sql"] for q in queries)
+
+    def test_exclude_defers_columns(self, admin_client, roles):
+        _, common_role = roles
+        create_users(1, common_role)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = admin_client.get(
+                reverse("user-list"), {"exclude": "comment,roles"}
+            )
+
+        row = response.data["data"][0]
+        assert "comment" not in row and "roles" not in row and "is_active" in row
+        selects = [q["sql"] for q in queries if q["sql"].startswith("SELECT")]
+        assert not any('"comment"' in sql for sql in selects[-1:])
@@ -10,7 +10,11 @@ from user.views import (
     PasswordUpdateView,
     AvatarUpdateView,
     UserAvatarView,
+    UserAvatarBatchView,
     UserListView,
+    UserImportView,
+    UserExportView,
+    UserBulkActionView,
     UserRoleUpdateView,
     UserProfileDetailView,
     UserProfileUpdateView,
@@ -35,6 +39,7 @@ urlpatterns = [
     ),
     # avatar
     path("profile/get-avatar/", UserAvatarView.as_view(), name="get-avatar"),
+    path("users/avatars/", UserAvatarBatchView.as_view(), name="user-avatars"),
     path("profile/avatar/", AvatarUpdateView.as_view(), name="avatar-update"),
     path(
         "users/<int:user_id>/avatar/",
@@ -50,6 +55,9 @@ urlpatterns = [
     ),
     # user
     path("users/", UserListView.as_view(), name="user-list"),
+    path("users/import/", UserImportView.as_view(), name="user-import"),
+    path("users/export/", UserExportView.as_view(), name="user-export"),
+    path("users/bulk/", UserBulkActionView.as_view(), name="user-bulk-action"),
     path("user-info/", UserInfoView.as_view(), name="user_info"),
     path(
         "users/<int:user_id>/",
@@ -1,16 +1,22 @@
 # views.py
 
+import hashlib
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from datetime import datetime, timedelta
 
 from django.db.models import Q
 from django.utils import timezone
+import io
 import os
 import jwt
 from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.utils.cache import get_conditional_response
 from django.utils.decorators import method_decorator
+from django.utils.http import http_date, quote_etag
 from django.views.decorators.csrf import ensure_csrf_cookie
 from rest_framework import status, serializers
+from rest_framework.exceptions import NotFound
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
@@ -22,20 +28,50 @@ from rest_framework_simplejwt.views import (
 )
 
 from role.models import SysRole, SysUserRole
+from role.registry import ADMIN_ROLE_CODE, role_registry
 
 # Import custom rate limit decorators
 from user.utils import rate_limit_user
 from user.utils import set_token_cookie
 from .authentication import CookieJWTAuthentication
+from .avatars import (
+    AVATAR_FORMATS,
+    DEFAULT_AVATAR_FORMAT,
+    AvatarProcessingError,
+    avatar_variant_url,
+    get_avatar_sizes,
+    inspect_image,
+    submit_avatar,
+)
+from .bulk_actions import BULK_ACTIONS, BulkUserAction
+from .bulk_import import (
+    IMPORT_FORMATS,
+    UserImporter,
+    detect_format,
+    iter_records,
+    shared_hashing_pool,
+)
+from .search import user_search_index
+from .services import UserCreationError, create_user
 from .serializers import (
     CustomTokenObtainPairSerializer,
     ProfileUpdateSerializer,
     PasswordUpdateSerializer,
     UserProfileSerializer,
+    user_roles_prefetch,
 )
 from rest_framework.pagination import PageNumberPagination
 
 from core.logging.utils import log_operation, get_logger
+from core.export import (
+    EXPORT_FORMATS,
+    csv_stream,
+    export_response,
+    iter_queryset_chunks,
+    ndjson_stream,
+)
+from core.ordering import OrderingMixin
+from core.pagination import KeysetPagination
 
 from core.audit.utils import audit_log
 
@@ -347,33 +383,14 @@ class SignupView(APIView):
                     status=status.HTTP_400_BAD_REQUEST,
                 )
 
-        # Check if username already exists
-        if User.objects.filter(username=data["username"]).exists():
-            return Response(
-                {"code": 400, "message": "Username already exists"},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
-
-        # Check if email already exists
-        if User.objects.filter(email=data["email"]).exists():
-            return Response(
-                {"code": 400, "message": "Email already exists"},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
-
         try:
-            user = User.objects.create_user(
+            # Duplicate usernames/emails are rejected by the unique constraints
+            user = create_user(
                 username=data["username"],
                 email=data["email"],
                 password=data["password"],
-                create_time=timezone.now(),
-                status=1,  # Active status
             )
 
-            # Assign default role to created user
-            default_role = SysRole.objects.get(code="common")
-            SysUserRole.objects.create(user=user, role=default_role)
-
             return Response(
                 {
                     "code": 200,
@@ -386,6 +403,11 @@ class SignupView(APIView):
                 }
             )
 
+        except UserCreationError as e:
+            return Response(
+                {"code": 400, "message": e.message},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
         except Exception as e:
             return Response(
                 {"code": 500, "message": str(e)},
@@ -493,12 +515,12 @@ class AvatarUpdateView(AdminRequiredMixin, APIView):
         avatar_file = request.FILES["avatar"]
 
         # Validate file type
-        allowed_types = ["image/jpeg", "image/png", "image/gif"]
+        allowed_types = ["image/jpeg", "image/png", "image/gif", "image/webp"]
         if avatar_file.content_type not in allowed_types:
             return Response(
                 {
                     "code": 400,
-                    "message": "Invalid file type. Only JPEG, PNG and GIF are allowed.",
+                    "message": "Invalid file type. Only JPEG, PNG, GIF and WebP are allowed.",
                 },
                 status=status.HTTP_400_BAD_REQUEST,
             )
@@ -510,56 +532,85 @@ class AvatarUpdateView(AdminRequiredMixin, APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        # Generate unique filename
-        file_extension = os.path.splitext(avatar_file.name)[1]
-        new_filename = f"avatar_{request.user.id}_{int(timezone.now().timestamp())}{file_extension}"
-
-        # Save file path in media directory
-        avatar_path = os.path.join("avatars", new_filename)
-        full_path = os.path.join(settings.MEDIA_ROOT, "avatars", new_filename)
-
-        # Ensure directory exists
-        os.makedirs(os.path.dirname(full_path), exist_ok=True)
-
-        # Save file
-        with open(full_path, "wb+") as destination:
-            for chunk in avatar_file.chunks():
-                destination.write(chunk)
-
-        # Update user avatar field
-        # Should delete old avatar file before saving new one
-        if user.avatar:
-            old_avatar_path = self.get_avatar_absolute_path(user.avatar)
-            if old_avatar_path and os.path.exists(old_avatar_path):
-                try:
-                    os.remove(old_avatar_path)
-                    print("Previous avatar deleted:", old_avatar_path)
-                except Exception as e:
-                    print(f"Error deleting previous avatar: {str(e)}")
-
-        user.avatar = f"/media/{avatar_path}"
-        user.save()
+        data = avatar_file.read()
+        try:
+            # Header-only check here, decoding and resizing run on the
+            # avatar worker pool
+            inspect_image(data)
+            future = submit_avatar(user.id, data)
+            avatar = future.result(timeout=settings.AVATAR_PROCESSING_WAIT)
+        except AvatarProcessingError as e:
+            return Response(
+                {"code": 400, "message": str(e)},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        except FutureTimeoutError:
+            # Still rendering, the new avatar shows up in get-avatar once done
+            return Response(
+                {"code": 202, "message": "Avatar is being processed"},
+                status=status.HTTP_202_ACCEPTED,
+            )
 
         return Response(
             {
                 "code": 200,
                 "message": "Avatar updated successfully",
-                "data": {"avatar_url": request.user.avatar},
+                "data": {
+                    "avatar_url": avatar,
+                    "variants": {
+                        size: avatar_variant_url(avatar, size)
+                        for size in get_avatar_sizes()
+                    },
+                },
             }
         )
 
-    @staticmethod
-    def get_avatar_absolute_path(avatar_url):
-        """Convert avatar URL to absolute filesystem path."""
 
-        if not avatar_url:
-            return None
-        # Remove /media/ prefix if it exists
-        relative_path = avatar_url.replace("/media/", "", 1)
-        return os.path.join(settings.MEDIA_ROOT, relative_path)
+class AvatarVariantMixin:
+    """
+    Variant selection and HTTP validators shared by the avatar lookup views.
+
+    ETag and Last-Modified come from the ``update_time`` of the users
+    involved (avatar changes bump it), so clients revalidate with
+    If-None-Match / If-Modified-Since and get a 304 without a body.
+    """
+
+    def get_variant(self, request):
+        # Pick the variant for the displayed size (?size=48) and format
+        # (?image_format=jpeg, WebP by default)
+        size = request.query_params.get("size")
+        size = int(size) if size and size.isdigit() else None
+        image_format = request.query_params.get("image_format", "webp").lower()
+        if image_format not in AVATAR_FORMATS:
+            image_format = DEFAULT_AVATAR_FORMAT
+        return size, image_format
+
+    def get_validators(self, rows, size, image_format):
+        """``(etag, last_modified)`` for ``(id, avatar, update_time)`` rows."""
+        digest = hashlib.md5(f"{size}:{image_format}".encode())
+        for user_id, avatar, update_time in rows:
+            stamp = update_time.isoformat() if update_time else ""
+            digest.update(f"|{user_id}:{stamp}:{avatar or ''}".encode())
+        timestamps = [update_time for _, _, update_time in rows if update_time]
+        last_modified = int(max(timestamps).timestamp()) if timestamps else None
+        return quote_etag(digest.hexdigest()), last_modified
+
+    def conditional_response(self, request, rows, size, image_format, build):
+        """Return a 304 when the client copy is current, else ``build()``."""
+        etag, last_modified = self.get_validators(rows, size, image_format)
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = build()
+        response["ETag"] = etag
+        if last_modified is not None:
+            response["Last-Modified"] = http_date(last_modified)
+        response["Cache-Control"] = "private, no-cache"
+        return response
 
 
-class UserAvatarView(APIView):
+class UserAvatarView(AvatarVariantMixin, APIView):
     permission_classes = [IsAuthenticated]
     authentication_classes = [CookieJWTAuthentication]
 
@@ -567,19 +618,42 @@ class UserAvatarView(APIView):
         user_id = request.query_params.get("user_id")
         try:
             if user_id:
-                user = User.objects.get(id=user_id)
+                rows = list(
+                    User.objects.filter(id=user_id).values_list(
+                        "id", "avatar", "update_time"
+                    )
+                )
+                if not rows:
+                    raise User.DoesNotExist
             else:
                 user = request.user
+                rows = [(user.id, user.avatar, user.update_time)]
 
-            if not user.avatar:
+            avatar = rows[0][1]
+            if not avatar:
                 return Response(
                     {"code": 404, "message": "No avatar found"},
                     status=status.HTTP_404_NOT_FOUND,
                 )
 
+            size, image_format = self.get_variant(request)
             # Return full URL for the avatar
-            avatar_url = request.build_absolute_uri(user.avatar)
-            return Response({"code": 200, "data": {"avatar_url": avatar_url}})
+            return self.conditional_response(
+                request,
+                rows,
+                size,
+                image_format,
+                lambda: Response(
+                    {
+                        "code": 200,
+                        "data": {
+                            "avatar_url": request.build_absolute_uri(
+                                avatar_variant_url(avatar, size, image_format)
+                            )
+                        },
+                    }
+                ),
+            )
         except User.DoesNotExist:
             return Response(
                 {"code": 404, "message": "User not found"},
@@ -592,80 +666,171 @@ class UserAvatarView(APIView):
             )
 
 
+class UserAvatarBatchView(AvatarVariantMixin, APIView):
+    """
+    Avatar URLs for many users in one request and one query:
+    ``?user_ids=1,2,3`` (or repeated ``user_id``). Users without an avatar,
+    or that do not exist, map to ``null``.
+    """
+
+    permission_classes = [IsAuthenticated]
+    authentication_classes = [CookieJWTAuthentication]
+    max_ids = 200
+
+    def get(self, request):
+        raw_ids = request.query_params.getlist("user_id") + [
+            user_id
+            for value in request.query_params.getlist("user_ids")
+            for user_id in value.split(",")
+        ]
+        raw_ids = [user_id.strip() for user_id in raw_ids if user_id.strip()]
+        if not raw_ids or not all(user_id.isdigit() for user_id in raw_ids):
+            return Response(
+                {"code": 400, "message": "user_ids must be a list of integers"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        user_ids = list(dict.fromkeys(int(user_id) for user_id in raw_ids))
+        if len(user_ids) > self.max_ids:
+            return Response(
+                {"code": 400, "message": f"At most {self.max_ids} users per request"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            rows = list(
+                User.objects.filter(id__in=user_ids)
+                .order_by("id")
+                .values_list("id", "avatar", "update_time")
+            )
+            size, image_format = self.get_variant(request)
+
+            def build():
+                avatars = dict.fromkeys(user_ids)
+                for user_id, avatar, _ in rows:
+                    if avatar:
+                        avatars[user_id] = request.build_absolute_uri(
+                            avatar_variant_url(avatar, size, image_format)
+                        )
+                return Response({"code": 200, "data": {"avatars": avatars}})
+
+            return self.conditional_response(request, rows, size, image_format, build)
+        except Exception as e:
+            return Response(
+                {"code": 500, "message": f"Error retrieving avatars: {str(e)}"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+
 class CustomPageNumberPagination(PageNumberPagination):
     page_size = 10
     page_size_query_param = "page_size"
     max_page_size = 100
 
 
-class UserListView(AdminRequiredMixin, APIView):
+class UserFilterMixin(OrderingMixin):
+    """Search, deleted-state and ordering filters shared by user list views."""
+
+    # Public sort keys -> columns backed by the sys_user composite indexes
+    ordering_fields = {
+        "create_time": ("create_time", "id"),
+        "update_time": ("update_time", "id"),
+        "username": ("username",),
+        "id": ("id",),
+    }
+    default_ordering = "-create_time"
+
+    def get_queryset(self, request, params=None):
+        # Get query parameters, or the same filters from a request body
+        params = request.query_params if params is None else params
+        search_query = str(params.get("search", "")).strip()
+        show_deleted = str(params.get("show_deleted", "")).lower() == "true"
+        username = str(params.get("username", "")).strip()
+        email = str(params.get("email", "")).strip()
+        phone = str(params.get("phone", "")).strip()
+        comment = str(params.get("comment", "")).strip()
+        # Start with all users
+        queryset = User.objects.all()
+
+        # Filter deleted/non-deleted users
+        if not show_deleted:
+            queryset = queryset.filter(deleted_at__isnull=True)
+
+        # Build search filter
+        search_filters = Q()
+
+        # Add individual field filters
+        if username:
+            search_filters |= Q(username__icontains=username)
+        if email:
+            search_filters |= Q(email__icontains=email)
+        if phone:
+            search_filters |= Q(phone__icontains=phone)
+        if comment:
+            search_filters |= Q(comment__icontains=comment)
+
+        # Add general search if provided, served by the full-text index
+        # when one exists (falls back to icontains on every column)
+        if search_query:
+            search_filters |= user_search_index.q(search_query, using=queryset.db)
+
+        # Apply search filters if any exist
+        if search_filters:
+            queryset = queryset.filter(search_filters)
+
+        # Handle ordering, restricted to indexed sort keys
+        queryset = queryset.order_by(*self.get_ordering(request))
+        return queryset
+
+
+class UserListView(AdminRequiredMixin, UserFilterMixin, APIView):
     permission_classes = [IsAuthenticated]
     authentication_classes = [CookieJWTAuthentication]
     pagination_class = CustomPageNumberPagination
 
     def get(self, request):
         try:
-            # Get query parameters
-            search_query = request.query_params.get("search", "").strip()
-            show_deleted = (
-                request.query_params.get("show_deleted", "").lower() == "true"
-            )
-            username = request.query_params.get("username", "").strip()
-            email = request.query_params.get("email", "").strip()
-            phone = request.query_params.get("phone", "").strip()
-            comment = request.query_params.get("comment", "").strip()
-            ordering = request.query_params.get("ordering", "-create_time")
-            # Start with all users
-            queryset = User.objects.all()
-
-            # Filter deleted/non-deleted users
-            if not show_deleted:
-                queryset = queryset.filter(deleted_at__isnull=True)
-
-            # Build search filter
-            search_filters = Q()
-
-            # Add individual field filters
-            if username:
-                search_filters |= Q(username__icontains=username)
-            if email:
-                search_filters |= Q(email__icontains=email)
-            if phone:
-                search_filters |= Q(phone__icontains=phone)
-            if comment:
-                search_filters |= Q(comment__icontains=comment)
-
-            # Add general search if provided
-            if search_query:
-                search_filters |= (
-                    Q(username__icontains=search_query)
-                    | Q(email__icontains=search_query)
-                    | Q(phone__icontains=search_query)
-                    | Q(comment__icontains=search_query)
+            queryset = self.get_queryset(request)
+
+            # Sparse fieldsets: ?fields= / ?exclude= also trim the SELECT
+            fields = UserProfileSerializer.get_field_selection(request)
+            queryset = UserProfileSerializer.sparse_queryset(queryset, request)
+
+            # Load roles for the whole page instead of one query per user
+            if UserProfileSerializer.wants(fields, "roles"):
+                queryset = queryset.prefetch_related(user_roles_prefetch())
+
+            # Cursor mode: keyset pagination, no OFFSET and optional totals
+            if KeysetPagination.is_requested(request):
+                paginator = KeysetPagination()
+                paginated_users = paginator.paginate_queryset(queryset, request)
+                serializer = UserProfileSerializer(
+                    paginated_users, many=True, fields=fields
+                )
+                return Response(
+                    {
+                        "code": 200,
+                        "message": "Users retrieved successfully",
+                        "data": serializer.data,
+                        **paginator.get_paginated_data(),
+                    }
                 )
-
-            # Apply search filters if any exist
-            if search_filters:
-                queryset = queryset.filter(search_filters)
-
-            # Handle ordering
-            if ordering:
-                order_fields = ordering.split(",")
-                queryset = queryset.order_by(*order_fields)
 
             # Apply pagination
             paginator = self.pagination_class()
             paginated_users = paginator.paginate_queryset(queryset, request)
 
             # Serialize the results
-            serializer = UserProfileSerializer(paginated_users, many=True)
+            serializer = UserProfileSerializer(
+                paginated_users, many=True, fields=fields
+            )
             # Return response with pagination data
             return Response(
                 {
                     "code": 200,
                     "message": "Users retrieved successfully",
                     "data": serializer.data,
-                    "count": queryset.count(),
+                    # Reuse the paginator's COUNT(*) instead of running it twice
+                    "count": paginator.page.paginator.count,
                     "page": int(request.query_params.get("page", 1)),
                     "pageSize": int(
                         request.query_params.get("pageSize", paginator.page_size)
@@ -673,6 +838,11 @@ class UserListView(AdminRequiredMixin, APIView):
                 }
             )
 
+        except NotFound as e:
+            return Response(
+                {"code": 404, "message": str(e.detail), "data": None},
+                status=status.HTTP_404_NOT_FOUND,
+            )
         except Exception as e:
             return Response(
                 {"code": 500, "message": f"An error occurred: {str(e)}", "data": None},
@@ -697,36 +867,17 @@ class UserListView(AdminRequiredMixin, APIView):
                     status=status.HTTP_400_BAD_REQUEST,
                 )
 
-        # Check if username already exists
-        if User.objects.filter(username=data["username"]).exists():
-            return Response(
-                {"code": 400, "message": "Username already exists"},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
-
-        # Check if email already exists
-        if User.objects.filter(email=data["email"]).exists():
-            return Response(
-                {"code": 400, "message": "Email already exists"},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
-
         try:
-            # Create user instance
-            user = User.objects.create_user(
+            # Create the user with the common role, duplicates are rejected
+            # by the unique constraints
+            user = create_user(
                 username=data["username"],
                 email=data["email"],
                 password=data["password"],
                 phone=data.get("phone"),
                 comment=data.get("comment"),
-                create_time=timezone.now(),
-                status=1,  # Active status
             )
 
-            # Get the common role and assign it
-            common_role = SysRole.objects.get(code="common")
-            SysUserRole.objects.create(user=user, role=common_role)
-
             # Serialize and return the created user
             serializer = UserProfileSerializer(user)
             return Response(
@@ -737,6 +888,235 @@ class UserListView(AdminRequiredMixin, APIView):
                 }
             )
 
+        except UserCreationError as e:
+            return Response(
+                {"code": 400, "message": e.message},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        except Exception as e:
+            return Response(
+                {"code": 500, "message": str(e)},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+
+class UserImportView(AdminRequiredMixin, APIView):
+    """Bulk create users from an uploaded CSV or JSONL file."""
+
+    permission_classes = [IsAuthenticated]
+    authentication_classes = [CookieJWTAuthentication]
+
+    def post(self, request):
+        admin_check = self.check_admin(request)
+        if admin_check:
+            return admin_check
+
+        if "file" not in request.FILES:
+            return Response(
+                {"code": 400, "message": "No import file provided"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        upload = request.FILES["file"]
+        fmt = request.data.get("format") or detect_format(upload.name)
+        if fmt not in IMPORT_FORMATS:
+            return Response(
+                {
+                    "code": 400,
+                    "message": "Invalid format. Only CSV and JSONL are allowed.",
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            # Read the upload as a text stream, rows are consumed chunk by chunk
+            stream = io.TextIOWrapper(upload.file, encoding="utf-8-sig", newline="")
+            importer = UserImporter(
+                chunk_size=settings.USER_IMPORT_CHUNK_SIZE,
+                workers=settings.USER_IMPORT_WORKERS,
+                executor=shared_hashing_pool(settings.USER_IMPORT_WORKERS),
+            )
+            report = importer.run(iter_records(stream, fmt))
+            return Response(
+                {
+                    "code": 200,
+                    "message": f"Imported {report['created']} of {report['total']} users",
+                    "data": report,
+                }
+            )
+        except SysRole.DoesNotExist:
+            return Response(
+                {"code": 500, "message": "Default role does not exist"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+        except Exception as e:
+            return Response(
+                {"code": 500, "message": str(e)},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+
+class UserExportView(AdminRequiredMixin, UserFilterMixin, APIView):
+    """
+    Stream every user matching the UserListView filters as NDJSON or CSV.
+
+    ``?export_format=ndjson|csv`` selects the encoding (``format`` is taken
+    by DRF content negotiation) and ``?gzip=true`` compresses on the fly.
+    Rows are read in keyset chunks with one role query per chunk.
+    """
+
+    permission_classes = [IsAuthenticated]
+    authentication_classes = [CookieJWTAuthentication]
+    csv_fields = [
+        "id",
+        "username",
+        "email",
+        "phone",
+        "comment",
+        "status",
+        "roles",
+        "create_time",
+        "update_time",
+        "last_login",
+        "deleted_at",
+    ]
+
+    def get(self, request):
+        admin_check = self.check_admin(request)
+        if admin_check:
+            return admin_check
+
+        fmt = request.query_params.get("export_format", "ndjson").lower()
+        if fmt not in EXPORT_FORMATS:
+            return Response(
+                {
+                    "code": 400,
+                    "message": "Invalid format. Only NDJSON and CSV are allowed.",
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        compress = request.query_params.get("gzip", "").lower() == "true"
+
+        fields = UserProfileSerializer.get_field_selection(request)
+        try:
+            queryset = UserProfileSerializer.sparse_queryset(
+                self.get_queryset(request), request
+            )
+            if UserProfileSerializer.wants(fields, "roles"):
+                queryset = queryset.prefetch_related(user_roles_prefetch())
+        except Exception as e:
+            return Response(
+                {"code": 500, "message": f"An error occurred: {str(e)}", "data": None},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+        chunks = (
+            UserProfileSerializer(users, many=True, fields=fields).data
+            for users in iter_queryset_chunks(queryset, settings.USER_EXPORT_CHUNK_SIZE)
+        )
+        if fmt == "csv":
+            stream = csv_stream(
+                ([self.to_csv_row(row) for row in chunk] for chunk in chunks),
+                [
+                    name
+                    for name in self.csv_fields
+                    if UserProfileSerializer.wants(fields, name)
+                ],
+            )
+        else:
+            stream = ndjson_stream(chunks)
+
+        logger.info(
+            "User export started",
+            extra={"user_id": request.user.id, "format": fmt, "gzip": compress},
+        )
+        return export_response(stream, "users", fmt, compress=compress)
+
+    @staticmethod
+    def to_csv_row(row):
+        row = dict(row)
+        if "roles" in row:
+            row["roles"] = ",".join(role["code"] for role in row["roles"])
+        return row
+
+
+class UserBulkActionView(AdminRequiredMixin, UserFilterMixin, APIView):
+    """
+    Activate, deactivate, soft delete or restore many users in one request.
+
+    The body names the ``action`` and either explicit ``ids`` or a ``filter``
+    object with the UserListView search parameters. Admin-role holders are
+    never changed. The response carries a result for every matched id.
+    """
+
+    permission_classes = [IsAuthenticated]
+    authentication_classes = [CookieJWTAuthentication]
+
+    def post(self, request):
+        admin_check = self.check_admin(request)
+        if admin_check:
+            return admin_check
+
+        action = request.data.get("action")
+        if action not in BULK_ACTIONS:
+            return Response(
+                {
+                    "code": 400,
+                    "message": f"action must be one of: {', '.join(BULK_ACTIONS)}",
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        ids = request.data.get("ids")
+        user_filter = request.data.get("filter")
+        limit = settings.USER_BULK_ACTION_LIMIT
+        if ids is not None:
+            if (
+                not isinstance(ids, list)
+                or not ids
+                or not all(isinstance(user_id, int) for user_id in ids)
+            ):
+                return Response(
+                    {
+                        "code": 400,
+                        "message": "ids must be a non-empty list of integers",
+                    },
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            ids = list(dict.fromkeys(ids))
+            if len(ids) > limit:
+                return Response(
+                    {"code": 400, "message": f"At most {limit} users per request"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            queryset = User.objects.filter(pk__in=ids)
+        elif isinstance(user_filter, dict):
+            queryset = self.get_queryset(request, params=user_filter)
+            if queryset.order_by()[: limit + 1].count() > limit:
+                return Response(
+                    {
+                        "code": 400,
+                        "message": f"Filter matches more than {limit} users",
+                    },
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+        else:
+            return Response(
+                {"code": 400, "message": "Either ids or filter is required"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            updated, results = BulkUserAction(action, request.user).run(
+                queryset, requested_ids=ids
+            )
+            return Response(
+                {
+                    "code": 200,
+                    "message": f"{updated} users updated",
+                    "data": {"updated": updated, "results": results},
+                }
+            )
         except Exception as e:
             return Response(
                 {"code": 500, "message": str(e)},
@@ -791,8 +1171,8 @@ class UserRoleUpdateView(APIView):
     def can_assign_roles(self, user, role_ids, current_user):
         if current_user.roles.filter(code="admin").exists():
             return True
-        admin_role = SysRole.objects.filter(code="admin").first()
-        return not (admin_role and admin_role.id in role_ids)
+        admin_role_id = role_registry.get_id(ADMIN_ROLE_CODE)
+        return not (admin_role_id and admin_role_id in role_ids)
 
     def update_user_roles(self, user, role_ids):
         SysUserRole.objects.filter(user=user).delete()